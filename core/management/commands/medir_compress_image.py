@@ -0,0 +1,177 @@
+import multiprocessing
+import os
+import resource
+import time
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.management.base import BaseCommand, CommandError
+
+from core.utils import compress_image as modulo_compress_image
+from core.utils.compress_image import compress_image
+
+EXTENSIONES = ('.jpg', '.jpeg', '.png', '.webp')
+
+
+def compress_image_por_pasos(
+    uploaded_file,
+    max_size_kb=100,
+    initial_quality=85,
+    min_quality=10,
+    max_width=2048,
+    max_height=2048,
+    min_size_px=64,
+    quality_step=5,
+    scale_step=0.75,
+    max_iterations=60,
+):
+    """Algoritmo anterior de compress_image (calidad de a `quality_step`, luego escala 75%), como referencia."""
+    from PIL import Image, ImageOps
+
+    max_size_bytes = max_size_kb * 1024
+    image = Image.open(uploaded_file)
+    try:
+        image = ImageOps.exif_transpose(image)
+    except Exception:
+        pass
+    if image.mode in ('RGBA', 'LA'):
+        image = image.convert('RGB')
+    if image.width > max_width or image.height > max_height:
+        image.thumbnail((max_width, max_height), Image.LANCZOS)
+
+    current_quality = initial_quality
+    buffer = modulo_compress_image._guardar_jpeg(image, current_quality)
+    iterations = 0
+    while buffer.tell() > max_size_bytes:
+        iterations += 1
+        if iterations > max_iterations:
+            raise ValueError(f'No se pudo comprimir la imagen por debajo de {max_size_kb} KB tras {max_iterations} intentos')
+        if current_quality > min_quality:
+            current_quality = max(min_quality, current_quality - quality_step)
+            buffer = modulo_compress_image._guardar_jpeg(image, current_quality)
+            continue
+        new_w = int(image.width * scale_step)
+        new_h = int(image.height * scale_step)
+        if new_w < min_size_px or new_h < min_size_px:
+            raise ValueError('La imagen no pudo reducirse al tamaño requerido sin quedar demasiado pequeña')
+        image = image.resize((new_w, new_h), Image.LANCZOS)
+        current_quality = initial_quality
+        buffer = modulo_compress_image._guardar_jpeg(image, current_quality)
+    return ContentFile(buffer.getvalue(), name='imagen.jpg')
+
+
+def corpus_sintetico():
+    """Imágenes generadas con Pillow que cubren los casos típicos de subida.
+
+    - foto de 24 MP con ruido moderado (cámara de celular),
+    - foto vertical de 12 MP,
+    - 2048 px de ruido fuerte (el peor caso para JPEG),
+    - PNG de un gráfico plano (entra al primer intento).
+    """
+    from PIL import Image, ImageDraw, ImageFilter
+
+    def foto(ancho, alto, ruido):
+        degradado = Image.linear_gradient('L').resize((ancho, alto))
+        textura = Image.effect_noise((ancho, alto), ruido).filter(ImageFilter.GaussianBlur(1))
+        return Image.merge('RGB', (degradado, textura, Image.blend(degradado, textura, 0.5)))
+
+    def codificar(imagen, formato, **opciones):
+        buffer = BytesIO()
+        imagen.save(buffer, formato, **opciones)
+        return buffer.getvalue()
+
+    grafico = Image.new('RGB', (1200, 800), 'white')
+    dibujo = ImageDraw.Draw(grafico)
+    for i in range(0, 1200, 60):
+        dibujo.rectangle((i, 800 - i // 2, i + 40, 800), fill=(i % 255, 90, 160))
+
+    return [
+        ('foto_24mp.jpg', codificar(foto(6000, 4000, 40), 'JPEG', quality=92)),
+        ('foto_vertical_12mp.jpg', codificar(foto(3000, 4000, 25), 'JPEG', quality=92)),
+        ('ruido_2048.jpg', codificar(Image.effect_noise((2048, 2048), 90).convert('RGB'), 'JPEG', quality=95)),
+        ('grafico.png', codificar(grafico, 'PNG')),
+    ]
+
+
+def _medir(funcion, contenido, conexion):
+    """Corre en un proceso aparte para que el pico de RSS sea solo el de esta compresión."""
+    codificaciones = 0
+    original = modulo_compress_image._guardar_jpeg
+
+    def contar(*args, **kwargs):
+        nonlocal codificaciones
+        codificaciones += 1
+        return original(*args, **kwargs)
+
+    modulo_compress_image._guardar_jpeg = contar
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    inicio = time.perf_counter()
+    try:
+        resultado = funcion(BytesIO(contenido))
+        tamano = resultado.size
+        error = None
+    except ValueError as e:
+        tamano, error = 0, str(e)
+    conexion.send({
+        'codificaciones': codificaciones,
+        'ms': (time.perf_counter() - inicio) * 1000,
+        'rss_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_inicial) / 1024,
+        'kb': tamano / 1024,
+        'error': error,
+    })
+    conexion.close()
+
+
+class Command(BaseCommand):
+    help = 'Compara codificaciones, tiempo y pico de RSS de compress_image contra el algoritmo anterior.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--corpus', help='Directorio con imágenes propias (por defecto un corpus sintético)')
+
+    def handle(self, *args, **options):
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            raise CommandError('Pillow no está instalado')
+
+        if options['corpus']:
+            directorio = options['corpus']
+            if not os.path.isdir(directorio):
+                raise CommandError(f'No existe el directorio {directorio}')
+            corpus = []
+            for nombre in sorted(os.listdir(directorio)):
+                if nombre.lower().endswith(EXTENSIONES):
+                    with open(os.path.join(directorio, nombre), 'rb') as archivo:
+                        corpus.append((nombre, archivo.read()))
+            if not corpus:
+                raise CommandError(f'No hay imágenes en {directorio}')
+        else:
+            corpus = corpus_sintetico()
+
+        contexto = multiprocessing.get_context('fork')
+        algoritmos = [('anterior', compress_image_por_pasos), ('bisección', compress_image)]
+        totales = {nombre: [0, 0.0] for nombre, _ in algoritmos}
+
+        self.stdout.write(f'{"imagen":<24} {"algoritmo":<10} {"encodes":>7} {"ms":>8} {"RSS MB":>7} {"KB":>6}')
+        for nombre_imagen, contenido in corpus:
+            for nombre, funcion in algoritmos:
+                receptor, emisor = contexto.Pipe(duplex=False)
+                proceso = contexto.Process(target=_medir, args=(funcion, contenido, emisor))
+                proceso.start()
+                emisor.close()
+                try:
+                    datos = receptor.recv()
+                except EOFError:
+                    raise CommandError(f'Falló la medición de {nombre_imagen} con el algoritmo {nombre}')
+                finally:
+                    proceso.join()
+                totales[nombre][0] += datos['codificaciones']
+                totales[nombre][1] += datos['ms']
+                detalle = datos['error'] or f'{datos["kb"]:6.1f}'
+                self.stdout.write(
+                    f'{nombre_imagen:<24} {nombre:<10} {datos["codificaciones"]:>7} {datos["ms"]:8.0f} '
+                    f'{datos["rss_mb"]:7.1f} {detalle}'
+                )
+
+        for nombre, (codificaciones, ms) in totales.items():
+            self.stdout.write(self.style.SUCCESS(f'Total {nombre}: {codificaciones} codificaciones, {ms:.0f} ms'))
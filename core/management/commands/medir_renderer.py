@@ -0,0 +1,57 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from ninja.renderers import JSONRenderer
+
+from core.utils.renderers import MEDIA_TYPE_MSGPACK, FastRenderer, msgpack
+from producto.models import Producto
+from producto.schemas import ProductoList
+
+
+class Command(BaseCommand):
+    help = 'Mide el tiempo de render por página de productos con JSONRenderer, FastRenderer y MessagePack.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--items', type=int, default=100, help='Productos por página')
+        parser.add_argument('--repeticiones', type=int, default=500, help='Renders por renderer')
+
+    def handle(self, *args, **options):
+        items = options['items']
+        repeticiones = options['repeticiones']
+
+        if items <= 0 or repeticiones <= 0:
+            raise CommandError('--items y --repeticiones deben ser mayores a 0')
+
+        productos = list(Producto.objects.select_related('proveedor', 'categoria').order_by('-fecha_actualizacion')[:items])
+        if not productos:
+            raise CommandError('No hay productos: ejecutar poblar_bd primero')
+
+        # Mismo dato que recibe el renderer en /productos/listar_todos
+        pagina = {
+            'items': [ProductoList.from_orm(producto).model_dump() for producto in productos],
+            'count': len(productos),
+            'next': None,
+            'previous': None,
+        }
+
+        factory = RequestFactory()
+        casos = [
+            ('JSONRenderer', JSONRenderer(), factory.get('/')),
+            ('FastRenderer (JSON)', FastRenderer(), factory.get('/')),
+        ]
+        if msgpack is not None:
+            casos.append(('FastRenderer (MessagePack)', FastRenderer(), factory.get('/', HTTP_ACCEPT=MEDIA_TYPE_MSGPACK)))
+
+        base = None
+        self.stdout.write(f'Página de {len(productos)} productos, {repeticiones} renders por caso')
+        for nombre, renderer, request in casos:
+            contenido = renderer.render(request, pagina, response_status=200)
+            inicio = time.perf_counter()
+            for _ in range(repeticiones):
+                renderer.render(request, pagina, response_status=200)
+            por_pagina = (time.perf_counter() - inicio) / repeticiones * 1000
+            base = base or por_pagina
+            self.stdout.write(
+                f'{nombre:<28} {por_pagina:8.3f} ms/página  x{base / por_pagina:5.1f}  {len(contenido):>8} bytes'
+            )
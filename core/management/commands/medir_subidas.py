@@ -0,0 +1,141 @@
+import multiprocessing
+import os
+import resource
+import tempfile
+import threading
+import time
+from io import BytesIO
+
+from django.core.handlers.wsgi import WSGIRequest
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.utils.upload_handlers import SubidaRechazada
+
+BOUNDARY = 'medirsubidas'
+
+# Configuración anterior: todo archivo de hasta 50 MB se leía a memoria
+CONFIGURACION_ANTERIOR = {
+    'FILE_UPLOAD_MAX_MEMORY_SIZE': 50 * 1024 * 1024,
+    'FILE_UPLOAD_HANDLERS': [
+        'django.core.files.uploadhandler.MemoryFileUploadHandler',
+        'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+    ],
+}
+
+
+def escribir_cuerpo(ruta, tamano, imagen=True):
+    """Cuerpo multipart como el de /productos/crear con un archivo de `tamano` bytes.
+
+    Con `imagen` el archivo es un JPEG de 6000x4000 completado con bytes después del EOI
+    (Pillow los ignora); si no, bytes sin formato de imagen.
+    """
+    from PIL import Image
+
+    if imagen:
+        buffer = BytesIO()
+        Image.new('RGB', (6000, 4000), 'gray').save(buffer, 'JPEG')
+        contenido = buffer.getvalue()
+    else:
+        contenido = b'no es una imagen'
+    with open(ruta, 'wb') as archivo:
+        archivo.write(
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="data"\r\n\r\n'
+            f'{{"proveedor_id": 1, "nombre": "Foto"}}\r\n'
+            f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="imagen"; filename="foto.jpg"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'.encode()
+        )
+        archivo.write(contenido)
+        relleno = tamano - len(contenido)
+        bloque = b'\0' * (1024 * 1024)
+        while relleno > 0:
+            archivo.write(bloque[:relleno])
+            relleno -= len(bloque)
+        archivo.write(f'\r\n--{BOUNDARY}--\r\n'.encode())
+
+
+def _parsear(ruta, resultados):
+    with open(ruta, 'rb') as cuerpo:
+        request = WSGIRequest({
+            'REQUEST_METHOD': 'POST',
+            'PATH_INFO': '/api/productos/crear',
+            'CONTENT_TYPE': f'multipart/form-data; boundary={BOUNDARY}',
+            'CONTENT_LENGTH': str(os.path.getsize(ruta)),
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'wsgi.input': cuerpo,
+        })
+        try:
+            archivo = request.FILES['imagen']
+            resultados.append((type(archivo).__name__, cuerpo.tell()))
+            archivo.close()
+        except SubidaRechazada:
+            resultados.append(('rechazada', cuerpo.tell()))
+
+
+def _medir(ruta, concurrentes, configuracion, conexion):
+    """Corre en un proceso aparte para que el pico de RSS sea solo el de estas subidas."""
+    rss_inicial = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    resultados = []
+    inicio = time.perf_counter()
+    with override_settings(**configuracion):
+        hilos = [threading.Thread(target=_parsear, args=(ruta, resultados)) for _ in range(concurrentes)]
+        for hilo in hilos:
+            hilo.start()
+        for hilo in hilos:
+            hilo.join()
+    conexion.send({
+        'ms': (time.perf_counter() - inicio) * 1000,
+        'rss_mb': (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss - rss_inicial) / 1024,
+        'resultados': resultados,
+    })
+    conexion.close()
+
+
+class Command(BaseCommand):
+    help = 'Mide el pico de memoria al recibir subidas concurrentes con la configuración actual y la anterior.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrentes', type=int, default=20, help='Subidas simultáneas')
+        parser.add_argument('--tamano-mb', type=int, default=40, help='Tamaño de cada archivo subido')
+
+    def handle(self, *args, **options):
+        concurrentes = options['concurrentes']
+        tamano = options['tamano_mb'] * 1024 * 1024
+        if concurrentes <= 0 or tamano <= 0:
+            raise CommandError('--concurrentes y --tamano-mb deben ser mayores a 0')
+        try:
+            import PIL  # noqa: F401
+        except ImportError:
+            raise CommandError('Pillow no está instalado')
+
+        contexto = multiprocessing.get_context('fork')
+        with tempfile.TemporaryDirectory() as directorio:
+            imagen = os.path.join(directorio, 'imagen.multipart')
+            basura = os.path.join(directorio, 'basura.multipart')
+            escribir_cuerpo(imagen, tamano)
+            escribir_cuerpo(basura, tamano, imagen=False)
+
+            casos = [
+                ('anterior (imagen)', imagen, CONFIGURACION_ANTERIOR),
+                ('actual (imagen)', imagen, {}),
+                ('actual (no imagen)', basura, {}),
+            ]
+            self.stdout.write(f'{concurrentes} subidas simultáneas de {options["tamano_mb"]} MB')
+            for nombre, ruta, configuracion in casos:
+                receptor, emisor = contexto.Pipe(duplex=False)
+                proceso = contexto.Process(target=_medir, args=(ruta, concurrentes, configuracion, emisor))
+                proceso.start()
+                emisor.close()
+                try:
+                    datos = receptor.recv()
+                except EOFError:
+                    raise CommandError(f'Falló la medición de {nombre}')
+                finally:
+                    proceso.join()
+                tipos = sorted({tipo for tipo, _ in datos['resultados']})
+                leidos = max(leidos for _, leidos in datos['resultados']) / (1024 * 1024)
+                self.stdout.write(
+                    f'{nombre:<20} pico RSS +{datos["rss_mb"]:7.1f} MB  {datos["ms"]:7.0f} ms  '
+                    f'{", ".join(tipos)}  (leídos hasta {leidos:.2f} MB por subida)'
+                )
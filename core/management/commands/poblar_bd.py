@@ -54,7 +54,10 @@ class Command(BaseCommand):
         for index in range(cantidad_proveedores):
             nombre = f'PROV_{marca_tiempo}_{index + 1:04d}'
             telefono = f'09{random.randint(1000000, 9999999)}'
-            proveedores.append(Proveedor(nombre=nombre, telefono=telefono))
+            proveedor = Proveedor(nombre=nombre, telefono=telefono)
+            # bulk_create no pasa por save(): calcular aquí las columnas normalizadas
+            proveedor.normalizar_campos()
+            proveedores.append(proveedor)
 
         with transaction.atomic():
             Proveedor.objects.bulk_create(proveedores, batch_size=batch_size)
@@ -76,15 +79,15 @@ class Command(BaseCommand):
                     factor_venta = Decimal(str(random.uniform(1.10, 2.20)))
                     precio_venta = (precio_compra * factor_venta).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
 
-                    productos_lote.append(
-                        Producto(
-                            proveedor=proveedor,
-                            nombre=f'PROD_{proveedor.id}_{idx_producto + 1:04d}',
-                            descripcion=f'Producto aleatorio {idx_producto + 1} del proveedor {proveedor.nombre}',
-                            precio_compra=precio_compra,
-                            precio_venta=precio_venta,
-                        )
+                    producto = Producto(
+                        proveedor=proveedor,
+                        nombre=f'PROD_{proveedor.id}_{idx_producto + 1:04d}',
+                        descripcion=f'Producto aleatorio {idx_producto + 1} del proveedor {proveedor.nombre}',
+                        precio_compra=precio_compra,
+                        precio_venta=precio_venta,
                     )
+                    producto.normalizar_campos()
+                    productos_lote.append(producto)
 
                     if len(productos_lote) >= batch_size:
                         Producto.objects.bulk_create(productos_lote, batch_size=batch_size)
@@ -0,0 +1,202 @@
+import json
+import logging
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.db import connection
+from django.utils.cache import patch_vary_headers
+
+from core.utils.compresion import comprimir, comprimir_flujo, comprimir_flujo_async, elegir_codificacion
+
+from core.utils.query_budget import QueryBudgetExceeded
+from core.utils.renderers import renderizar
+from core.utils.response_cache import guardar_respuesta
+from core.utils.upload_handlers import SubidaRechazada
+
+logger = logging.getLogger('core.query_budget')
+
+
+class _RegistroConsultas:
+	def __init__(self):
+		self.cantidad = 0
+		self.duracion = 0.0
+		self.formas = Counter()
+
+	def __call__(self, execute, sql, params, many, context):
+		inicio = time.perf_counter()
+		try:
+			return execute(sql, params, many, context)
+		finally:
+			self.duracion += time.perf_counter() - inicio
+			self.cantidad += 1
+			# El SQL llega parametrizado, así que el texto ya es la "forma" de la consulta
+			self.formas[sql] += 1
+
+
+class QueryBudgetMiddleware:
+	"""Mide por request la cantidad de consultas SQL, el tiempo total en BD y las consultas
+	repetidas (firmas de N+1).
+
+	Lo publica como log estructurado (logger `core.query_budget`) y, si
+	`QUERY_BUDGET_HEADERS` está activo, como cabeceras `Server-Timing` y `X-DB-*`.
+	Si la vista declaró `@query_budget(n)` y se supera, se registra un warning
+	(o se lanza `QueryBudgetExceeded` con `QUERY_BUDGET_RAISE`). En las respuestas en
+	streaming también se cuentan las consultas hechas al iterar el cuerpo.
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+		self.headers = getattr(settings, 'QUERY_BUDGET_HEADERS', settings.DEBUG)
+		self.raise_on_exceed = getattr(settings, 'QUERY_BUDGET_RAISE', False)
+		self.umbral_repetidas = getattr(settings, 'QUERY_BUDGET_N1_UMBRAL', 3)
+
+	def __call__(self, request):
+		registro = _RegistroConsultas()
+		with connection.execute_wrapper(registro):
+			response = self.get_response(request)
+
+		if response.streaming and not response.is_async:
+			# Las consultas de una respuesta en streaming corren al iterar el cuerpo: se miden
+			# ahí y el presupuesto se controla al terminar (ya sin cabeceras)
+			response.streaming_content = self._medir_flujo(request, response, response.streaming_content, registro)
+			return response
+
+		self._controlar(request, response, registro)
+		if self.headers:
+			presupuesto = getattr(request, 'query_budget', None)
+			response['Server-Timing'] = f'db;dur={registro.duracion * 1000:.2f};desc="{registro.cantidad} queries"'
+			response['X-DB-Query-Count'] = str(registro.cantidad)
+			response['X-DB-Duplicate-Queries'] = str(
+				sum(n - 1 for n in registro.formas.values() if n >= self.umbral_repetidas)
+			)
+			if presupuesto is not None:
+				response['X-DB-Query-Budget'] = str(presupuesto)
+		return response
+
+	def _medir_flujo(self, request, response, contenido, registro):
+		with connection.execute_wrapper(registro):
+			yield from contenido
+		self._controlar(request, response, registro)
+
+	def _controlar(self, request, response, registro):
+		presupuesto = getattr(request, 'query_budget', None)
+		repetidas = {sql: n for sql, n in registro.formas.items() if n >= self.umbral_repetidas}
+		excedido = presupuesto is not None and registro.cantidad > presupuesto
+
+		datos = {
+			'method': request.method,
+			'path': request.path,
+			'status': response.status_code,
+			'queries': registro.cantidad,
+			'db_ms': round(registro.duracion * 1000, 2),
+			'budget': presupuesto,
+			'repetidas': [{'sql': sql[:200], 'veces': n} for sql, n in sorted(repetidas.items(), key=lambda x: -x[1])],
+		}
+		if excedido or repetidas:
+			logger.warning('query_budget %s', json.dumps(datos, ensure_ascii=False))
+		else:
+			logger.debug('query_budget %s', json.dumps(datos, ensure_ascii=False))
+
+		if excedido and self.raise_on_exceed:
+			raise QueryBudgetExceeded(
+				f'{request.method} {request.path} ejecutó {registro.cantidad} consultas (presupuesto {presupuesto})'
+			)
+
+
+class ResponseCacheMiddleware:
+	"""Guarda en la cache de respuestas lo renderizado por las vistas con `@cache_response`."""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		response = self.get_response(request)
+		guardar_respuesta(request, response)
+		return response
+
+
+class CompressionMiddleware:
+	"""Comprime las respuestas con brotli, zstd o gzip según `Accept-Encoding`.
+
+	Respuestas normales: solo si miden al menos `COMPRESSION_MIN_SIZE` bytes y el
+	resultado es más chico. Respuestas en streaming (exportaciones): se comprimen bloque
+	a bloque sin acumularlas. Se omiten los archivos de `MEDIA_URL` y los tipos ya
+	comprimidos (`COMPRESSION_EXCLUDED_TYPES`: imágenes, video, audio, zip...).
+	"""
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+		self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 512)
+		self.preferidas = getattr(settings, 'COMPRESSION_ENCODINGS', ['br', 'zstd', 'gzip'])
+		self.tipos_excluidos = tuple(getattr(settings, 'COMPRESSION_EXCLUDED_TYPES', ('image/', 'video/', 'audio/')))
+		self.prefijo_media = '/' + settings.MEDIA_URL.lstrip('/') if settings.MEDIA_URL else None
+
+	def _comprimible(self, request, response) -> bool:
+		if response.status_code != 200 or response.has_header('Content-Encoding'):
+			return False
+		if self.prefijo_media and request.path.startswith(self.prefijo_media):
+			return False
+		content_type = response.get('Content-Type', '').lower()
+		if content_type.startswith(self.tipos_excluidos):
+			return False
+		return response.streaming or len(response.content) >= self.min_size
+
+	def __call__(self, request):
+		response = self.get_response(request)
+		if not self._comprimible(request, response):
+			return response
+
+		patch_vary_headers(response, ('Accept-Encoding',))
+		codificacion = elegir_codificacion(request.headers.get('Accept-Encoding', ''), self.preferidas)
+		if codificacion is None:
+			return response
+
+		if response.streaming:
+			if response.is_async:
+				response.streaming_content = comprimir_flujo_async(codificacion, response.streaming_content)
+			else:
+				response.streaming_content = comprimir_flujo(codificacion, response.streaming_content)
+			if response.has_header('Content-Length'):
+				del response['Content-Length']
+		else:
+			comprimido = comprimir(codificacion, response.content)
+			if len(comprimido) >= len(response.content):
+				return response
+			response.content = comprimido
+			response['Content-Length'] = str(len(comprimido))
+
+		# El cuerpo cambia: el ETag pasa a débil (como GZipMiddleware de Django)
+		etag = response.get('ETag')
+		if etag and etag.startswith('"'):
+			response['ETag'] = 'W/' + etag
+		response['Content-Encoding'] = codificacion
+		return response
+
+
+class ArchivosSubidosMiddleware:
+	"""Carga `request.POST` y `request.FILES` de los PUT/PATCH/DELETE multipart.
+
+	Django solo los arma en POST; reemplaza a `fix_request_files_middleware` de Ninja
+	(desactivado con `NINJA_FIX_REQUEST_FILES_METHODS` vacío) para que una subida rechazada
+	por `ValidarImagenUploadHandler` mientras se recibe responda con el renderer de la API
+	(JSON o MessagePack) y su código (400 o 413), como en los POST, donde la lee la vista y la
+	atrapa el handler de `core.urls`.
+	"""
+
+	METODOS = ('PUT', 'PATCH', 'DELETE')
+
+	def __init__(self, get_response):
+		self.get_response = get_response
+
+	def __call__(self, request):
+		if request.method in self.METODOS and request.content_type != 'application/json':
+			metodo = request.method
+			request.method = request.META['REQUEST_METHOD'] = 'POST'
+			try:
+				request._load_post_and_files()
+			except SubidaRechazada as exc:
+				return renderizar(request, {'success': False, 'error': str(exc)}, status=exc.status)
+			finally:
+				request.method = request.META['REQUEST_METHOD'] = metodo
+		return self.get_response(request)
@@ -1,9 +1,45 @@
 from django.db import models
 
+from core.utils.normalizar_texto import normalizar_texto
+
 # Create your models here.
 class BaseModel(models.Model):
     fecha_creacion = models.DateTimeField(auto_now_add=True)
     fecha_actualizacion = models.DateTimeField(auto_now=True)
 
+    # Campos de texto con una columna normalizada (minúsculas, sin acentos ni espacios
+    # repetidos) que se mantiene al guardar: {'nombre': 'nombre_normalizado'}
+    CAMPOS_NORMALIZADOS = {}
+
     class Meta:
         abstract = True
+
+    def normalizar_campos(self):
+        """Recalcula las columnas normalizadas; llamar antes de un bulk_create/bulk_update."""
+        for campo, destino in self.CAMPOS_NORMALIZADOS.items():
+            setattr(self, destino, normalizar_texto(getattr(self, campo)))
+
+    def save(self, *args, **kwargs):
+        self.normalizar_campos()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for campo, destino in self.CAMPOS_NORMALIZADOS.items():
+                if campo in update_fields:
+                    update_fields.add(destino)
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+
+class ArchivoMedia(BaseModel):
+    """Archivo del storage compartido por varios registros (imágenes deduplicadas por contenido).
+
+    `referencias` cuenta cuántos lo usan; `core.utils.delete_image_file` solo borra el
+    archivo cuando se libera la última. Los archivos sin fila no se comparten.
+    """
+
+    nombre = models.CharField(max_length=255, unique=True)
+    referencias = models.PositiveIntegerField(default=1)
+
+    class Meta:
+        db_table = 'archivo_media'
@@ -54,6 +54,9 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.QueryBudgetMiddleware',
+    'core.middleware.ResponseCacheMiddleware',
     'django.middleware.security.SecurityMiddleware',
     #'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -61,7 +64,7 @@ MIDDLEWARE = [
     #'django.contrib.auth.middleware.AuthenticationMiddleware',
     #'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
-    "ninja.compatibility.files.fix_request_files_middleware",
+    'core.middleware.ArchivosSubidosMiddleware',
 ]
 
 ROOT_URLCONF = 'core.urls'
@@ -144,13 +147,38 @@ STATIC_URL = 'static/'
 MEDIA_URL = 'media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
-# Límites de subida de archivos: 50 MB por defecto
-# `DATA_UPLOAD_MAX_MEMORY_SIZE` controla el tamaño máximo total de los datos
-# en una petición que Django mantendrá en memoria. `None` = sin límite.
-DATA_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50 MB
+# Servido de media (core.views.servir_media): los nombres con hash de contenido se cachean
+# un año como inmutables y el resto `MEDIA_CACHE_MAX_AGE` segundos con revalidación.
+# `MEDIA_SENDFILE` delega el envío al servidor web: 'x-accel-redirect' (nginx, con una
+# location `internal` en `MEDIA_SENDFILE_PREFIJO` con alias a MEDIA_ROOT) o 'x-sendfile'
+# (Apache mod_xsendfile / lighttpd). Vacío: Django envía el archivo (con rangos).
+MEDIA_SERVIR = os.getenv('MEDIA_SERVIR', 'True').lower() in ('1', 'true', 'yes', 'on')
+MEDIA_CACHE_MAX_AGE = int(os.getenv('MEDIA_CACHE_MAX_AGE', '3600'))
+MEDIA_SENDFILE = os.getenv('MEDIA_SENDFILE', '') or None
+MEDIA_SENDFILE_PREFIJO = os.getenv('MEDIA_SENDFILE_PREFIJO', '/media-interna/')
+
+# Procesamiento de imágenes de productos fuera del request (producto.imagenes): hilos del
+# pool y máximo de subidas encoladas; con 0 workers se procesan al confirmar la transacción
+PRODUCTO_IMAGEN_WORKERS = int(os.getenv('PRODUCTO_IMAGEN_WORKERS', '2'))
+PRODUCTO_IMAGEN_COLA_MAX = int(os.getenv('PRODUCTO_IMAGEN_COLA_MAX', '50'))
+
+# Límites de subida de archivos
+# `DATA_UPLOAD_MAX_MEMORY_SIZE` controla el tamaño máximo de los datos de una petición sin
+# contar los archivos (campos de formulario, JSON). `None` = sin límite.
+DATA_UPLOAD_MAX_MEMORY_SIZE = 2 * 1024 * 1024  # 2 MB
 # `FILE_UPLOAD_MAX_MEMORY_SIZE` es el umbral en bytes para cargar archivos en memoria
 # (por encima se escriben a disco en archivos temporales).
-FILE_UPLOAD_MAX_MEMORY_SIZE = 50 * 1024 * 1024  # 50 MB
+FILE_UPLOAD_MAX_MEMORY_SIZE = 256 * 1024  # 256 KB
+FILE_UPLOAD_HANDLERS = [
+    'core.utils.upload_handlers.ValidarImagenUploadHandler',
+    'django.core.files.uploadhandler.MemoryFileUploadHandler',
+    'django.core.files.uploadhandler.TemporaryFileUploadHandler',
+]
+# Validación de imágenes subidas mientras se reciben (core.utils.upload_handlers): tamaño
+# máximo del archivo, formatos (según Pillow) y píxeles leídos de la cabecera
+IMAGEN_SUBIDA_MAX_BYTES = 50 * 1024 * 1024  # 50 MB
+IMAGEN_SUBIDA_FORMATOS = ('JPEG', 'MPO', 'PNG', 'WEBP')
+IMAGEN_SUBIDA_MAX_PIXELES = 64_000_000
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -165,3 +193,68 @@ CORS_ALLOWED_ORIGINS = [
     "https://almacen.rodolfogroero.com",
 ]
 
+
+# Cache en proceso de token -> usuario para AuthBearer (segundos / cantidad de entradas)
+AUTH_TOKEN_CACHE_TTL = int(os.getenv('AUTH_TOKEN_CACHE_TTL', '60'))
+AUTH_TOKEN_CACHE_MAXSIZE = int(os.getenv('AUTH_TOKEN_CACHE_MAXSIZE', '1024'))
+
+# Renderer de la API: orjson si está instalado y MessagePack con `Accept: application/msgpack`
+API_RENDERER = os.getenv('API_RENDERER', 'core.utils.renderers.FastRenderer')
+
+# Paginación de @paginate: limit/offset de siempre y modo cursor (keyset) con `?cursor=`
+NINJA_PAGINATION_CLASS = 'core.utils.keyset_pagination.KeysetPagination'
+# Los archivos de PUT/PATCH/DELETE los carga core.middleware.ArchivosSubidosMiddleware
+NINJA_FIX_REQUEST_FILES_METHODS = set()
+
+# Instrumentación de consultas por request (core.middleware.QueryBudgetMiddleware)
+QUERY_BUDGET_HEADERS = DEBUG
+QUERY_BUDGET_RAISE = os.getenv('QUERY_BUDGET_RAISE', 'False').lower() in ('1', 'true', 'yes', 'on')
+QUERY_BUDGET_N1_UMBRAL = 3
+
+# Backend de search_filter: 'auto' elige por motor (pg_trgm en PostgreSQL, icontains en el resto)
+# o ruta a una clase de core.utils.search_backends
+SEARCH_BACKEND = os.getenv('SEARCH_BACKEND', 'auto')
+
+# Índice invertido en memoria para las búsquedas de productos (producto.indice_busqueda)
+PRODUCTO_INDICE_BUSQUEDA = os.getenv('PRODUCTO_INDICE_BUSQUEDA', 'False').lower() in ('1', 'true', 'yes', 'on')
+PRODUCTO_INDICE_SINCRONIZAR_CADA = 10
+PRODUCTO_INDICE_MAX_IDS = 5000
+
+# Sincronización incremental (/productos/cambios): días que se conservan las bajas en
+# RegistroEliminado (purgar con `manage.py purgar_eliminados`) y segundos recientes que no se
+# entregan para no saltear transacciones que todavía no confirmaron
+CAMBIOS_RETENCION_DIAS = int(os.getenv('CAMBIOS_RETENCION_DIAS', '30'))
+CAMBIOS_MARGEN_SEGUNDOS = 5
+
+# Cada cuántos segundos los índices de /autocompletar aplican cambios de otros procesos
+AUTOCOMPLETAR_SINCRONIZAR_CADA = 10
+
+# Segundos que se cachean los conteos globales de /dashboard/estadisticas
+DASHBOARD_CONTADORES_TTL = 30
+
+# Cache de respuestas de listados (core.utils.response_cache). locmem es por proceso: con
+# varios workers usar un backend compartido (p. ej. FileBasedCache con RESPONSE_CACHE_LOCATION
+# apuntando a un directorio) para que las invalidaciones lleguen a todos
+RESPONSE_CACHE_ALIAS = 'respuestas'
+RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    RESPONSE_CACHE_ALIAS: {
+        'BACKEND': os.getenv('RESPONSE_CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('RESPONSE_CACHE_LOCATION', 'respuestas'),
+        'TIMEOUT': RESPONSE_CACHE_TTL,
+        'OPTIONS': {'MAX_ENTRIES': 2000},
+    },
+}
+
+# Compresión de respuestas (core.middleware.CompressionMiddleware): br y zstd solo si
+# están instalados brotli / zstandard; gzip siempre
+COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', '512'))
+COMPRESSION_ENCODINGS = ['br', 'zstd', 'gzip']
+COMPRESSION_EXCLUDED_TYPES = (
+    'image/', 'video/', 'audio/',
+    'application/zip', 'application/gzip', 'application/x-gzip', 'application/zstd', 'application/pdf',
+)
@@ -0,0 +1,21 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.utils.response_cache import invalidar_tags, tags_de
+
+
+# Al confirmar: invalidar antes dejaría que otro request cachee los datos viejos con la
+# versión nueva de los tags mientras la transacción sigue abierta
+@receiver(post_save)
+def invalidar_respuestas_al_guardar(sender, update_fields=None, **kwargs):
+	tags = tags_de(sender, update_fields)
+	if tags:
+		transaction.on_commit(lambda: invalidar_tags(*tags))
+
+
+@receiver(post_delete)
+def invalidar_respuestas_al_borrar(sender, **kwargs):
+	tags = tags_de(sender)
+	if tags:
+		transaction.on_commit(lambda: invalidar_tags(*tags))
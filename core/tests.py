@@ -0,0 +1,520 @@
+import base64
+import json
+import os
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import skipIf
+
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.core.files.uploadedfile import InMemoryUploadedFile, SimpleUploadedFile, TemporaryUploadedFile
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.utils import timezone
+
+from PIL import Image
+
+from core.middleware import ArchivosSubidosMiddleware
+from core.urls import api
+from core.utils.query_budget import PresupuestoConsultasTestMixin
+from core.utils.renderers import MEDIA_TYPE_MSGPACK, msgpack
+from pedido.models import Pedido as PedidoModel, PedidoDetalle as PedidoDetalleModel
+from producto.models import CategoriaProducto as CategoriaProductoModel, Producto as ProductoModel
+from proveedor.models import Proveedor as ProveedorModel
+from usuario.auth import _token_cache
+from usuario.models import Usuario as UsuarioModel
+
+# Sin caché de respuestas: cada request ejecuta la vista y sus consultas
+SIN_CACHE_RESPUESTAS = {
+	'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+	'respuestas': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+def _cursor(data) -> str:
+	return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii').rstrip('=')
+
+
+@override_settings(CACHES=SIN_CACHE_RESPUESTAS)
+class PresupuestoConsultasTest(PresupuestoConsultasTestMixin, TestCase):
+	"""Todos los GET de la API respetan el `@query_budget` que declaran."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = UsuarioModel.objects.create(
+			nombre='admin',
+			nombre_sucursal='central',
+			contrasena_hasheada=make_password('clave'),
+			rol=UsuarioModel.RolChoices.ADMIN_GENERAL,
+			token='token-admin',
+		)
+		cls.sucursal = UsuarioModel.objects.create(
+			nombre='sucursal',
+			nombre_sucursal='sucursal',
+			contrasena_hasheada=make_password('clave'),
+		)
+		categoria = CategoriaProductoModel.objects.create(nombre='Lácteos')
+		cls.proveedores = [ProveedorModel.objects.create(nombre=f'Proveedor {i}') for i in range(3)]
+		cls.productos = [
+			ProductoModel.objects.create(proveedor=proveedor, categoria=categoria, nombre=f'Producto {i}')
+			for i, proveedor in enumerate(cls.proveedores * 2)
+		]
+		cls.pedido = PedidoModel.objects.create(creado_por=cls.sucursal, usuario_destino=cls.admin)
+		for i, producto in enumerate(cls.productos):
+			PedidoDetalleModel.objects.create(pedido=cls.pedido, producto=producto, cantidad=i + 1)
+
+	def setUp(self):
+		_token_cache.clear()
+
+	def test_presupuestos_de_consultas(self):
+		resultado = self.comprobar_presupuestos(
+			api,
+			{
+				'usuario_id': self.sucursal.id,
+				'proveedor_id': self.proveedores[0].id,
+				'producto_id': self.productos[0].id,
+				'pedido_id': self.pedido.id,
+			},
+			{
+				'proveedores/autocompletar': {'q': 'Prov'},
+				'productos/autocompletar': {'q': 'Prod'},
+			},
+			HTTP_AUTHORIZATION='Bearer token-admin',
+		)
+		self.assertTrue(resultado['controlados'])
+		self.assertEqual(resultado['sin_presupuesto'], [])
+
+
+@override_settings(CACHES=SIN_CACHE_RESPUESTAS)
+class KeysetPaginationTest(TestCase):
+	"""Paginación de `@paginate` (core.utils.keyset_pagination) en /productos/listar_todos."""
+
+	URL = '/api/productos/listar_todos'
+
+	@classmethod
+	def setUpTestData(cls):
+		proveedor = ProveedorModel.objects.create(nombre='Proveedor')
+		for i in range(11):
+			ProductoModel.objects.create(proveedor=proveedor, nombre=f'Producto {i}')
+		# Orden del endpoint (-fecha_actualizacion) sin valores únicos: desempata el id
+		ProductoModel.objects.update(fecha_actualizacion=timezone.now())
+		cls.ids = set(ProductoModel.objects.values_list('id', flat=True))
+
+	def _pagina(self, **params):
+		response = self.client.get(self.URL, params)
+		self.assertEqual(response.status_code, 200)
+		return response.json()
+
+	def test_cursor_recorre_todas_las_filas_sin_repetir(self):
+		vistos = []
+		pagina = self._pagina(cursor='', limit=3)
+		paginas = [pagina]
+		while True:
+			vistos.extend(item['id'] for item in pagina['items'])
+			if not pagina['next']:
+				break
+			pagina = self._pagina(cursor=pagina['next'], limit=3)
+			paginas.append(pagina)
+		self.assertEqual(len(vistos), len(self.ids))
+		self.assertEqual(set(vistos), self.ids)
+		self.assertEqual(len(paginas), 4)
+
+		# Volviendo con `previous` desde la última página se obtienen las mismas páginas
+		anterior = self._pagina(cursor=paginas[-1]['previous'], limit=3)
+		self.assertEqual(
+			[item['id'] for item in anterior['items']],
+			[item['id'] for item in paginas[-2]['items']],
+		)
+
+	def test_modo_offset_incluye_count(self):
+		pagina = self._pagina(limit=3, offset=3)
+		self.assertEqual(pagina['count'], len(self.ids))
+		self.assertEqual(len(pagina['items']), 3)
+		self.assertIsNotNone(pagina['next'])
+
+	def test_modo_cursor_sin_count(self):
+		pagina = self._pagina(cursor='', limit=3)
+		self.assertIsNone(pagina['count'])
+		self.assertIsNone(pagina['previous'])
+
+	def test_cursor_invalido_es_error_del_cliente(self):
+		cursores = [
+			'no-es-base64!',
+			_cursor({'d': 'next', 'v': ['x', 'y']}),
+			_cursor({'d': 'next', 'v': [None, 1]}),
+			_cursor({'d': 'next', 'v': [[1], {}]}),
+			_cursor({'d': 'arriba', 'v': ['2026-01-01T00:00:00+00:00', 1]}),
+			_cursor({'d': 'next', 'v': ['2026-01-01T00:00:00+00:00']}),
+			_cursor(['next']),
+		]
+		for cursor in cursores:
+			with self.subTest(cursor=cursor):
+				response = self.client.get(self.URL, {'cursor': cursor})
+				self.assertEqual(response.status_code, 422)
+				self.assertEqual(response.json()['detail'], [{'cursor': 'Cursor inválido'}])
+
+
+@override_settings(CACHES=SIN_CACHE_RESPUESTAS)
+class ConditionalGetTest(TestCase):
+	"""`@conditional_get` (core.utils.conditional_get): 304 con ETag vigente, nuevo ETag tras escrituras."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = UsuarioModel.objects.create(
+			nombre='admin',
+			nombre_sucursal='central',
+			contrasena_hasheada=make_password('clave'),
+			rol=UsuarioModel.RolChoices.ADMIN_GENERAL,
+			token='token-admin',
+		)
+		cls.sucursal = UsuarioModel.objects.create(
+			nombre='sucursal',
+			nombre_sucursal='sucursal',
+			contrasena_hasheada=make_password('clave'),
+			token='token-sucursal',
+		)
+		cls.otra_sucursal = UsuarioModel.objects.create(
+			nombre='otra',
+			nombre_sucursal='otra',
+			contrasena_hasheada=make_password('clave'),
+			token='token-otra',
+		)
+		cls.categoria = CategoriaProductoModel.objects.create(nombre='Lácteos')
+		cls.proveedor = ProveedorModel.objects.create(nombre='Proveedor')
+		cls.producto = ProductoModel.objects.create(proveedor=cls.proveedor, categoria=cls.categoria, nombre='Leche')
+		cls.pedido = PedidoModel.objects.create(creado_por=cls.sucursal, usuario_destino=cls.admin)
+		cls.detalle = PedidoDetalleModel.objects.create(pedido=cls.pedido, producto=cls.producto, cantidad=2)
+
+	def setUp(self):
+		_token_cache.clear()
+
+	def _etag(self, url, **extra):
+		response = self.client.get(url, **extra)
+		self.assertEqual(response.status_code, 200)
+		self.assertIn('no-cache', response['Cache-Control'])
+		return response['ETag']
+
+	def test_etag_vigente_responde_304_sin_cuerpo(self):
+		url = '/api/productos/listar_todos'
+		etag = self._etag(url)
+		response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+		self.assertEqual(response.status_code, 304)
+		self.assertEqual(response.content, b'')
+		self.assertEqual(response['ETag'], etag)
+
+		# Otros query params son otra representación
+		self.assertEqual(self.client.get(url, {'limit': 5}, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+	def test_escrituras_en_cada_modelo_cambian_el_etag(self):
+		url = '/api/productos/listar_todos'
+		escrituras = [
+			('producto editado', lambda: self.producto.save()),
+			('proveedor editado', lambda: self.proveedor.save()),
+			('categoría editada', lambda: self.categoria.save()),
+			('producto creado', lambda: ProductoModel.objects.create(proveedor=self.proveedor, nombre='Queso')),
+			# SET_NULL en los productos no toca su fecha_actualizacion: cambia el conteo
+			('categoría borrada', lambda: CategoriaProductoModel.objects.filter(id=self.categoria.id).delete()),
+		]
+		etag = self._etag(url)
+		for nombre, escribir in escrituras:
+			with self.subTest(nombre):
+				escribir()
+				response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+				self.assertEqual(response.status_code, 200)
+				self.assertNotEqual(response['ETag'], etag)
+				etag = response['ETag']
+
+	def test_obtener_pedido_cambia_etag_con_pedido_y_lineas(self):
+		url = f'/api/pedidos/obtener/{self.pedido.id}'
+		auth = {'HTTP_AUTHORIZATION': 'Bearer token-sucursal'}
+		etag = self._etag(url, **auth)
+		self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag, **auth).status_code, 304)
+
+		escrituras = [
+			('línea actualizada', lambda: self.client.patch(
+				f'/api/pedidos/productos_pedido/actualizar/{self.detalle.id}',
+				{'cantidad': 5},
+				content_type='application/json',
+				**auth,
+			)),
+			('estado', lambda: PedidoModel.objects.get(id=self.pedido.id).save()),
+			('usuario destino', lambda: self.admin.save()),
+		]
+		for nombre, escribir in escrituras:
+			with self.subTest(nombre):
+				escribir()
+				_token_cache.clear()
+				response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, **auth)
+				self.assertEqual(response.status_code, 200)
+				self.assertNotEqual(response['ETag'], etag)
+				etag = response['ETag']
+
+	def test_etag_valido_no_saltea_permisos(self):
+		url = f'/api/pedidos/obtener/{self.pedido.id}'
+		etag = self._etag(url, HTTP_AUTHORIZATION='Bearer token-sucursal')
+		response = self.client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_AUTHORIZATION='Bearer token-otra')
+		self.assertEqual(response.status_code, 403)
+		self.assertNotIn('ETag', response)
+
+
+# Caché de respuestas en memoria y aislada de los demás tests
+CON_CACHE_RESPUESTAS = {
+	'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+	'respuestas': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tests-respuestas'},
+}
+
+
+@override_settings(CACHES=CON_CACHE_RESPUESTAS)
+class ResponseCacheTest(TestCase):
+	"""`@cache_response` (core.utils.response_cache): variantes por usuario/rol e invalidación."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admins = [
+			UsuarioModel.objects.create(
+				nombre=f'admin {i}',
+				nombre_sucursal=f'central {i}',
+				contrasena_hasheada=make_password('clave'),
+				rol=UsuarioModel.RolChoices.ADMIN_GENERAL,
+				token=f'token-admin-{i}',
+			)
+			for i in range(2)
+		]
+		cls.sucursales = [
+			UsuarioModel.objects.create(
+				nombre=f'sucursal {i}',
+				nombre_sucursal=f'sucursal {i}',
+				contrasena_hasheada=make_password('clave'),
+				token=f'token-sucursal-{i}',
+			)
+			for i in range(2)
+		]
+		cls.proveedor = ProveedorModel.objects.create(nombre='Proveedor')
+		cls.producto = ProductoModel.objects.create(proveedor=cls.proveedor, nombre='Leche')
+		cls.pedido = PedidoModel.objects.create(creado_por=cls.sucursales[0])
+
+	def setUp(self):
+		caches['respuestas'].clear()
+		_token_cache.clear()
+
+	def _get(self, url, token=None):
+		extra = {'HTTP_AUTHORIZATION': f'Bearer {token}'} if token else {}
+		return self.client.get(url, **extra)
+
+	def test_variar_por_usuario(self):
+		url = '/api/pedidos/mis_pedidos_hechos'
+		primera = self._get(url, 'token-sucursal-0')
+		self.assertEqual(primera['X-Response-Cache'], 'MISS')
+		self.assertEqual([p['id'] for p in primera.json()['items']], [self.pedido.id])
+
+		repetida = self._get(url, 'token-sucursal-0')
+		self.assertEqual(repetida['X-Response-Cache'], 'HIT')
+		self.assertEqual(repetida.content, primera.content)
+
+		otro = self._get(url, 'token-sucursal-1')
+		self.assertEqual(otro['X-Response-Cache'], 'MISS')
+		self.assertEqual(otro.json()['items'], [])
+
+	def test_variar_por_rol_no_saltea_permisos(self):
+		url = '/api/pedidos/listar_todos'
+		self.assertEqual(self._get(url, 'token-admin-0')['X-Response-Cache'], 'MISS')
+		# Mismo rol: comparten la respuesta cacheada
+		self.assertEqual(self._get(url, 'token-admin-1')['X-Response-Cache'], 'HIT')
+
+		# `requiere_admin` va antes de la caché: otro rol no llega a la respuesta cacheada
+		response = self._get(url, 'token-sucursal-0')
+		self.assertEqual(response.status_code, 403)
+		self.assertNotIn('X-Response-Cache', response)
+		self.assertEqual(self._get('/api/usuarios/listar_todos', 'token-sucursal-0').status_code, 403)
+		self.assertEqual(self._get(url).status_code, 401)
+
+	def test_escritura_invalida_al_confirmar(self):
+		url = '/api/productos/listar_todos'
+		self.assertEqual(self._get(url)['X-Response-Cache'], 'MISS')
+		self.assertEqual(self._get(url)['X-Response-Cache'], 'HIT')
+
+		with self.captureOnCommitCallbacks() as callbacks:
+			ProductoModel.objects.create(proveedor=self.proveedor, nombre='Queso')
+			# Sin confirmar, la versión de los tags no cambia
+			self.assertEqual(self._get(url)['X-Response-Cache'], 'HIT')
+		for callback in callbacks:
+			callback()
+
+		response = self._get(url)
+		self.assertEqual(response['X-Response-Cache'], 'MISS')
+		self.assertEqual(response.json()['count'], 2)
+
+	def test_totales_recalculados_invalidan_pedidos(self):
+		url = '/api/pedidos/mis_pedidos_hechos'
+		self._get(url, 'token-sucursal-0')
+		self.assertEqual(self._get(url, 'token-sucursal-0')['X-Response-Cache'], 'HIT')
+
+		with self.captureOnCommitCallbacks(execute=True):
+			response = self.client.post(
+				'/api/pedidos/productos_pedido/guardar_lote',
+				{'pedido_id': self.pedido.id, 'items': [{'producto_id': self.producto.id, 'cantidad': 3}]},
+				content_type='application/json',
+				HTTP_AUTHORIZATION='Bearer token-sucursal-0',
+			)
+		self.assertEqual(response.status_code, 200)
+
+		response = self._get(url, 'token-sucursal-0')
+		self.assertEqual(response['X-Response-Cache'], 'MISS')
+		self.assertEqual(response.json()['items'][0]['total_cantidad'], 3)
+
+
+class ArchivosSubidosTest(TestCase):
+	"""Validación de subidas mientras se reciben (core.utils.upload_handlers) en POST y PUT/PATCH."""
+
+	@classmethod
+	def setUpTestData(cls):
+		UsuarioModel.objects.create(
+			nombre='admin',
+			nombre_sucursal='central',
+			contrasena_hasheada=make_password('clave'),
+			rol=UsuarioModel.RolChoices.ADMIN_GENERAL,
+			token='token-admin',
+		)
+		cls.proveedor = ProveedorModel.objects.create(nombre='Proveedor')
+		cls.producto = ProductoModel.objects.create(proveedor=cls.proveedor, nombre='Leche')
+		contenido = BytesIO()
+		Image.new('RGB', (64, 64), 'red').save(contenido, 'JPEG')
+		cls.imagen = contenido.getvalue()
+
+	def setUp(self):
+		_token_cache.clear()
+
+	def _multipart(self, metodo, url, contenido, **extra):
+		datos = {'data': json.dumps({'proveedor_id': self.proveedor.id, 'nombre': 'Queso'}), 'imagen': SimpleUploadedFile('foto.jpg', contenido)}
+		return self.client.generic(
+			metodo, url, encode_multipart(BOUNDARY, datos), content_type=MULTIPART_CONTENT,
+			HTTP_AUTHORIZATION='Bearer token-admin', **extra,
+		)
+
+	def test_archivo_que_no_es_imagen_responde_400(self):
+		for metodo, url in (('POST', '/api/productos/crear'), ('PATCH', f'/api/productos/actualizar/{self.producto.id}')):
+			with self.subTest(metodo):
+				response = self._multipart(metodo, url, b'esto no es una imagen')
+				self.assertEqual(response.status_code, 400)
+				self.assertTrue(response['Content-Type'].startswith('application/json'))
+				self.assertEqual(response.json(), {'success': False, 'error': '"foto.jpg" no es una imagen válida'})
+
+	@override_settings(IMAGEN_SUBIDA_MAX_BYTES=1024)
+	def test_archivo_demasiado_grande_responde_413(self):
+		for metodo, url in (('POST', '/api/productos/crear'), ('PATCH', f'/api/productos/actualizar/{self.producto.id}')):
+			with self.subTest(metodo):
+				response = self._multipart(metodo, url, self.imagen + b'\0' * 4096)
+				self.assertEqual(response.status_code, 413)
+				self.assertFalse(response.json()['success'])
+
+	@skipIf(msgpack is None, 'msgpack no instalado')
+	def test_rechazo_en_patch_usa_el_renderer_de_la_api(self):
+		response = self._multipart(
+			'PATCH', f'/api/productos/actualizar/{self.producto.id}', b'esto no es una imagen',
+			HTTP_ACCEPT=MEDIA_TYPE_MSGPACK,
+		)
+		self.assertEqual(response.status_code, 400)
+		self.assertEqual(response['Content-Type'], MEDIA_TYPE_MSGPACK)
+		self.assertFalse(msgpack.unpackb(response.content)['success'])
+
+	def test_archivo_mayor_al_umbral_de_memoria_va_a_disco(self):
+		recibidos = []
+
+		def vista(request):
+			recibidos.append(request.FILES['imagen'])
+			return HttpResponse()
+
+		middleware = ArchivosSubidosMiddleware(vista)
+		contenido = self.imagen + b'\0' * 4096
+		# El umbral se compara con el largo de todo el cuerpo multipart
+		for umbral, clase in ((len(contenido) - 1, TemporaryUploadedFile), (2 * len(contenido), InMemoryUploadedFile)):
+			with self.subTest(umbral=umbral), override_settings(FILE_UPLOAD_MAX_MEMORY_SIZE=umbral):
+				request = RequestFactory().generic(
+					'PATCH', '/', encode_multipart(BOUNDARY, {'imagen': SimpleUploadedFile('foto.jpg', contenido)}),
+					content_type=MULTIPART_CONTENT,
+				)
+				self.assertEqual(middleware(request).status_code, 200)
+				self.assertIsInstance(recibidos[-1], clase)
+				self.assertEqual(recibidos[-1].size, len(contenido))
+				self.assertEqual(request.method, 'PATCH')
+
+
+class ServirMediaTest(TestCase):
+	"""`core.views.servir_media`: validadores, caché inmutable, rangos y envío por el servidor web."""
+
+	HASH = 'ab' * 32
+	CONTENIDO = bytes(range(100))
+
+	def setUp(self):
+		media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		contexto = override_settings(MEDIA_ROOT=media)
+		contexto.__enter__()
+		self.addCleanup(contexto.__exit__, None, None, None)
+		for nombre in ('productos/foto.jpg', f'productos/variantes/{self.HASH}_thumb.webp', 'copia.tar.gz'):
+			ruta = os.path.join(media, nombre)
+			os.makedirs(os.path.dirname(ruta), exist_ok=True)
+			with open(ruta, 'wb') as archivo:
+				archivo.write(self.CONTENIDO)
+
+	def _contenido(self, response):
+		return b''.join(response.streaming_content) if response.streaming else response.content
+
+	def test_etag_vigente_responde_304(self):
+		response = self.client.get('/media/productos/foto.jpg')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self._contenido(response), self.CONTENIDO)
+		self.assertEqual(response['Content-Type'], 'image/jpeg')
+
+		no_modificado = self.client.get('/media/productos/foto.jpg', HTTP_IF_NONE_MATCH=response['ETag'])
+		self.assertEqual(no_modificado.status_code, 304)
+		self.assertEqual(no_modificado.content, b'')
+		self.assertEqual(no_modificado['ETag'], response['ETag'])
+
+	def test_immutable_solo_en_nombres_con_hash(self):
+		con_hash = self.client.get(f'/media/productos/variantes/{self.HASH}_thumb.webp')
+		self.assertEqual(con_hash['Cache-Control'], 'public, max-age=31536000, immutable')
+		with override_settings(MEDIA_CACHE_MAX_AGE=60):
+			sin_hash = self.client.get('/media/productos/foto.jpg')
+		self.assertEqual(sin_hash['Cache-Control'], 'public, max-age=60, must-revalidate')
+
+	def test_rangos(self):
+		for rango, contenido_rango, esperado in (
+			('bytes=10-19', 'bytes 10-19/100', self.CONTENIDO[10:20]),
+			('bytes=95-', 'bytes 95-99/100', self.CONTENIDO[95:]),
+			('bytes=-3', 'bytes 97-99/100', self.CONTENIDO[-3:]),
+		):
+			with self.subTest(rango):
+				response = self.client.get('/media/productos/foto.jpg', HTTP_RANGE=rango)
+				self.assertEqual(response.status_code, 206)
+				self.assertEqual(response['Content-Range'], contenido_rango)
+				self.assertEqual(response['Content-Length'], str(len(esperado)))
+				self.assertEqual(self._contenido(response), esperado)
+
+		# If-Range con otro ETag: se responde el archivo completo
+		response = self.client.get('/media/productos/foto.jpg', HTTP_RANGE='bytes=10-19', HTTP_IF_RANGE='"otro"')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self._contenido(response), self.CONTENIDO)
+
+	def test_rango_no_satisfacible_responde_416(self):
+		response = self.client.get('/media/productos/foto.jpg', HTTP_RANGE='bytes=100-')
+		self.assertEqual(response.status_code, 416)
+		self.assertEqual(response['Content-Range'], 'bytes */100')
+
+	def test_archivo_comprimido_sin_content_encoding(self):
+		response = self.client.get('/media/copia.tar.gz')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response['Content-Type'], 'application/gzip')
+		self.assertNotIn('Content-Encoding', response)
+		self.assertEqual(self._contenido(response), self.CONTENIDO)
+
+	@override_settings(MEDIA_SENDFILE='x-accel-redirect', MEDIA_SENDFILE_PREFIJO='/media-interna/')
+	def test_x_accel_redirect(self):
+		response = self.client.get('/media/productos/foto.jpg', HTTP_RANGE='bytes=10-19')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(response['X-Accel-Redirect'], '/media-interna/productos/foto.jpg')
+		self.assertEqual(response['Content-Type'], 'image/jpeg')
+		self.assertEqual(response.content, b'')
+		self.assertIn('ETag', response)
@@ -1,7 +1,10 @@
+import re
+
 from django.conf import settings
-from django.conf.urls.static import static
-from django.urls import path
-from ninja import NinjaAPI
+from django.urls import path, re_path
+from core.views import servir_media
+from core.utils.renderers import NegotiatingNinjaAPI, obtener_renderer
+from core.utils.upload_handlers import SubidaRechazada
 
 from usuario.api import router as usuario_router
 from proveedor.api import router as proveedor_router
@@ -11,7 +14,13 @@ from pedido.api import router as pedido_router
 from dashboard.api import router as dashboard_router
 
 
-api = NinjaAPI(title='Almacen API')
+api = NegotiatingNinjaAPI(title='Almacen API', renderer=obtener_renderer())
+
+
+@api.exception_handler(SubidaRechazada)
+def subida_rechazada(request, exc):
+    return api.create_response(request, {'success': False, 'error': str(exc)}, status=exc.status)
+
 
 api.add_router('/usuarios', usuario_router)
 api.add_router('/proveedores', proveedor_router)
@@ -24,4 +33,9 @@ urlpatterns = [
     path('api/', api.urls),
 ]
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+# Media servidos por Django (con MEDIA_SENDFILE solo arma los encabezados y el servidor web
+# envía el archivo); si MEDIA_URL es absoluta los sirve otro host/CDN
+if settings.MEDIA_SERVIR and not re.match(r'^(https?:)?//', settings.MEDIA_URL):
+    urlpatterns += [
+        re_path(rf'^{re.escape(settings.MEDIA_URL.lstrip("/"))}(?P<ruta>.+)$', servir_media),
+    ]
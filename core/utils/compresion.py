@@ -0,0 +1,102 @@
+import zlib
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+	import brotli
+except ImportError:  # pragma: no cover - dependencia opcional
+	brotli = None
+
+try:
+	import zstandard
+except ImportError:  # pragma: no cover - dependencia opcional
+	zstandard = None
+
+
+class _Gzip:
+	def __init__(self, nivel: int = 6):
+		self._compresor = zlib.compressobj(nivel, zlib.DEFLATED, 31)
+
+	def comprimir(self, datos: bytes) -> bytes:
+		# Z_SYNC_FLUSH: cada bloque sale completo sin cerrar el stream (streaming)
+		return self._compresor.compress(datos) + self._compresor.flush(zlib.Z_SYNC_FLUSH)
+
+	def terminar(self) -> bytes:
+		return self._compresor.flush()
+
+
+class _Brotli:
+	def __init__(self, nivel: int = 5):
+		self._compresor = brotli.Compressor(quality=nivel)
+
+	def comprimir(self, datos: bytes) -> bytes:
+		return self._compresor.process(datos) + self._compresor.flush()
+
+	def terminar(self) -> bytes:
+		return self._compresor.finish()
+
+
+class _Zstd:
+	def __init__(self, nivel: int = 3):
+		self._compresor = zstandard.ZstdCompressor(level=nivel).compressobj()
+
+	def comprimir(self, datos: bytes) -> bytes:
+		return self._compresor.compress(datos) + self._compresor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+	def terminar(self) -> bytes:
+		return self._compresor.flush()
+
+
+CODIFICACIONES_DISPONIBLES: Dict[str, type] = {'gzip': _Gzip}
+if brotli is not None:
+	CODIFICACIONES_DISPONIBLES['br'] = _Brotli
+if zstandard is not None:
+	CODIFICACIONES_DISPONIBLES['zstd'] = _Zstd
+
+
+def elegir_codificacion(accept_encoding: str, preferidas: List[str]) -> Optional[str]:
+	"""Codificación con mayor q en `Accept-Encoding`; a igual q, la primera de `preferidas`."""
+	aceptadas = {}
+	for parte in accept_encoding.split(','):
+		nombre, _, parametros = parte.strip().partition(';')
+		nombre = nombre.strip().lower()
+		if not nombre:
+			continue
+		q = 1.0
+		parametro = parametros.strip()
+		if parametro.startswith('q='):
+			try:
+				q = float(parametro[2:])
+			except ValueError:
+				q = 0.0
+		aceptadas[nombre] = q
+
+	comodin = aceptadas.get('*', 0.0)
+	elegida, mejor_q = None, 0.0
+	for codificacion in preferidas:
+		q = aceptadas.get(codificacion, comodin)
+		if codificacion in CODIFICACIONES_DISPONIBLES and q > mejor_q:
+			elegida, mejor_q = codificacion, q
+	return elegida
+
+
+def comprimir(codificacion: str, datos: bytes) -> bytes:
+	compresor = CODIFICACIONES_DISPONIBLES[codificacion]()
+	return compresor.comprimir(datos) + compresor.terminar()
+
+
+def comprimir_flujo(codificacion: str, bloques: Iterable[bytes]) -> Iterator[bytes]:
+	compresor = CODIFICACIONES_DISPONIBLES[codificacion]()
+	for bloque in bloques:
+		comprimido = compresor.comprimir(bloque)
+		if comprimido:
+			yield comprimido
+	yield compresor.terminar()
+
+
+async def comprimir_flujo_async(codificacion: str, bloques):
+	compresor = CODIFICACIONES_DISPONIBLES[codificacion]()
+	async for bloque in bloques:
+		comprimido = compresor.comprimir(bloque)
+		if comprimido:
+			yield comprimido
+	yield compresor.terminar()
@@ -1,11 +1,81 @@
 from __future__ import annotations
 
+import math
+import os
 from io import BytesIO
-from typing import Optional
+from typing import Dict, Optional, Tuple
 
 from django.core.files.base import ContentFile
 
 
+# Lado máximo de cada miniatura de compress_image_variantes
+VARIANTES_IMAGEN = {"thumb": 128, "medium": 512}
+
+_PARAMETROS_COMPRESION = {
+	"max_size_kb": 100,
+	"initial_quality": 85,
+	"min_quality": 10,
+	"min_size_px": 64,
+	"quality_step": 5,
+	"scale_step": 0.75,
+	"max_iterations": 60,
+}
+
+
+def _soporta_webp() -> bool:
+	from PIL import features
+
+	return features.check("webp")
+
+
+def _guardar_jpeg(img, q) -> BytesIO:
+	buf = BytesIO()
+	img.save(
+		buf,
+		format="JPEG",
+		optimize=True,
+		quality=q,
+		progressive=True,
+		subsampling=1,  # 4:2:0
+	)
+	return buf
+
+
+def _guardar_webp(img, q) -> BytesIO:
+	buf = BytesIO()
+	img.save(buf, format="WEBP", quality=q, method=4)
+	return buf
+
+
+def _abrir_reducida(uploaded_file, max_width: int, max_height: int):
+	"""Abre la imagen decodificándola, si es JPEG, directamente a una fracción (1/2, 1/4, 1/8)
+	de su resolución que siga cubriendo `max_width` x `max_height` (`Image.draft`, escalado
+	en el dominio DCT): una foto de 24 MP nunca se carga completa en memoria.
+	"""
+	from PIL import Image, ImageOps
+
+	image = Image.open(uploaded_file)
+	# `draft` exige que ambos lados queden por encima de lo pedido: pedir el tamaño que tendría
+	# la imagen entrando en un cuadrado de `lado` (el lado mayor puede quedar vertical u
+	# horizontal tras aplicar la orientación EXIF)
+	lado = max(max_width, max_height)
+	factor = lado / max(image.size)
+	if factor < 1:
+		image.draft("RGB", (math.ceil(image.width * factor), math.ceil(image.height * factor)))
+	try:
+		image = ImageOps.exif_transpose(image)
+	except Exception:
+		pass
+	# JPEG y WebP sin transparencia: paleta, CMYK y canales alfa pasan a RGB
+	if image.mode not in ("RGB", "L"):
+		image = image.convert("RGB")
+
+	# Reducción inicial para evitar explosión de memoria
+	if image.width > max_width or image.height > max_height:
+		image.thumbnail((max_width, max_height), Image.LANCZOS)
+	return image
+
+
 def compress_image(
 	uploaded_file,
 	max_size_kb: int = 100,
@@ -20,66 +90,159 @@ def compress_image(
 ) -> ContentFile:
 	"""
 	Comprime/redimensiona hasta dejar la imagen ≤ `max_size_kb` (100 KB por defecto).
-	Estrategia: bajar calidad en pasos; si no alcanza, reducir dimensiones (75%) y reiniciar calidad.
-	Usa JPEG progresivo y subsampling para mayor compresión. Falla si supera `max_iterations` o si
-	las dimensiones quedarían por debajo de `min_size_px`.
+	Estrategia: elegir la escala más grande (`scale_step` ** k) en la que la imagen entra con
+	`min_quality`, estimando k por la relación de tamaños y ajustándolo por bisección, y en esa
+	escala la calidad más alta de la grilla `initial_quality`, `initial_quality - quality_step`,
+	..., `min_quality` que entra, también por bisección. Usa JPEG progresivo y subsampling para
+	mayor compresión. Falla si supera `max_iterations` codificaciones o si las dimensiones
+	quedarían por debajo de `min_size_px`.
 	"""
 	try:
-		from PIL import Image, ImageOps
+		import PIL  # noqa: F401
 	except Exception:
 		return uploaded_file
 
-	max_size_bytes = max_size_kb * 1024
+	base = _abrir_reducida(uploaded_file, max_width, max_height)
+	_, buffer, _ = _comprimir(
+		base, max_size_kb, initial_quality, min_quality, min_size_px, quality_step, scale_step, max_iterations
+	)
+	return _resultado(uploaded_file, buffer)
 
-	image = Image.open(uploaded_file)
-	try:
-		image = ImageOps.exif_transpose(image)
-	except Exception:
-		pass
-	if image.mode in ("RGBA", "LA"):
-		image = image.convert("RGB")
 
-	# Reducción inicial para evitar explosión de memoria
-	if image.width > max_width or image.height > max_height:
-		image.thumbnail((max_width, max_height), Image.LANCZOS)
+def compress_image_variantes(
+	uploaded_file,
+	tamanos: Optional[Dict[str, int]] = None,
+	calidad_variantes: int = 80,
+	nombre: Optional[str] = None,
+	**opciones,
+) -> Dict[str, Dict[str, ContentFile]]:
+	"""
+	Genera, decodificando la imagen una sola vez, `{variante: {formato: archivo}}`:
+	`'full'` es la imagen de `compress_image` (mismas `opciones`) en JPEG y en WebP a la misma
+	escala y calidad, y cada entrada de `tamanos` (por defecto `VARIANTES_IMAGEN`) una
+	miniatura que entra en un cuadrado de ese lado, en JPEG y WebP con `calidad_variantes`.
+	El JPEG está siempre; el WebP solo si Pillow lo soporta y pesa menos que el JPEG. Los
+	archivos se llaman `{nombre}.jpg`, `{nombre}_{variante}.webp`, etc.; por defecto `nombre`
+	es el del archivo subido sin extensión.
+	"""
+	from PIL import Image
+
+	max_width = opciones.pop("max_width", 2048)
+	max_height = opciones.pop("max_height", 2048)
+	parametros = {**_PARAMETROS_COMPRESION, **opciones}
+	nombre_base = nombre or os.path.splitext(os.path.basename(getattr(uploaded_file, "name", None) or "imagen"))[0]
 
-	def save_to_buffer(img, q) -> BytesIO:
-		buf = BytesIO()
-		img.save(
-			buf,
-			format="JPEG",
-			optimize=True,
-			quality=q,
-			progressive=True,
-			subsampling=1,  # 4:2:0
+	base = _abrir_reducida(uploaded_file, max_width, max_height)
+	completa, buffer, calidad = _comprimir(base, **parametros)
+	variantes = {"full": _formatos(completa, calidad, buffer, nombre_base)}
+
+	# De mayor a menor: cada miniatura se reduce desde la anterior y no desde la base
+	origen = base
+	for variante, lado in sorted((tamanos or VARIANTES_IMAGEN).items(), key=lambda item: -item[1]):
+		miniatura = origen.copy()
+		miniatura.thumbnail((lado, lado), Image.LANCZOS)
+		variantes[variante] = _formatos(
+			miniatura, calidad_variantes, _guardar_jpeg(miniatura, calidad_variantes), f"{nombre_base}_{variante}"
 		)
-		return buf
+		origen = miniatura
+	return variantes
+
+
+def _formatos(imagen, calidad: int, jpeg: BytesIO, nombre: str) -> Dict[str, ContentFile]:
+	formatos = {"jpeg": ContentFile(jpeg.getvalue(), name=f"{nombre}.jpg")}
+	if _soporta_webp():
+		webp = _guardar_webp(imagen, calidad)
+		if webp.tell() < jpeg.tell():
+			formatos["webp"] = ContentFile(webp.getvalue(), name=f"{nombre}.webp")
+	return formatos
 
-	current_quality = initial_quality
-	buffer = save_to_buffer(image, current_quality)
-	iterations = 0
 
-	while buffer.tell() > max_size_bytes:
-		iterations += 1
-		if iterations > max_iterations:
-			raise ValueError(
-				f"No se pudo comprimir la imagen por debajo de {max_size_kb} KB tras {max_iterations} intentos"
+def _comprimir(
+	base,
+	max_size_kb: int,
+	initial_quality: int,
+	min_quality: int,
+	min_size_px: int,
+	quality_step: int,
+	scale_step: float,
+	max_iterations: int,
+) -> Tuple[object, BytesIO, int]:
+	"""Búsqueda de escala y calidad de `compress_image`; devuelve la imagen escalada, su JPEG y la calidad."""
+	from PIL import Image
+
+	max_size_bytes = max_size_kb * 1024
+	calidades = list(range(initial_quality, min_quality, -quality_step)) + [min_quality]
+	codificaciones = 0
+	escaladas: Dict[int, object] = {}
+	# (k, calidad) -> buffer
+	resultados: Dict[Tuple[int, int], BytesIO] = {}
+
+	def escala(k: int):
+		if k not in escaladas:
+			factor = scale_step ** k
+			escaladas[k] = base if k == 0 else base.resize(
+				(int(base.width * factor), int(base.height * factor)), Image.LANCZOS
 			)
+		return escaladas[k]
 
-		# Primero bajar calidad
-		if current_quality > min_quality:
-			current_quality = max(min_quality, current_quality - quality_step)
-			buffer = save_to_buffer(image, current_quality)
-			continue
+	def codificar(k: int, q: int) -> BytesIO:
+		nonlocal codificaciones
+		if (k, q) not in resultados:
+			codificaciones += 1
+			if codificaciones > max_iterations:
+				raise ValueError(
+					f"No se pudo comprimir la imagen por debajo de {max_size_kb} KB tras {max_iterations} intentos"
+				)
+			resultados[(k, q)] = _guardar_jpeg(escala(k), q)
+		return resultados[(k, q)]
 
-		# Luego bajar dimensiones
-		new_w = int(image.width * scale_step)
-		new_h = int(image.height * scale_step)
-		if new_w < min_size_px or new_h < min_size_px:
+	def entra(k: int, q: int) -> bool:
+		return codificar(k, q).tell() <= max_size_bytes
+
+	# Caso común: entra sin tocar nada
+	if entra(0, calidades[0]):
+		return base, resultados[(0, calidades[0])], calidades[0]
+
+	# Mayor k permitido por `min_size_px`
+	k_max = 0
+	while min(base.width, base.height) * scale_step ** (k_max + 1) >= min_size_px:
+		k_max += 1
+
+	# Escala: k_falla no entra con min_quality, k_entra sí
+	k_falla, k_entra = -1, None
+	k = 0
+	while k_entra is None:
+		if entra(k, min_quality):
+			k_entra = k
+			break
+		k_falla = k
+		if k >= k_max:
 			raise ValueError("La imagen no pudo reducirse al tamaño requerido sin quedar demasiado pequeña")
-		image = image.resize((new_w, new_h), Image.LANCZOS)
-		current_quality = initial_quality
-		buffer = save_to_buffer(image, current_quality)
+		# El peso crece aproximadamente con la cantidad de píxeles (factor ** 2 por paso)
+		exceso = resultados[(k, min_quality)].tell() / max_size_bytes
+		pasos = math.ceil(math.log(exceso) / (-2 * math.log(scale_step)))
+		k = min(k_max, k + max(pasos, 1))
+	while k_entra - k_falla > 1:
+		medio = (k_falla + k_entra) // 2
+		if entra(medio, min_quality):
+			k_entra = medio
+		else:
+			k_falla = medio
+
+	# Calidad: índices en `calidades` (descendentes); `falla` no entra, `ok` sí
+	falla, ok = 0, len(calidades) - 1
+	if k_entra > 0 and entra(k_entra, calidades[0]):
+		ok = 0
+	while ok - falla > 1:
+		medio = (falla + ok) // 2
+		if entra(k_entra, calidades[medio]):
+			ok = medio
+		else:
+			falla = medio
+
+	return escala(k_entra), resultados[(k_entra, calidades[ok])], calidades[ok]
+
 
+def _resultado(uploaded_file, buffer: BytesIO) -> ContentFile:
 	file_name = getattr(uploaded_file, "name", None) or "imagen.jpg"
 	return ContentFile(buffer.getvalue(), name=file_name)
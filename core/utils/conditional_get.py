@@ -0,0 +1,100 @@
+import hashlib
+import inspect
+from datetime import datetime
+from functools import wraps
+from inspect import Parameter, Signature
+from typing import Callable, Optional, Tuple
+
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.http.response import HttpResponseBase
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from core.utils.renderers import acepta_msgpack
+
+# Parámetro que se agrega a la firma de la vista para recibir la respuesta temporal de Ninja
+_PARAM_RESPUESTA = 'respuesta_condicional'
+
+
+def _agregar_validadores(response, etag: str, timestamp: Optional[int], privado: bool) -> None:
+	response['ETag'] = etag
+	if timestamp is not None:
+		response['Last-Modified'] = http_date(timestamp)
+	# Los clientes guardan la respuesta pero la revalidan siempre
+	patch_cache_control(response, no_cache=True, **({'private': True} if privado else {}))
+
+
+def conditional_get(validador: Callable[..., Optional[Tuple[object, Optional[datetime]]]], privado: bool = False):
+	"""Decorator factory que responde 304 a GETs condicionales sin ejecutar la vista.
+
+	Usage:
+		@router.get('/listar_todos', response=List[Schema])
+		@query_budget(3)
+		@conditional_get(validador_modelos(Model))
+		@paginate
+		@search_filter(['nombre'])
+		def listar(request):
+			return Model.objects.all()
+
+	`validador(request, *args, **kwargs)` debe ser barato (p. ej. `Max('fecha_actualizacion')`
+	y conteo) y devolver `(clave, ultima_modificacion)` o `None` para no usar validación
+	(la vista se ejecuta normalmente). El ETag se deriva de la clave, el path y los query
+	params; con `If-None-Match`/`If-Modified-Since` vigentes se devuelve 304 sin la consulta
+	principal ni la serialización. Debe ir por encima de `@paginate`. Con `privado=True` la
+	respuesta se marca `private` (datos por usuario).
+	"""
+
+	def decorator(func: Callable):
+		@wraps(func)
+		def wrapper(request, *args, **kwargs):
+			respuesta = kwargs.pop(_PARAM_RESPUESTA, None)
+			validacion = validador(request, *args, **kwargs)
+			if validacion is None:
+				return func(request, *args, **kwargs)
+
+			clave, ultima_modificacion = validacion
+			consulta = sorted(request.GET.lists())
+			representacion = (request.path, consulta, acepta_msgpack(request), clave)
+			digest = hashlib.sha1(repr(representacion).encode('utf-8')).hexdigest()
+			etag = f'"{digest}"'
+			timestamp = int(ultima_modificacion.timestamp()) if ultima_modificacion else None
+
+			no_modificado = get_conditional_response(request, etag=etag, last_modified=timestamp)
+			if no_modificado is not None:
+				_agregar_validadores(no_modificado, etag, timestamp, privado)
+				return no_modificado
+
+			resultado = func(request, *args, **kwargs)
+			destino = resultado if isinstance(resultado, HttpResponseBase) else respuesta
+			if destino is not None and 200 <= destino.status_code < 300:
+				_agregar_validadores(destino, etag, timestamp, privado)
+			return resultado
+
+		try:
+			firma = inspect.signature(func)
+			parametros = list(firma.parameters.values())
+			parametros.append(Parameter(_PARAM_RESPUESTA, kind=Parameter.KEYWORD_ONLY, annotation=HttpResponse, default=None))
+			wrapper.__signature__ = Signature(parameters=parametros, return_annotation=firma.return_annotation)
+		except (TypeError, ValueError):
+			pass
+
+		return wrapper
+
+	return decorator
+
+
+def validador_modelos(*modelos):
+	"""Validador para listados que dependen de `modelos`: conteo y última `fecha_actualizacion` de cada uno."""
+
+	def validador(request, *args, **kwargs):
+		clave = []
+		ultimas = []
+		for modelo in modelos:
+			datos = modelo.objects.aggregate(total=Count('id'), ultima=Max('fecha_actualizacion'))
+			clave.append((modelo._meta.label, datos['total'], datos['ultima']))
+			if datos['ultima'] is not None:
+				ultimas.append(datos['ultima'])
+		return tuple(clave), max(ultimas, default=None)
+
+	return validador
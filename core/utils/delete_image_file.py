@@ -1,18 +1,81 @@
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterable, Optional
 
 from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F
+
+from core.models import ArchivoMedia
+
+
+def registrar_archivos(nombres: Iterable[str]) -> None:
+	"""Registra archivos recién guardados como compartidos, con una referencia cada uno."""
+	ArchivoMedia.objects.bulk_create([ArchivoMedia(nombre=nombre) for nombre in set(nombres)])
+
+
+def retener_archivos(nombres: Iterable[str]) -> bool:
+	"""Suma una referencia a cada archivo compartido.
+
+	Devuelve False sin cambiar nada si alguno ya no está registrado (se liberó su última
+	referencia y fue, o está siendo, borrado).
+	"""
+	nombres = set(nombres)
+	if not nombres:
+		return False
+	with transaction.atomic():
+		ids = list(ArchivoMedia.objects.select_for_update().filter(nombre__in=nombres).values_list('id', flat=True))
+		if len(ids) != len(nombres):
+			return False
+		ArchivoMedia.objects.filter(id__in=ids).update(referencias=F('referencias') + 1)
+	return True
+
+
+def _borrar_archivos(nombres: set) -> None:
+	# Un archivo liberado puede haberse vuelto a registrar antes de confirmarse la transacción
+	nombres = nombres - set(ArchivoMedia.objects.filter(nombre__in=nombres).values_list('nombre', flat=True))
+	for nombre in nombres:
+		if default_storage.exists(nombre):
+			default_storage.delete(nombre)
+
+
+def liberar_archivos(nombres: Iterable[str]) -> None:
+	"""Resta una referencia a cada archivo compartido y borra del storage los que quedan sin
+	ninguna y los que no son compartidos.
+
+	El borrado del storage espera a que se confirme la transacción en curso: si se revierte,
+	los archivos y sus referencias siguen intactos.
+	"""
+	nombres = {nombre for nombre in nombres if nombre}
+	if not nombres:
+		return
+
+	with transaction.atomic():
+		referencias = dict(
+			ArchivoMedia.objects.select_for_update().filter(nombre__in=nombres).values_list('nombre', 'referencias')
+		)
+		en_uso = {nombre for nombre, cantidad in referencias.items() if cantidad > 1}
+		if en_uso:
+			ArchivoMedia.objects.filter(nombre__in=en_uso).update(referencias=F('referencias') - 1)
+		if len(en_uso) < len(referencias):
+			ArchivoMedia.objects.filter(nombre__in=set(referencias) - en_uso).delete()
+
+	a_borrar = nombres - en_uso
+	if a_borrar:
+		transaction.on_commit(lambda: _borrar_archivos(a_borrar), robust=True)
 
 
 def delete_image_file(field_file: Optional[object]) -> None:
-	"""Elimina un archivo de imagen asociado a un ImageField si existe."""
+	"""Elimina un archivo de imagen asociado a un ImageField (o dado por su nombre) si existe.
+
+	Si el archivo es compartido (`core.models.ArchivoMedia`) solo resta una referencia y lo
+	borra al liberarse la última.
+	"""
 	if not field_file:
 		return
 
-	file_name = getattr(field_file, "name", None)
+	file_name = field_file if isinstance(field_file, str) else getattr(field_file, "name", None)
 	if not file_name:
 		return
 
-	if default_storage.exists(file_name):
-		default_storage.delete(file_name)
+	liberar_archivos([file_name])
@@ -0,0 +1,70 @@
+import csv
+import json
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F
+from django.http import StreamingHttpResponse
+
+FORMATOS_EXPORTACION = {
+	'ndjson': 'application/x-ndjson; charset=utf-8',
+	'csv': 'text/csv; charset=utf-8',
+}
+
+
+class _Eco:
+	"""Pseudo-archivo para `csv.writer`: devuelve la línea escrita en lugar de guardarla."""
+
+	def write(self, valor):
+		return valor
+
+
+def _lotes(lineas: Iterable[str], tamano: int) -> Iterator[str]:
+	lote = []
+	for linea in lineas:
+		lote.append(linea)
+		if len(lote) >= tamano:
+			yield ''.join(lote)
+			lote = []
+	if lote:
+		yield ''.join(lote)
+
+
+def _lineas_ndjson(filas: Iterable[dict], campos: List[str]) -> Iterator[str]:
+	encoder = DjangoJSONEncoder(ensure_ascii=False, separators=(',', ':'))
+	for fila in filas:
+		yield encoder.encode({campo: fila[campo] for campo in campos}) + '\n'
+
+
+def _lineas_csv(filas: Iterable[dict], campos: List[str]) -> Iterator[str]:
+	writer = csv.writer(_Eco())
+	yield writer.writerow(campos)
+	for fila in filas:
+		yield writer.writerow(['' if fila[campo] is None else fila[campo] for campo in campos])
+
+
+def respuesta_exportacion(
+	queryset,
+	campos: Dict[str, str],
+	formato: str,
+	nombre_archivo: str,
+	transformar: Optional[Callable[[dict], dict]] = None,
+	chunk_size: int = 2000,
+) -> StreamingHttpResponse:
+	"""Exporta `queryset` como NDJSON o CSV sin cargarlo entero en memoria.
+
+	`campos` mapea el nombre de la columna exportada a la ruta ORM (`'proveedor_nombre':
+	'proveedor__nombre'`). Las filas se leen con `.values()` e `.iterator(chunk_size)` y se
+	envían en bloques de `chunk_size` líneas. `transformar` permite ajustar cada fila.
+	"""
+	propios = [nombre for nombre, ruta in campos.items() if nombre == ruta]
+	renombrados = {nombre: F(ruta) for nombre, ruta in campos.items() if nombre != ruta}
+	filas = queryset.values(*propios, **renombrados).iterator(chunk_size=chunk_size)
+	if transformar:
+		filas = map(transformar, filas)
+
+	columnas = list(campos)
+	lineas = _lineas_csv(filas, columnas) if formato == 'csv' else _lineas_ndjson(filas, columnas)
+	response = StreamingHttpResponse(_lotes(lineas, chunk_size), content_type=FORMATOS_EXPORTACION[formato])
+	response['Content-Disposition'] = f'attachment; filename="{nombre_archivo}.{formato}"'
+	return response
@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from math import inf
+from typing import Any, List, Optional
+
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.db.models import F, Q, QuerySet
+from django.db.models import Field as ModelField
+from ninja import Field, Schema
+from ninja.conf import settings as ninja_settings
+from ninja.errors import ValidationError
+from ninja.pagination import PaginationBase
+
+_PREFIJO_CLAVE = '_keyset_'
+_CAMPOS_ID = ('id', '-id', 'pk', '-pk')
+
+
+def _serializar_valor(value):
+	if isinstance(value, (datetime, date, time)):
+		return value.isoformat()
+	if isinstance(value, Decimal):
+		return str(value)
+	raise TypeError(f'Tipo no soportado en cursor: {type(value).__name__}')
+
+
+def codificar_cursor(direccion: str, valores: List[Any]) -> str:
+	data = json.dumps({'d': direccion, 'v': valores}, default=_serializar_valor, separators=(',', ':'))
+	return base64.urlsafe_b64encode(data.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decodificar_cursor(cursor: str, campos: List[ModelField]) -> tuple[str, List[Any]]:
+	"""Dirección y valores del cursor, convertidos con `to_python()` del campo de cada clave de orden."""
+	try:
+		relleno = '=' * (-len(cursor) % 4)
+		data = json.loads(base64.urlsafe_b64decode(cursor + relleno).decode('utf-8'))
+		direccion, valores = data['d'], data['v']
+		if direccion not in ('next', 'prev') or not isinstance(valores, list) or len(valores) != len(campos):
+			raise ValueError('Cursor con forma inválida')
+		valores = [campo.to_python(valor) for campo, valor in zip(campos, valores)]
+		if any(valor is None for valor in valores):
+			raise ValueError('Cursor con valores nulos')
+	except (ValueError, binascii.Error, KeyError, TypeError, DjangoValidationError) as e:
+		raise ValidationError([{'cursor': 'Cursor inválido'}]) from e
+	return direccion, valores
+
+
+class KeysetPagination(PaginationBase):
+	"""Paginación limit/offset compatible con la de Ninja, más un modo cursor (keyset).
+
+	Sin `cursor` se comporta como `LimitOffsetPagination` (incluye `count`). Si se envía
+	`cursor` (vacío para la primera página) se pagina por keyset sobre el `order_by`
+	del QuerySet, con `id` como desempate (salvo en `values().annotate()` agrupados): no
+	hay COUNT(*) ni OFFSET, `count` es null y `next`/`previous` traen los cursores opacos
+	de la página siguiente/anterior.
+	Los campos de orden deben ser no nulos.
+	"""
+
+	class Input(Schema):
+		limit: int = Field(
+			ninja_settings.PAGINATION_PER_PAGE,
+			ge=1,
+			le=(ninja_settings.PAGINATION_MAX_LIMIT if ninja_settings.PAGINATION_MAX_LIMIT != inf else None),
+		)
+		offset: int = Field(0, ge=0)
+		cursor: Optional[str] = None
+
+	class Output(Schema):
+		items: List[Any]
+		count: Optional[int] = None
+		next: Optional[str] = None
+		previous: Optional[str] = None
+
+	def __init__(self, max_limit: int = ninja_settings.PAGINATION_MAX_LIMIT, **kwargs: Any) -> None:
+		self.max_limit = max_limit
+		super().__init__(**kwargs)
+
+	def paginate_queryset(self, queryset, pagination: Input, request, **params: Any) -> Any:
+		limit = min(pagination.limit, self.max_limit)
+
+		if not isinstance(queryset, QuerySet):
+			offset = pagination.offset
+			return {'items': queryset[offset:offset + limit], 'count': len(queryset)}
+
+		# Proyección de columnas pedida con ?fields= (core.utils.sparse_fields)
+		proyeccion = getattr(request, 'proyeccion_queryset', None)
+		if proyeccion is not None:
+			queryset = proyeccion(queryset)
+
+		orden = self._orden_keyset(queryset)
+		queryset = queryset.order_by(*orden).annotate(
+			**{f'{_PREFIJO_CLAVE}{i}': F(campo.lstrip('-')) for i, campo in enumerate(orden)}
+		)
+
+		if pagination.cursor is None:
+			offset = pagination.offset
+			items = list(queryset[offset:offset + limit + 1])
+			return {
+				'items': items[:limit],
+				'count': self._items_count(queryset),
+				'next': self._cursor('next', items[limit - 1], len(orden)) if len(items) > limit else None,
+				'previous': None,
+			}
+
+		if not pagination.cursor:
+			items = list(queryset[:limit + 1])
+			return {
+				'items': items[:limit],
+				'count': None,
+				'next': self._cursor('next', items[limit - 1], len(orden)) if len(items) > limit else None,
+				'previous': None,
+			}
+
+		campos = [queryset.query.annotations[f'{_PREFIJO_CLAVE}{i}'].output_field for i in range(len(orden))]
+		direccion, valores = decodificar_cursor(pagination.cursor, campos)
+		if direccion == 'next':
+			items = list(queryset.filter(self._filtro_keyset(orden, valores, adelante=True))[:limit + 1])
+			hay_mas = len(items) > limit
+			items = items[:limit]
+			return {
+				'items': items,
+				'count': None,
+				'next': self._cursor('next', items[-1], len(orden)) if hay_mas else None,
+				'previous': self._cursor('prev', items[0], len(orden)) if items else None,
+			}
+
+		orden_inverso = [campo.lstrip('-') if campo.startswith('-') else f'-{campo}' for campo in orden]
+		items = list(
+			queryset.filter(self._filtro_keyset(orden, valores, adelante=False)).order_by(*orden_inverso)[:limit + 1]
+		)
+		hay_mas = len(items) > limit
+		items = list(reversed(items[:limit]))
+		return {
+			'items': items,
+			'count': None,
+			'next': self._cursor('next', items[-1], len(orden)) if items else None,
+			'previous': self._cursor('prev', items[0], len(orden)) if hay_mas else None,
+		}
+
+	@staticmethod
+	def _orden_keyset(queryset: QuerySet) -> List[str]:
+		orden = [campo for campo in queryset.query.order_by if isinstance(campo, str) and campo != '?']
+		# En consultas agrupadas (values().annotate()) agregar `id` rompería el GROUP BY:
+		# el orden del endpoint debe ser único por sí mismo
+		if not isinstance(queryset.query.group_by, tuple) and not any(campo in _CAMPOS_ID for campo in orden):
+			orden.append('id')
+		return orden
+
+	@staticmethod
+	def _filtro_keyset(orden: List[str], valores: List[Any], adelante: bool) -> Q:
+		"""Condición lexicográfica `(k0, k1, ...) > / < (v0, v1, ...)` respetando la dirección de cada clave."""
+		filtro = Q()
+		iguales = {}
+		for i, campo in enumerate(orden):
+			ascendente = not campo.startswith('-')
+			lookup = 'gt' if ascendente == adelante else 'lt'
+			filtro |= Q(**iguales, **{f'{_PREFIJO_CLAVE}{i}__{lookup}': valores[i]})
+			iguales[f'{_PREFIJO_CLAVE}{i}'] = valores[i]
+		return filtro
+
+	@staticmethod
+	def _cursor(direccion: str, item, cantidad_claves: int) -> str:
+		if isinstance(item, dict):
+			valores = [item[f'{_PREFIJO_CLAVE}{i}'] for i in range(cantidad_claves)]
+		else:
+			valores = [getattr(item, f'{_PREFIJO_CLAVE}{i}') for i in range(cantidad_claves)]
+		return codificar_cursor(direccion, valores)
@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUTTLCache:
+	"""Caché LRU en memoria del proceso con expiración por TTL y acceso thread-safe.
+
+	Cuando se supera `maxsize` se descarta la entrada usada hace más tiempo; las
+	entradas con más de `ttl` segundos se consideran inexistentes al leerlas.
+	"""
+
+	def __init__(self, maxsize: int = 1024, ttl: float = 60.0, timer: Callable[[], float] = time.monotonic):
+		self.maxsize = maxsize
+		self.ttl = ttl
+		self._timer = timer
+		self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+		self._lock = threading.Lock()
+
+	def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+		with self._lock:
+			item = self._data.get(key)
+			if item is None:
+				return default
+			expira, value = item
+			if expira <= self._timer():
+				del self._data[key]
+				return default
+			self._data.move_to_end(key)
+			return value
+
+	def set(self, key: Hashable, value: Any) -> None:
+		if self.maxsize <= 0 or self.ttl <= 0:
+			return
+		with self._lock:
+			self._data[key] = (self._timer() + self.ttl, value)
+			self._data.move_to_end(key)
+			while len(self._data) > self.maxsize:
+				self._data.popitem(last=False)
+
+	def delete(self, key: Hashable) -> None:
+		with self._lock:
+			self._data.pop(key, None)
+
+	def delete_where(self, predicate: Callable[[Hashable, Any], bool]) -> None:
+		with self._lock:
+			for key in [k for k, (_, v) in self._data.items() if predicate(k, v)]:
+				del self._data[key]
+
+	def clear(self) -> None:
+		with self._lock:
+			self._data.clear()
+
+	def __len__(self) -> int:
+		return len(self._data)
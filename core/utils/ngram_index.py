@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Set
+
+from core.utils.normalizar_texto import normalizar_texto
+
+
+class NGramIndex:
+	"""Índice invertido de n-gramas en memoria para búsquedas por subcadena.
+
+	Cada documento es un texto normalizado asociado a un id entero. Los posting lists
+	son `array('q')` (8 bytes por entrada, sin objetos por id). Una consulta se parte en
+	tokens que deben aparecer todos (AND) como subcadena del documento: los n-gramas dan
+	los candidatos y el texto guardado confirma la coincidencia exacta.
+	"""
+
+	def __init__(self, n: int = 3):
+		self.n = n
+		self._postings: Dict[str, array] = {}
+		self._documentos: Dict[int, str] = {}
+		self._lock = threading.RLock()
+
+	def __len__(self) -> int:
+		return len(self._documentos)
+
+	def __contains__(self, doc_id: int) -> bool:
+		return doc_id in self._documentos
+
+	def ids(self) -> Set[int]:
+		with self._lock:
+			return set(self._documentos)
+
+	def _ngramas(self, texto: str) -> Set[str]:
+		n = self.n
+		ngramas = set()
+		for token in texto.split(' '):
+			if len(token) < n:
+				if token:
+					ngramas.add(token)
+				continue
+			for i in range(len(token) - n + 1):
+				ngramas.add(token[i:i + n])
+		return ngramas
+
+	def agregar(self, doc_id: int, texto: str) -> None:
+		"""Agrega o reemplaza el documento `doc_id`. `texto` puede venir sin normalizar."""
+		texto = normalizar_texto(texto)
+		with self._lock:
+			anterior = self._documentos.get(doc_id)
+			if anterior == texto:
+				return
+			if anterior is not None:
+				self._quitar_postings(doc_id, anterior)
+			self._documentos[doc_id] = texto
+			for ngrama in self._ngramas(texto):
+				posting = self._postings.get(ngrama)
+				if posting is None:
+					self._postings[ngrama] = array('q', (doc_id,))
+				else:
+					posting.append(doc_id)
+
+	def quitar(self, doc_id: int) -> None:
+		with self._lock:
+			anterior = self._documentos.pop(doc_id, None)
+			if anterior is not None:
+				self._quitar_postings(doc_id, anterior)
+
+	def _quitar_postings(self, doc_id: int, texto: str) -> None:
+		for ngrama in self._ngramas(texto):
+			posting = self._postings.get(ngrama)
+			if posting is None:
+				continue
+			try:
+				posting.remove(doc_id)
+			except ValueError:
+				continue
+			if not posting:
+				del self._postings[ngrama]
+
+	def limpiar(self) -> None:
+		with self._lock:
+			self._postings.clear()
+			self._documentos.clear()
+
+	def cargar(self, documentos: Iterable[tuple[int, str]]) -> None:
+		"""Reemplaza todo el contenido del índice por `documentos`."""
+		with self._lock:
+			self.limpiar()
+			for doc_id, texto in documentos:
+				self.agregar(doc_id, texto)
+
+	def buscar(self, consulta: str) -> Optional[List[int]]:
+		"""Ids de documentos que contienen todos los tokens de `consulta`, ordenados.
+
+		Los tokens más cortos que `n` se ignoran si hay otros; si todos lo son devuelve
+		`None` para que el llamador resuelva la búsqueda por otro medio.
+		"""
+		tokens = [t for t in normalizar_texto(consulta).split(' ') if t]
+		largos = [t for t in tokens if len(t) >= self.n]
+		if not largos:
+			return None
+
+		with self._lock:
+			ngramas = set()
+			for token in largos:
+				ngramas |= self._ngramas(token)
+			postings = []
+			for ngrama in ngramas:
+				posting = self._postings.get(ngrama)
+				if not posting:
+					return []
+				postings.append(posting)
+			postings.sort(key=len)
+
+			candidatos = set(postings[0])
+			for posting in postings[1:]:
+				candidatos.intersection_update(posting)
+				if not candidatos:
+					return []
+
+			documentos = self._documentos
+			return sorted(
+				doc_id for doc_id in candidatos
+				if all(token in documentos[doc_id] for token in tokens)
+			)
@@ -0,0 +1,26 @@
+from __future__ import annotations
+
+import re
+import unicodedata
+from typing import List, Optional
+
+_NO_PALABRA = re.compile(r'[^\w\s]')
+_ESPACIOS = re.compile(r'\s+')
+
+
+def normalizar_texto(texto: Optional[str]) -> str:
+	"""Pasa a minúsculas, quita acentos, cambia puntuación por espacios y colapsa espacios.
+
+	Ejemplo: `'  Leche  Ñandú, 1L '` -> `'leche nandu 1l'`.
+	"""
+	if not texto:
+		return ''
+	texto = unicodedata.normalize('NFKD', texto.casefold())
+	texto = ''.join(c for c in texto if not unicodedata.combining(c))
+	texto = _NO_PALABRA.sub(' ', texto)
+	return _ESPACIOS.sub(' ', texto).strip()
+
+
+def tokenizar(texto: Optional[str]) -> List[str]:
+	normalizado = normalizar_texto(texto)
+	return normalizado.split(' ') if normalizado else []
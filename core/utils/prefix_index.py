@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left, insort
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.db.models import Count, Max
+
+from core.utils.normalizar_texto import normalizar_texto
+
+
+class PrefixIndex:
+	"""Índice de prefijos en memoria sobre un arreglo ordenado (búsqueda con `bisect`).
+
+	Cada registro se indexa por su texto normalizado completo y por cada sufijo que empieza
+	en una palabra, así `'desc'` encuentra `'Leche Descremada'`. Los resultados salen en
+	orden alfabético del texto normalizado y sin repetir ids.
+	"""
+
+	def __init__(self):
+		self._claves: List[Tuple[str, int]] = []
+		self._registros: Dict[int, Tuple[Any, List[str]]] = {}
+		self._lock = threading.RLock()
+
+	def __len__(self) -> int:
+		return len(self._registros)
+
+	def ids(self) -> set:
+		with self._lock:
+			return set(self._registros)
+
+	@staticmethod
+	def _claves_de(texto: str) -> List[str]:
+		palabras = normalizar_texto(texto).split(' ')
+		return [' '.join(palabras[i:]) for i in range(len(palabras)) if palabras[i]]
+
+	def agregar(self, registro_id: int, texto: str, datos: Any = None) -> None:
+		claves = self._claves_de(texto)
+		with self._lock:
+			self.quitar(registro_id)
+			self._registros[registro_id] = (datos, claves)
+			for clave in claves:
+				insort(self._claves, (clave, registro_id))
+
+	def quitar(self, registro_id: int) -> None:
+		with self._lock:
+			anterior = self._registros.pop(registro_id, None)
+			if anterior is None:
+				return
+			for clave in anterior[1]:
+				posicion = bisect_left(self._claves, (clave, registro_id))
+				if posicion < len(self._claves) and self._claves[posicion] == (clave, registro_id):
+					del self._claves[posicion]
+
+	def cargar(self, registros: Iterable[Tuple[int, str, Any]]) -> None:
+		"""Reemplaza el contenido completo; ordena una sola vez en lugar de insertar uno a uno."""
+		claves = []
+		nuevos = {}
+		for registro_id, texto, datos in registros:
+			claves_registro = self._claves_de(texto)
+			nuevos[registro_id] = (datos, claves_registro)
+			claves.extend((clave, registro_id) for clave in claves_registro)
+		claves.sort()
+		with self._lock:
+			self._claves = claves
+			self._registros = nuevos
+
+	def buscar(self, prefijo: str, limite: int = 10) -> List[Any]:
+		prefijo = normalizar_texto(prefijo)
+		if not prefijo:
+			return []
+		resultados = []
+		vistos = set()
+		with self._lock:
+			claves = self._claves
+			posicion = bisect_left(claves, (prefijo, -1))
+			while posicion < len(claves) and len(resultados) < limite:
+				clave, registro_id = claves[posicion]
+				if not clave.startswith(prefijo):
+					break
+				if registro_id not in vistos:
+					vistos.add(registro_id)
+					resultados.append(self._registros[registro_id][0])
+				posicion += 1
+		return resultados
+
+
+class ModelPrefixIndex:
+	"""`PrefixIndex` sobre un campo de texto de un modelo con `fecha_actualizacion`.
+
+	Se carga en la primera búsqueda; los cambios del propio proceso llegan por
+	`actualizar`/`quitar` (señales) y los de otros procesos se aplican cada
+	`AUTOCOMPLETAR_SINCRONIZAR_CADA` segundos comparando conteo y última actualización.
+	"""
+
+	def __init__(self, model, campo: str, campos_datos: Optional[List[str]] = None):
+		self.model = model
+		self.campo = campo
+		self.campos_datos = ['id', campo, *(campos_datos or [])]
+		self.indice = PrefixIndex()
+		self._lock = threading.Lock()
+		self._version = None
+		self._proxima_sincronizacion = 0.0
+
+	def _registros(self, queryset):
+		for datos in queryset.values(*self.campos_datos).iterator(chunk_size=5000):
+			yield datos['id'], datos[self.campo], datos
+
+	def _leer_version(self):
+		return self.model.objects.aggregate(total=Count('id'), ultima=Max('fecha_actualizacion'))
+
+	def _programar_sincronizacion(self):
+		self._proxima_sincronizacion = time.monotonic() + getattr(settings, 'AUTOCOMPLETAR_SINCRONIZAR_CADA', 10)
+
+	def sincronizar(self) -> None:
+		with self._lock:
+			version = self._leer_version()
+			anterior = self._version
+			if anterior is None:
+				self.indice.cargar(self._registros(self.model.objects.all()))
+			elif version != anterior:
+				if version['ultima'] is not None and version['ultima'] != anterior['ultima']:
+					cambiados = self.model.objects.all()
+					if anterior['ultima'] is not None:
+						cambiados = cambiados.filter(fecha_actualizacion__gt=anterior['ultima'])
+					for registro_id, texto, datos in self._registros(cambiados):
+						self.indice.agregar(registro_id, texto, datos)
+				if version['total'] != len(self.indice):
+					existentes = set(self.model.objects.values_list('id', flat=True).iterator(chunk_size=5000))
+					for registro_id in self.indice.ids() - existentes:
+						self.indice.quitar(registro_id)
+			self._version = version
+			self._programar_sincronizacion()
+
+	def buscar(self, prefijo: str, limite: int = 10) -> List[dict]:
+		if time.monotonic() >= self._proxima_sincronizacion:
+			self.sincronizar()
+		return self.indice.buscar(prefijo, limite)
+
+	def actualizar(self, instance) -> None:
+		if self._version is not None:
+			datos = {campo: getattr(instance, campo) for campo in self.campos_datos}
+			self.indice.agregar(instance.pk, datos[self.campo], datos)
+
+	def quitar(self, registro_id: int) -> None:
+		if self._version is not None:
+			self.indice.quitar(registro_id)
@@ -0,0 +1,104 @@
+import re
+from functools import wraps
+from typing import Optional
+
+# `<int:pedido_id>` en las rutas de Django
+_PARAMETRO_RUTA = re.compile(r'<(?:\w+:)?(\w+)>')
+# Vistas propias de Ninja (documentación y raíz), no son endpoints de la API
+_RUTAS_NINJA = ('openapi-json', 'openapi-view', 'api-root')
+
+
+class QueryBudgetExceeded(Exception):
+	"""Se lanza cuando un endpoint supera su presupuesto y `QUERY_BUDGET_RAISE` está activo."""
+
+
+def query_budget(max_queries: int):
+	"""Declara el máximo de consultas SQL que puede ejecutar un endpoint en toda la request.
+
+	Usage:
+		@router.get('/listar_todos', response=List[Schema])
+		@query_budget(3)
+		@paginate
+		def listar(request):
+			...
+
+	El presupuesto lo controla `core.middleware.QueryBudgetMiddleware` al final de la
+	request (incluye paginación, serialización y el cuerpo de las respuestas en streaming).
+	Con `QUERY_BUDGET_RAISE = True` un exceso lanza `QueryBudgetExceeded`; si no, se registra
+	como warning. En los tests, `PresupuestoConsultasTestMixin` los controla en todos los GET.
+	"""
+
+	def decorator(func):
+		@wraps(func)
+		def wrapper(request, *args, **kwargs):
+			request.query_budget = max_queries
+			return func(request, *args, **kwargs)
+
+		wrapper.query_budget = max_queries
+		return wrapper
+
+	return decorator
+
+
+class PresupuestoConsultasTestMixin:
+	"""Mixin de `django.test.TestCase` que controla los `@query_budget` de toda una NinjaAPI.
+
+	Usage:
+		class PresupuestosTest(PresupuestoConsultasTestMixin, TestCase):
+			def test_presupuestos(self):
+				self.comprobar_presupuestos(api, {'pedido_id': self.pedido.id}, HTTP_AUTHORIZATION='Bearer ...')
+
+	Recorre `api.urls`, hace un GET a cada ruta (los parámetros de ruta salen de
+	`parametros` y la query string de `parametros_get[ruta]`), consume el cuerpo (también en
+	streaming) y falla si una respuesta no es 200 o si la request ejecutó más consultas que el
+	`query_budget` que declaró su endpoint. Las rutas sin GET (405) se saltean.
+	"""
+
+	def comprobar_presupuestos(
+		self,
+		api,
+		parametros: dict,
+		parametros_get: Optional[dict] = None,
+		prefijo: str = '/api/',
+		**extra,
+	) -> dict:
+		"""Devuelve `{'controlados': [...], 'sin_presupuesto': [...]}` con las rutas recorridas."""
+		from django.db import connection
+		from django.test.utils import CaptureQueriesContext
+
+		patrones, _, _ = api.urls
+		rutas = []
+		for patron in patrones:
+			ruta = str(patron.pattern)
+			if ruta not in rutas and patron.name not in _RUTAS_NINJA:
+				rutas.append(ruta)
+
+		resultado = {'controlados': [], 'sin_presupuesto': []}
+		for ruta in rutas:
+			faltantes = [nombre for nombre in _PARAMETRO_RUTA.findall(ruta) if nombre not in parametros]
+			url = prefijo + _PARAMETRO_RUTA.sub(lambda m: str(parametros.get(m.group(1), 0)), ruta)
+
+			with self.subTest(ruta=ruta), CaptureQueriesContext(connection) as consultas:
+				response = self.client.get(url, (parametros_get or {}).get(ruta), **extra)
+				if response.status_code == 405:
+					continue
+				if response.streaming:
+					b''.join(response.streaming_content)
+				self.assertEqual(
+					response.status_code,
+					200,
+					f'GET {url} respondió {response.status_code}' + (f' (faltan parámetros {faltantes})' if faltantes else ''),
+				)
+
+				presupuesto = getattr(response.wsgi_request, 'query_budget', None)
+				if presupuesto is None:
+					resultado['sin_presupuesto'].append(ruta)
+					continue
+				resultado['controlados'].append(ruta)
+				self.assertLessEqual(
+					len(consultas),
+					presupuesto,
+					f'GET {url} ejecutó {len(consultas)} consultas (presupuesto {presupuesto}):\n'
+					+ '\n'.join(consulta['sql'] for consulta in consultas.captured_queries),
+				)
+		return resultado
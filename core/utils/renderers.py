@@ -0,0 +1,107 @@
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.module_loading import import_string
+from ninja import NinjaAPI
+from ninja.renderers import JSONRenderer
+
+try:
+	import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+	orjson = None
+
+try:
+	import msgpack
+except ImportError:  # pragma: no cover - dependencia opcional
+	msgpack = None
+
+MEDIA_TYPE_MSGPACK = 'application/msgpack'
+
+
+def acepta_msgpack(request) -> bool:
+	"""True si el cliente pidió MessagePack en `Accept` y la librería está instalada."""
+	if msgpack is None:
+		return False
+	aceptados = request.headers.get('Accept', '')
+	return any(parte.split(';')[0].strip() in (MEDIA_TYPE_MSGPACK, 'application/x-msgpack') for parte in aceptados.split(','))
+
+
+class FastRenderer(JSONRenderer):
+	"""Renderer JSON con orjson (si está instalado) y MessagePack bajo pedido.
+
+	El JSON contiene los mismos valores y formatos que el de `JSONRenderer`: fechas,
+	`Decimal` y enums se delegan en `NinjaJSONEncoder.default` (datetime ISO con
+	milisegundos y `Z`, Decimal como string). Solo cambian los espacios y que los
+	caracteres no ASCII van en UTF-8 en lugar de `\\uXXXX`. Si orjson no puede codificar
+	algo (p. ej. enteros de más de 64 bits) se usa el renderer estándar.
+	"""
+
+	def __init__(self):
+		self._default_encoder = self.encoder_class().default
+
+	def _default(self, o):
+		# Atajo para los tipos más frecuentes; mismo formato que DjangoJSONEncoder
+		if isinstance(o, datetime):
+			r = o.isoformat()
+			if o.microsecond:
+				r = r[:23] + r[26:]
+			if r.endswith('+00:00'):
+				r = r.removesuffix('+00:00') + 'Z'
+			return r
+		if isinstance(o, Decimal):
+			return str(o)
+		return self._default_encoder(o)
+
+	def media_type_para(self, request) -> str:
+		return MEDIA_TYPE_MSGPACK if acepta_msgpack(request) else self.media_type
+
+	def render(self, request, data: Any, *, response_status: int) -> Any:
+		if acepta_msgpack(request):
+			return msgpack.packb(data, default=self._default, use_bin_type=True)
+		if orjson is None:
+			return super().render(request, data, response_status=response_status)
+		try:
+			return orjson.dumps(
+				data,
+				default=self._default,
+				option=orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_SUBCLASS | orjson.OPT_NON_STR_KEYS,
+			)
+		except orjson.JSONEncodeError:
+			return super().render(request, data, response_status=response_status)
+
+
+class NegotiatingNinjaAPI(NinjaAPI):
+	"""`NinjaAPI` que toma el Content-Type de la respuesta del renderer según la request."""
+
+	def create_response(self, request, data, *, status=None, temporal_response=None):
+		response = super().create_response(request, data, status=status, temporal_response=temporal_response)
+		media_type_para = getattr(self.renderer, 'media_type_para', None)
+		if media_type_para is not None:
+			media_type = media_type_para(request)
+			if media_type != self.renderer.media_type:
+				response['Content-Type'] = media_type
+			patch_vary_headers(response, ['Accept'])
+		return response
+
+
+@lru_cache(maxsize=None)
+def obtener_renderer():
+	"""Instancia del renderer de `API_RENDERER` (la misma clase que usa la API)."""
+	return import_string(getattr(settings, 'API_RENDERER', 'core.utils.renderers.FastRenderer'))()
+
+
+def renderizar(request, data: Any, status: int = 200) -> HttpResponse:
+	"""Renderiza `data` como lo haría la API, para vistas que arman la respuesta ellas mismas."""
+	renderer = obtener_renderer()
+	media_type_para = getattr(renderer, 'media_type_para', None)
+	media_type = media_type_para(request) if media_type_para else renderer.media_type
+	content_type = f'{media_type}; charset={renderer.charset}' if media_type == renderer.media_type else media_type
+	response = HttpResponse(renderer.render(request, data, response_status=status), status=status, content_type=content_type)
+	if media_type_para:
+		patch_vary_headers(response, ['Accept'])
+	return response
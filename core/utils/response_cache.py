@@ -0,0 +1,126 @@
+import hashlib
+import uuid
+from functools import wraps
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+
+from core.utils.renderers import acepta_msgpack
+
+_PREFIJO = 'respuesta'
+
+# modelo -> [(tags, campos)]: qué tags invalida una escritura del modelo (ver core.signals)
+_TAGS_POR_MODELO: Dict[type, List[Tuple[Tuple[str, ...], Optional[frozenset]]]] = {}
+
+
+def _cache():
+	return caches[getattr(settings, 'RESPONSE_CACHE_ALIAS', 'default')]
+
+
+def _clave_tag(tag: str) -> str:
+	return f'{_PREFIJO}:tag:{tag}'
+
+
+def _versiones(tags: Iterable[str]) -> List[str]:
+	cache = _cache()
+	claves = [_clave_tag(tag) for tag in tags]
+	versiones = cache.get_many(claves)
+	for clave in claves:
+		if clave not in versiones:
+			cache.add(clave, uuid.uuid4().hex, None)
+			versiones[clave] = cache.get(clave)
+	return [versiones[clave] for clave in claves]
+
+
+def invalidar_tags(*tags: str) -> None:
+	"""Invalida todas las respuestas cacheadas con alguno de `tags` (cambia su versión)."""
+	_cache().set_many({_clave_tag(tag): uuid.uuid4().hex for tag in tags}, None)
+
+
+def registrar_tags(modelo, *tags: str, campos: Optional[Iterable[str]] = None) -> None:
+	"""Las escrituras y borrados de `modelo` invalidan `tags`.
+
+	Con `campos`, un `save(update_fields=...)` que no toca ninguno de ellos no invalida
+	(p. ej. el token de un usuario al hacer login).
+	"""
+	_TAGS_POR_MODELO.setdefault(modelo, []).append((tags, frozenset(campos) if campos else None))
+
+
+def tags_de(modelo, update_fields=None) -> set:
+	tags = set()
+	for tags_modelo, campos in _TAGS_POR_MODELO.get(modelo, ()):
+		if campos is None or update_fields is None or campos & set(update_fields):
+			tags.update(tags_modelo)
+	return tags
+
+
+def _variante(request, variar_por: Optional[str]):
+	if variar_por is None:
+		return None
+	usuario = getattr(request, 'auth', None)
+	if usuario is None:
+		return False
+	return usuario.id if variar_por == 'usuario' else getattr(usuario, variar_por)
+
+
+def cache_response(*tags: str, variar_por: Optional[str] = None, timeout=DEFAULT_TIMEOUT):
+	"""Decorator factory que cachea la respuesta ya renderizada de un GET.
+
+	Usage:
+		@router.get('/listar_todos', response=List[Schema])
+		@query_budget(3)
+		@cache_response('productos')
+		@paginate
+		@search_filter(['nombre'])
+		def listar(request):
+			return Model.objects.all()
+
+	La clave incluye path, query string (paginación y `busqueda` incluidas), el formato
+	negociado (JSON o MessagePack), la versión de cada tag y, con `variar_por='usuario'` o `'rol'`, el id o el rol de `request.auth`.
+	Los datos por usuario deben usar `variar_por='usuario'`: la respuesta cacheada se
+	entrega sin volver a ejecutar la vista ni sus controles de acceso.
+	En un acierto se devuelve el cuerpo guardado sin consultas ni serialización; en un
+	fallo `core.middleware.ResponseCacheMiddleware` guarda la respuesta si fue 200.
+	Las invalidaciones llegan por señales de los modelos registrados con `registrar_tags`,
+	al confirmarse la transacción de la escritura.
+	"""
+
+	def decorator(func):
+		@wraps(func)
+		def wrapper(request, *args, **kwargs):
+			variante = _variante(request, variar_por)
+			if request.method != 'GET' or variante is False:
+				return func(request, *args, **kwargs)
+
+			consulta = sorted(request.GET.lists())
+			datos = repr((request.path, consulta, variante, acepta_msgpack(request), _versiones(tags)))
+			clave = f'{_PREFIJO}:{hashlib.sha1(datos.encode("utf-8")).hexdigest()}'
+
+			guardada = _cache().get(clave)
+			if guardada is not None:
+				contenido, content_type = guardada
+				response = HttpResponse(contenido, content_type=content_type)
+				response['X-Response-Cache'] = 'HIT'
+				patch_vary_headers(response, ['Accept'])
+				return response
+
+			request.response_cache = (clave, timeout)
+			return func(request, *args, **kwargs)
+
+		return wrapper
+
+	return decorator
+
+
+def guardar_respuesta(request, response) -> None:
+	"""Guarda `response` si la vista se marcó con `cache_response` y la respuesta es cacheable."""
+	pendiente = getattr(request, 'response_cache', None)
+	if pendiente is None or response.status_code != 200 or response.streaming:
+		return
+	clave, timeout = pendiente
+	_cache().set(clave, (response.content, response['Content-Type']), timeout)
+	response['X-Response-Cache'] = 'MISS'
@@ -0,0 +1,90 @@
+from __future__ import annotations
+
+from typing import List, Optional
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist
+from django.db import connections
+from django.db.models import CharField, Q, QuerySet, TextField
+from django.db.models.lookups import IContains
+from django.utils.module_loading import import_string
+
+from core.utils.normalizar_texto import normalizar_texto
+
+
+class TrigramIContains(IContains):
+	"""`icontains` que en PostgreSQL genera `col ILIKE '%q%'` sobre la columna sin transformar.
+
+	El `icontains` de Django usa `UPPER(col::text) LIKE UPPER(...)`, que no aprovecha los
+	índices GIN `gin_trgm_ops` creados sobre la columna; `ILIKE` sí.
+	"""
+
+	lookup_name = 'trgm_icontains'
+
+	def as_postgresql(self, compiler, connection):
+		lhs_sql, params = self.process_lhs(compiler, connection)
+		rhs_sql, rhs_params = self.process_rhs(compiler, connection)
+		return f'{lhs_sql} ILIKE {rhs_sql}', (*params, *rhs_params)
+
+
+CharField.register_lookup(TrigramIContains)
+TextField.register_lookup(TrigramIContains)
+
+
+def ruta_normalizada(model, field: str) -> Optional[str]:
+	"""Ruta a la columna normalizada de `field` (p. ej. `proveedor__nombre_normalizado`), si existe."""
+	partes = field.split('__')
+	actual = model
+	try:
+		for parte in partes[:-1]:
+			actual = actual._meta.get_field(parte).related_model
+	except (FieldDoesNotExist, AttributeError):
+		return None
+	destino = getattr(actual, 'CAMPOS_NORMALIZADOS', {}).get(partes[-1])
+	return '__'.join([*partes[:-1], destino]) if destino else None
+
+
+class IContainsSearchBackend:
+	"""Búsqueda por defecto: `field__icontains` combinado con OR entre los campos.
+
+	Los campos con columna normalizada (`BaseModel.CAMPOS_NORMALIZADOS`) se comparan con
+	`contains` sobre esa columna y la búsqueda normalizada, sin distinguir acentos.
+	"""
+
+	lookup = 'icontains'
+
+	def filtro_campo(self, model, field: str, q: str) -> Q:
+		ruta = ruta_normalizada(model, field)
+		q_normalizada = normalizar_texto(q)
+		if ruta and q_normalizada:
+			return Q(**{f'{ruta}__contains': q_normalizada})
+		return Q(**{f'{field}__{self.lookup}': q})
+
+	def filtrar(self, queryset: QuerySet, fields: List[str], q: str) -> QuerySet:
+		filter_q = Q()
+		for field in fields:
+			filter_q |= self.filtro_campo(queryset.model, field, q)
+		return queryset.filter(filter_q)
+
+
+class PostgresTrigramSearchBackend(IContainsSearchBackend):
+	"""Búsqueda para PostgreSQL apoyada en índices GIN de pg_trgm.
+
+	Filtra con `ILIKE` (mismos resultados que `icontains`) o `LIKE` sobre las columnas
+	normalizadas, ambos resueltos por los índices GIN.
+	"""
+
+	lookup = 'trgm_icontains'
+
+
+_BACKENDS_POR_VENDOR = {
+	'postgresql': PostgresTrigramSearchBackend,
+}
+
+
+def obtener_backend_busqueda(using: str = 'default') -> IContainsSearchBackend:
+	"""Devuelve el backend de `SEARCH_BACKEND` o, con `'auto'`, el adecuado al motor de la BD."""
+	backend = getattr(settings, 'SEARCH_BACKEND', 'auto')
+	if backend != 'auto':
+		return import_string(backend)()
+	return _BACKENDS_POR_VENDOR.get(connections[using].vendor, IContainsSearchBackend)()
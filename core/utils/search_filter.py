@@ -1,14 +1,15 @@
 from functools import wraps
 from typing import Callable, List, Optional
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
 import re
 from urllib.parse import unquote_plus
 import inspect
 from inspect import Parameter, Signature
+from core.utils.search_backends import obtener_backend_busqueda
 
 
-def search_filter(fields: List[str], min_chars: int = 2):
-    """Decorator factory that applies a simple icontains search over given model fields.
+def search_filter(fields: List[str], min_chars: int = 2, backend=None):
+    """Decorator factory that applies a text search over given model fields.
 
     Usage:
         @router.get("/", response=list[Schema])
@@ -21,6 +22,11 @@ def search_filter(fields: List[str], min_chars: int = 2):
     It accepts an optional query param named `busqueda` (string). If `busqueda` is present
     and its length >= `min_chars`, the returned QuerySet will be filtered using
     `field__icontains=busqueda` ORed across all provided fields.
+
+    The matching is delegated to the search backend for the QuerySet's database
+    (see `core.utils.search_backends`): plain icontains by default, ILIKE backed by
+    pg_trgm GIN indexes on PostgreSQL. `backend` overrides that choice with a
+    specific backend class (e.g. an in-memory index).
     """
 
     def decorator(func: Callable):
@@ -43,11 +49,8 @@ def search_filter(fields: List[str], min_chars: int = 2):
             if not q or len(q) < min_chars:
                 return result
 
-            filter_q = Q()
-            for field in fields:
-                filter_q |= Q(**{f"{field}__icontains": q})
-
-            return result.filter(filter_q)
+            search_backend = backend() if backend else obtener_backend_busqueda(result.db)
+            return search_backend.filtrar(result, fields, q)
 
         # Expose `busqueda` in the wrapper signature so OpenAPI (Ninja) documents it.
         try:
@@ -0,0 +1,111 @@
+import inspect
+from functools import lru_cache, wraps
+from inspect import Parameter, Signature
+from typing import Dict, Iterable, List, Optional
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import QuerySet
+from django.db.models.query import ModelIterable
+from django.http.response import HttpResponseBase
+from ninja import Schema
+from ninja.errors import ValidationError
+from pydantic import create_model
+
+from core.utils.renderers import renderizar
+
+
+def campos_solicitados(schema, fields: Optional[str]) -> Optional[List[str]]:
+	if not fields:
+		return None
+	campos = list(dict.fromkeys(campo.strip() for campo in fields.split(',') if campo.strip()))
+	desconocidos = [campo for campo in campos if campo not in schema.model_fields]
+	if desconocidos:
+		raise ValidationError([{'fields': f'Campos desconocidos: {", ".join(desconocidos)}'}])
+	return campos or None
+
+
+@lru_cache(maxsize=256)
+def schema_parcial(schema, campos: tuple):
+	"""Schema con solo `campos` de `schema` (mismos tipos, alias y resolvers)."""
+	definiciones = {campo: (schema.model_fields[campo].annotation, schema.model_fields[campo]) for campo in campos}
+	parcial = create_model(f'{schema.__name__}Parcial', __base__=Schema, **definiciones)
+	parcial._ninja_resolvers = {campo: r for campo, r in schema._ninja_resolvers.items() if campo in campos}
+	return parcial
+
+
+def proyectar(queryset: QuerySet, campos: Iterable[str], dependencias: Dict[str, List[str]]) -> QuerySet:
+	"""Limita el SELECT a las columnas que necesitan `campos` y quita los joins que no se usan.
+
+	Los campos del schema que son campos del modelo se cargan tal cual; los calculados
+	(resolvers) necesitan declarar sus rutas en `dependencias` (p. ej.
+	`{'proveedor_nombre': ['proveedor__nombre']}`). Si alguno no se puede resolver, o el
+	QuerySet ya es un `.values()`, se devuelve sin cambios.
+	"""
+	if queryset._iterable_class is not ModelIterable:
+		return queryset
+
+	rutas = {'id'}
+	for campo in campos:
+		if campo in dependencias:
+			rutas.update(dependencias[campo])
+			continue
+		try:
+			queryset.model._meta.get_field(campo)
+		except FieldDoesNotExist:
+			return queryset
+		rutas.add(campo)
+
+	relaciones = {ruta.rsplit('__', 1)[0] for ruta in rutas if '__' in ruta}
+	queryset = queryset.select_related(None)
+	if relaciones:
+		queryset = queryset.select_related(*relaciones)
+	return queryset.only(*rutas)
+
+
+def sparse_fields(schema, dependencias: Optional[Dict[str, List[str]]] = None):
+	"""Decorator factory que agrega `?fields=a,b,c` a un listado paginado.
+
+	Usage:
+		@router.get('/listar_todos', response=List[ProductoList])
+		@query_budget(2)
+		@sparse_fields(ProductoList, {'proveedor_nombre': ['proveedor__nombre']})
+		@paginate
+		@search_filter(['nombre'])
+		def listar(request):
+			return Producto.objects.select_related('proveedor')
+
+	Sin `fields` no cambia nada. Con `fields`, `KeysetPagination` aplica `proyectar` al
+	QuerySet antes de paginar (`.only()` y solo los `select_related` necesarios) y los
+	items se serializan con un schema que tiene solo esos campos. Va por encima de
+	`@paginate` y por debajo de `@cache_response`/`@conditional_get`.
+	"""
+	dependencias = dependencias or {}
+
+	def decorator(func):
+		@wraps(func)
+		def wrapper(request, *args, fields: Optional[str] = None, **kwargs):
+			campos = campos_solicitados(schema, fields)
+			if campos is None:
+				return func(request, *args, **kwargs)
+
+			request.proyeccion_queryset = lambda queryset: proyectar(queryset, campos, dependencias)
+			resultado = func(request, *args, **kwargs)
+			if isinstance(resultado, HttpResponseBase) or not isinstance(resultado, dict):
+				return resultado
+
+			parcial = schema_parcial(schema, tuple(campos))
+			items = [parcial.model_validate(item).model_dump() for item in resultado['items']]
+			return renderizar(request, {**resultado, 'items': items})
+
+		try:
+			firma = inspect.signature(func)
+			parametros = list(firma.parameters.values())
+			if 'fields' not in firma.parameters:
+				parametros.append(Parameter('fields', kind=Parameter.KEYWORD_ONLY, annotation=Optional[str], default=None))
+			wrapper.__signature__ = Signature(parameters=parametros, return_annotation=firma.return_annotation)
+		except (TypeError, ValueError):
+			pass
+
+		return wrapper
+
+	return decorator
@@ -0,0 +1,65 @@
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+
+from django.db import connections
+
+logger = logging.getLogger('core.tareas')
+
+
+class PoolTareas:
+	"""Pool de hilos acotado para trabajo fuera del request (p. ej. procesar imágenes).
+
+	Admite como máximo `max_pendientes` tareas entre encoladas y en curso: `encolar`
+	devuelve False sin bloquear si no hay lugar, y el llamador decide qué hacer con la
+	tarea (dejarla pendiente en la base para reintentarla más tarde). Con `workers=0` las
+	tareas se ejecutan en el mismo hilo. Cada tarea cierra al terminar las conexiones a la
+	base que abrió su hilo.
+	"""
+
+	def __init__(self, nombre: str, workers: int, max_pendientes: int):
+		self.nombre = nombre
+		self.workers = workers
+		self._cupos = threading.BoundedSemaphore(max(max_pendientes, 1))
+		self._executor = None
+		self._lock = threading.Lock()
+
+	def _obtener_executor(self) -> ThreadPoolExecutor:
+		with self._lock:
+			if self._executor is None:
+				self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=self.nombre)
+			return self._executor
+
+	def encolar(self, funcion: Callable, *args) -> bool:
+		if self.workers <= 0:
+			self._ejecutar(funcion, args, liberar=False)
+			return True
+		if not self._cupos.acquire(blocking=False):
+			logger.warning('Pool %s lleno: %s%r queda sin encolar', self.nombre, funcion.__name__, args)
+			return False
+		try:
+			self._obtener_executor().submit(self._ejecutar, funcion, args)
+		except RuntimeError:
+			self._cupos.release()
+			raise
+		return True
+
+	def _ejecutar(self, funcion: Callable, args: tuple, liberar: bool = True) -> None:
+		try:
+			funcion(*args)
+		except Exception:
+			logger.exception('Error en tarea %s%r del pool %s', funcion.__name__, args, self.nombre)
+		finally:
+			if liberar:
+				connections.close_all()
+				self._cupos.release()
+
+	def esperar(self) -> None:
+		"""Espera a que terminen las tareas encoladas y libera los hilos (comandos y apagado)."""
+		with self._lock:
+			executor, self._executor = self._executor, None
+		if executor is not None:
+			executor.shutdown(wait=True)
@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+from io import BytesIO
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousOperation
+from django.core.files.uploadhandler import FileUploadHandler
+
+
+class SubidaRechazada(SuspiciousOperation):
+	"""Archivo subido rechazado antes de terminar de leerlo; `status` es el código HTTP a devolver."""
+
+	def __init__(self, mensaje: str, status: int = 400):
+		super().__init__(mensaje)
+		self.status = status
+
+
+class ValidarImagenUploadHandler(FileUploadHandler):
+	"""Valida los archivos subidos como imágenes mientras se reciben, sin guardarlos.
+
+	Va primero en `FILE_UPLOAD_HANDLERS` y pasa los datos a los handlers de Django (memoria
+	hasta `FILE_UPLOAD_MAX_MEMORY_SIZE`, después archivo temporal en disco). Con los primeros
+	bytes lee la cabecera con Pillow (formato y dimensiones, sin decodificar píxeles) y corta
+	la subida con `SubidaRechazada` si no es una imagen de `IMAGEN_SUBIDA_FORMATOS`, si supera
+	`IMAGEN_SUBIDA_MAX_PIXELES` o cuando los bytes recibidos pasan de `IMAGEN_SUBIDA_MAX_BYTES`.
+	"""
+
+	# Bytes máximos en los que se busca la cabecera (los JPEG pueden traer EXIF antes del SOF)
+	MAX_CABECERA = 256 * 1024
+
+	def new_file(self, *args, **kwargs):
+		super().new_file(*args, **kwargs)
+		self._cabecera = BytesIO()
+		self._validada = False
+		self._recibidos = 0
+
+	def receive_data_chunk(self, raw_data, start):
+		self._recibidos += len(raw_data)
+		max_bytes = getattr(settings, 'IMAGEN_SUBIDA_MAX_BYTES', 50 * 1024 * 1024)
+		if self._recibidos > max_bytes:
+			raise SubidaRechazada(f'El archivo supera el máximo de {max_bytes // (1024 * 1024)} MB', status=413)
+		if not self._validada:
+			self._cabecera.write(raw_data[:self.MAX_CABECERA - self._cabecera.tell()])
+			self._validada = self._validar_cabecera(completa=self._cabecera.tell() >= self.MAX_CABECERA)
+		return raw_data
+
+	def file_complete(self, file_size):
+		if not self._validada:
+			self._validada = self._validar_cabecera(completa=True)
+		self._cabecera = None
+		return None
+
+	def _validar_cabecera(self, completa: bool) -> bool:
+		"""True si la cabecera es válida; False si faltan bytes para leerla. Si no es válida lanza `SubidaRechazada`."""
+		try:
+			from PIL import Image
+		except ImportError:
+			return True
+
+		self._cabecera.seek(0)
+		try:
+			imagen = Image.open(self._cabecera)
+		except Image.DecompressionBombError:
+			raise SubidaRechazada('La imagen tiene demasiados píxeles')
+		except Exception:
+			if completa:
+				raise SubidaRechazada(f'"{self.file_name}" no es una imagen válida')
+			return False
+		finally:
+			self._cabecera.seek(0, 2)
+
+		formatos = getattr(settings, 'IMAGEN_SUBIDA_FORMATOS', ('JPEG', 'MPO', 'PNG', 'WEBP'))
+		if imagen.format not in formatos:
+			raise SubidaRechazada(f'Formato de imagen no admitido: {imagen.format}')
+		max_pixeles = getattr(settings, 'IMAGEN_SUBIDA_MAX_PIXELES', 64_000_000)
+		if imagen.width * imagen.height > max_pixeles:
+			raise SubidaRechazada(
+				f'La imagen de {imagen.width}x{imagen.height} supera el máximo de {max_pixeles // 1_000_000} MP'
+			)
+		return True
@@ -0,0 +1,155 @@
+import mimetypes
+import os
+import re
+from email.utils import formatdate
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import Http404, HttpResponse, HttpResponseNotModified, StreamingHttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Nombres direccionados por contenido (SHA-256, ver producto.imagenes): su contenido nunca cambia
+_HASH_CONTENIDO = re.compile(r'(?<![0-9a-f])[0-9a-f]{64}(?![0-9a-f])')
+_RANGO = re.compile(r'^bytes=(\d*)-(\d*)$')
+_TAMANO_BLOQUE = 64 * 1024
+# Archivos comprimidos (`.gz`, `.br`...) se sirven como tales, sin Content-Encoding: el
+# cliente recibe el archivo y no lo descomprime (como django.http.FileResponse)
+_TIPOS_COMPRIMIDOS = {
+	'br': 'application/x-brotli',
+	'bzip2': 'application/x-bzip',
+	'compress': 'application/x-compress',
+	'gzip': 'application/gzip',
+	'xz': 'application/x-xz',
+}
+
+
+def _es_inmutable(ruta: str) -> bool:
+	return bool(_HASH_CONTENIDO.search(os.path.basename(ruta)))
+
+
+def _etag(ruta: str, estado: os.stat_result) -> str:
+	coincidencia = _HASH_CONTENIDO.search(os.path.basename(ruta))
+	if coincidencia:
+		return f'"{coincidencia.group(0)[:32]}"'
+	return f'"{estado.st_mtime_ns:x}-{estado.st_size:x}"'
+
+
+def _rango(request, tamano: int, etag: str, ultima_modificacion: int):
+	"""`(inicio, fin)` inclusivo de un `Range: bytes=` simple, None para responder completo.
+
+	Los rangos múltiples, los inválidos y los que no coinciden con `If-Range` se ignoran
+	(respuesta 200 completa, como permite RFC 9110); lanza ValueError si el rango no es
+	satisfacible.
+	"""
+	encabezado = request.headers.get('Range')
+	if not encabezado or tamano == 0:
+		return None
+	if_range = request.headers.get('If-Range')
+	if if_range and if_range != etag and parse_http_date_safe(if_range) != ultima_modificacion:
+		return None
+	coincidencia = _RANGO.match(encabezado.strip())
+	if not coincidencia:
+		return None
+	inicio, fin = coincidencia.groups()
+	if not inicio and not fin:
+		return None
+	if not inicio:
+		# Sufijo: los últimos `fin` bytes
+		inicio, fin = max(tamano - int(fin), 0), tamano - 1
+	else:
+		if fin and int(fin) < int(inicio):
+			return None
+		inicio, fin = int(inicio), min(int(fin), tamano - 1) if fin else tamano - 1
+	if inicio >= tamano or inicio > fin:
+		raise ValueError('Rango no satisfacible')
+	return inicio, fin
+
+
+def _leer(ruta: str, inicio: int, largo: int):
+	with open(ruta, 'rb') as archivo:
+		archivo.seek(inicio)
+		while largo > 0:
+			bloque = archivo.read(min(_TAMANO_BLOQUE, largo))
+			if not bloque:
+				break
+			largo -= len(bloque)
+			yield bloque
+
+
+@require_safe
+def servir_media(request, ruta: str):
+	"""Sirve archivos de `MEDIA_ROOT` en producción.
+
+	- Nombres con hash de contenido: `Cache-Control: public, max-age=31536000, immutable`; el
+	  resto `MEDIA_CACHE_MAX_AGE` segundos con revalidación.
+	- ETag y Last-Modified con respuestas 304 (`If-None-Match` / `If-Modified-Since`).
+	- Rangos `bytes=` simples con 206 / 416 e `If-Range`.
+	- Con `MEDIA_SENDFILE = 'x-accel-redirect'` (nginx, bajo `MEDIA_SENDFILE_PREFIJO`) o
+	  `'x-sendfile'` (Apache / lighttpd) el servidor web envía el archivo y resuelve los rangos:
+	  Python solo valida la ruta, hace el stat y arma los encabezados.
+	"""
+	try:
+		ruta_absoluta = safe_join(settings.MEDIA_ROOT, ruta)
+	except SuspiciousFileOperation:
+		raise Http404('Archivo no encontrado')
+	try:
+		estado = os.stat(ruta_absoluta)
+	except OSError:
+		raise Http404('Archivo no encontrado')
+	if not os.path.isfile(ruta_absoluta):
+		raise Http404('Archivo no encontrado')
+
+	etag = _etag(ruta, estado)
+	ultima_modificacion = int(estado.st_mtime)
+	if _es_inmutable(ruta):
+		cache_control = 'public, max-age=31536000, immutable'
+	else:
+		cache_control = f'public, max-age={getattr(settings, "MEDIA_CACHE_MAX_AGE", 3600)}, must-revalidate'
+
+	def con_validadores(response):
+		response['ETag'] = etag
+		response['Last-Modified'] = formatdate(ultima_modificacion, usegmt=True)
+		response['Cache-Control'] = cache_control
+		return response
+
+	condicional = get_conditional_response(request, etag=etag, last_modified=ultima_modificacion)
+	if isinstance(condicional, HttpResponseNotModified):
+		return con_validadores(condicional)
+	if condicional is not None:
+		return condicional
+
+	tipo, codificacion = mimetypes.guess_type(ruta_absoluta)
+	tipo = _TIPOS_COMPRIMIDOS.get(codificacion, tipo) or 'application/octet-stream'
+
+	modo = getattr(settings, 'MEDIA_SENDFILE', None)
+	if modo:
+		response = HttpResponse(content_type=tipo)
+		if modo == 'x-accel-redirect':
+			prefijo = getattr(settings, 'MEDIA_SENDFILE_PREFIJO', '/media-interna/')
+			relativa = os.path.relpath(ruta_absoluta, os.path.abspath(settings.MEDIA_ROOT)).replace(os.sep, '/')
+			response['X-Accel-Redirect'] = prefijo.rstrip('/') + '/' + relativa
+		else:
+			response['X-Sendfile'] = ruta_absoluta
+		return con_validadores(response)
+
+	try:
+		rango = _rango(request, estado.st_size, etag, ultima_modificacion)
+	except ValueError:
+		response = HttpResponse(status=416)
+		response['Content-Range'] = f'bytes */{estado.st_size}'
+		return response
+
+	inicio, fin = rango or (0, estado.st_size - 1)
+	response = StreamingHttpResponse(
+		_leer(ruta_absoluta, inicio, fin - inicio + 1),
+		status=206 if rango else 200,
+		content_type=tipo,
+	)
+	if rango:
+		response['Content-Range'] = f'bytes {inicio}-{fin}/{estado.st_size}'
+	response['Content-Length'] = str(max(fin - inicio + 1, 0))
+	response['Accept-Ranges'] = 'bytes'
+	return con_validadores(response)
@@ -1,7 +1,10 @@
 from ninja import Router
+from django.db.models import Count, Q
 from django.utils import timezone
 
 from .schemas import *
+from core.utils.query_budget import query_budget
+from dashboard.contadores import contar
 from usuario.auth import AuthBearer
 from proveedor.models import Proveedor
 from producto.models import Producto
@@ -11,29 +14,29 @@ router = Router(tags=['Dashboard'])
 
 
 @router.get('/estadisticas', response=DashboardEstadisticas, auth=AuthBearer())
+@query_budget(4)
 def obtener_estadisticas(request):
 	usuario = request.auth
 
+	hechos = Q(creado_por_id=usuario.id)
+	recibidos = Q(usuario_destino_id=usuario.id)
+	pendiente = Q(estado=Pedido.EstadoChoices.PENDIENTE)
+	completado = Q(estado=Pedido.EstadoChoices.COMPLETADO)
+	pedidos = Pedido.objects.filter(hechos | recibidos).aggregate(
+		hechos_pendientes=Count('id', filter=hechos & pendiente),
+		hechos_completados=Count('id', filter=hechos & completado),
+		recibidos_pendientes=Count('id', filter=recibidos & pendiente),
+		recibidos_completados=Count('id', filter=recibidos & completado),
+	)
+
 	return {
 		'fecha_hora_actual': timezone.now(),
 		'usuario_autenticado_nombre': usuario.nombre,
 		'usuario_autenticado_sucursal': usuario.nombre_sucursal,
-		'cantidad_proveedores': Proveedor.objects.count(),
-		'cantidad_productos': Producto.objects.count(),
-		'cantidad_pedidos_hechos_pendientes': Pedido.objects.filter(
-			creado_por_id=usuario.id,
-			estado=Pedido.EstadoChoices.PENDIENTE,
-		).count(),
-		'cantidad_pedidos_hechos_completados': Pedido.objects.filter(
-			creado_por_id=usuario.id,
-			estado=Pedido.EstadoChoices.COMPLETADO,
-		).count(),
-		'cantidad_pedidos_recibidos_pendientes': Pedido.objects.filter(
-			usuario_destino_id=usuario.id,
-			estado=Pedido.EstadoChoices.PENDIENTE,
-		).count(),
-		'cantidad_pedidos_recibidos_completados': Pedido.objects.filter(
-			usuario_destino_id=usuario.id,
-			estado=Pedido.EstadoChoices.COMPLETADO,
-		).count(),
+		'cantidad_proveedores': contar(Proveedor),
+		'cantidad_productos': contar(Producto),
+		'cantidad_pedidos_hechos_pendientes': pedidos['hechos_pendientes'],
+		'cantidad_pedidos_hechos_completados': pedidos['hechos_completados'],
+		'cantidad_pedidos_recibidos_pendientes': pedidos['recibidos_pendientes'],
+		'cantidad_pedidos_recibidos_completados': pedidos['recibidos_completados'],
 	}
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from producto.models import Producto
+from proveedor.models import Proveedor
+
+# Conteos globales cacheados: cuestan lo mismo para todos los usuarios y un COUNT(*)
+# sobre tablas grandes es caro. Las señales de dashboard.signals los invalidan al
+# crear o borrar filas; el TTL acota el desfase entre procesos.
+CLAVES_CONTADORES = {
+	Proveedor: 'dashboard:cantidad_proveedores',
+	Producto: 'dashboard:cantidad_productos',
+}
+
+
+def contar(model) -> int:
+	return cache.get_or_set(
+		CLAVES_CONTADORES[model],
+		model.objects.count,
+		getattr(settings, 'DASHBOARD_CONTADORES_TTL', 30),
+	)
+
+
+def invalidar(model) -> None:
+	cache.delete(CLAVES_CONTADORES[model])
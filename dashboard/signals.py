@@ -0,0 +1,16 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from dashboard.contadores import CLAVES_CONTADORES, invalidar
+
+
+@receiver(post_save)
+def invalidar_contador_al_crear(sender, created, **kwargs):
+	if created and sender in CLAVES_CONTADORES:
+		invalidar(sender)
+
+
+@receiver(post_delete)
+def invalidar_contador_al_borrar(sender, **kwargs):
+	if sender in CLAVES_CONTADORES:
+		invalidar(sender)
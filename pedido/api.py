@@ -2,19 +2,36 @@ from ninja import Router
 from ninja.pagination import paginate
 from django.shortcuts import get_object_or_404
 from ninja.responses import Response
-from django.db import models
-from django.db.models import F, Q
-from django.db.models.functions import Coalesce
+from django.db import models, transaction
+from django.db.models import F
 from typing import List, Optional
 from .schemas import *
 from core.utils.search_filter import search_filter
+from core.utils.query_budget import query_budget
+from core.utils.sparse_fields import sparse_fields
+from core.utils.response_cache import cache_response
+from core.utils.conditional_get import conditional_get
 from pedido.models import Pedido as PedidoModel
 from pedido.models import PedidoDetalle as PedidoDetalleModel
+from pedido.totales import recalcular_totales, registrar_cambio
+from producto.models import Producto as ProductoModel
 from proveedor.models import Proveedor as ProveedorModel
 from usuario.auth import AuthBearer, es_admin, requiere_admin
 
 router = Router(tags=['Pedidos'])
 
+# Columnas que leen los resolvers de los schemas, para ?fields= (core.utils.sparse_fields)
+DEPENDENCIAS_PEDIDO = {
+	'creado_por_nombre': ['creado_por__nombre'],
+	'usuario_destino_nombre': ['usuario_destino__nombre'],
+	'cantidad_productos': ['total_cantidad'],
+}
+DEPENDENCIAS_PEDIDO_DETALLE = {
+	'producto_nombre': ['producto__nombre'],
+	'producto_imagen': ['producto__imagen'],
+	'producto_imagen_miniatura': ['producto__imagen_variantes'],
+}
+
 
 def _es_participante_o_admin(usuario, pedido: PedidoModel) -> bool:
 	if not usuario:
@@ -32,6 +49,25 @@ def _puede_gestionar_pedido(usuario, pedido: PedidoModel) -> bool:
 	return pedido.creado_por_id == usuario.id
 
 
+def _pedidos_con_resumen():
+	# Nombres de usuarios en la misma consulta; la cantidad total ya está en Pedido.total_cantidad
+	return PedidoModel.objects.select_related('creado_por', 'usuario_destino')
+
+
+def _validador_pedido(request, pedido_id: int):
+	datos = PedidoModel.objects.filter(id=pedido_id).values_list(
+		'creado_por_id', 'usuario_destino_id', 'estado', 'fecha_actualizacion',
+		'total_cantidad', 'cantidad_lineas', 'cantidad_proveedores',
+		'creado_por__fecha_actualizacion', 'usuario_destino__fecha_actualizacion',
+	).first()
+	usuario = request.auth
+	if datos is None or not (es_admin(usuario) or usuario.id in datos[:2]):
+		# Sin validación: la vista responde 404/403 como siempre
+		return None
+	# Los totales cambian sin tocar fecha_actualizacion: solo ETag, sin Last-Modified
+	return datos, None
+
+
 def _construir_resumen_copia_pedido(pedido: PedidoModel, proveedor: Optional[ProveedorModel] = None) -> dict:
 	detalles = PedidoDetalleModel.objects.filter(pedido_id=pedido.id).select_related('producto', 'producto__proveedor')
 
@@ -70,38 +106,50 @@ def _construir_resumen_copia_pedido(pedido: PedidoModel, proveedor: Optional[Pro
 
 
 @router.get('/listar_todos', response=List[Pedido], auth=AuthBearer())
+@query_budget(3)
+@requiere_admin
+@cache_response('pedidos', variar_por='rol')
+@sparse_fields(Pedido, DEPENDENCIAS_PEDIDO)
 @paginate
 @search_filter(['estado', 'creado_por__nombre', 'usuario_destino__nombre'])
-@requiere_admin
 def listar_pedidos(request, busqueda: str = None):
-	return PedidoModel.objects.order_by('-fecha_actualizacion')
+	return _pedidos_con_resumen().order_by('-fecha_actualizacion')
 
 
 @router.get('/mis_pedidos_hechos', response=List[Pedido], auth=AuthBearer())
+@query_budget(3)
+@cache_response('pedidos', variar_por='usuario')
+@sparse_fields(Pedido, DEPENDENCIAS_PEDIDO)
 @paginate
 @search_filter(['estado'])
 def listar_mis_pedidos_hechos(request, busqueda: str = None):
 	usuario = request.auth
-	return PedidoModel.objects.filter(creado_por_id=usuario.id).order_by('-fecha_actualizacion')
+	return _pedidos_con_resumen().filter(creado_por_id=usuario.id).order_by('-fecha_actualizacion')
 
 
 @router.get('/mis_pedidos_recibidos', response=List[Pedido], auth=AuthBearer())
+@query_budget(3)
+@cache_response('pedidos', variar_por='usuario')
+@sparse_fields(Pedido, DEPENDENCIAS_PEDIDO)
 @paginate
 @search_filter(['estado'])
 def listar_mis_pedidos_recibidos(request, busqueda: str = None):
 	usuario = request.auth
-	return PedidoModel.objects.filter(usuario_destino_id=usuario.id).order_by('-fecha_actualizacion')
+	return _pedidos_con_resumen().filter(usuario_destino_id=usuario.id).order_by('-fecha_actualizacion')
 
 
 @router.get('/obtener/{pedido_id}', response=Pedido, auth=AuthBearer())
+@query_budget(3)
+@conditional_get(_validador_pedido, privado=True)
 def obtener_pedido(request, pedido_id: int):
-	pedido = get_object_or_404(PedidoModel, id=pedido_id)
+	pedido = get_object_or_404(_pedidos_con_resumen(), id=pedido_id)
 	if not _es_participante_o_admin(request.auth, pedido):
 		return Response({'success': False, 'error': 'No autorizado'}, status=403)
 	return pedido
 
 
 @router.get('/copiar_pedido/completo/{pedido_id}', response=PedidoCopiaResumen, auth=AuthBearer())
+@query_budget(5)
 def copiar_pedido_completo(request, pedido_id: int):
 	pedido = get_object_or_404(PedidoModel, id=pedido_id)
 	if not _es_participante_o_admin(request.auth, pedido):
@@ -110,6 +158,7 @@ def copiar_pedido_completo(request, pedido_id: int):
 
 
 @router.get('/copiar_pedido/por_proveedor/{pedido_id}/{proveedor_id}', response=PedidoCopiaResumen, auth=AuthBearer())
+@query_budget(6)
 def copiar_pedido_por_proveedor(request, pedido_id: int, proveedor_id: int):
 	pedido = get_object_or_404(PedidoModel, id=pedido_id)
 	if not _es_participante_o_admin(request.auth, pedido):
@@ -173,6 +222,9 @@ def eliminar_pedido(request, pedido_id: int):
 
 
 @router.get('/productos_pedido/por_pedido/{pedido_id}/proveedor/{proveedor_id}', response=List[PedidoDetalle], auth=AuthBearer())
+@query_budget(4)
+@cache_response('pedidos', 'productos', variar_por='usuario')
+@sparse_fields(PedidoDetalle, DEPENDENCIAS_PEDIDO_DETALLE)
 @paginate
 @search_filter(['producto__nombre'])
 def listar_productos_pedido_por_proveedor(request, pedido_id: int, proveedor_id: int, busqueda: str = None):
@@ -182,10 +234,13 @@ def listar_productos_pedido_por_proveedor(request, pedido_id: int, proveedor_id:
 	return PedidoDetalleModel.objects.filter(
 		pedido_id=pedido_id,
 		producto__proveedor_id=proveedor_id,
-	).order_by('producto__nombre', 'id')
+	).select_related('producto').order_by('producto__nombre', 'id')
 
 
 @router.get('/productos_pedido/por_pedido/{pedido_id}', response=List[PedidoDetalle], auth=AuthBearer())
+@query_budget(4)
+@cache_response('pedidos', 'productos', variar_por='usuario')
+@sparse_fields(PedidoDetalle, DEPENDENCIAS_PEDIDO_DETALLE)
 @paginate
 @search_filter(['producto__nombre', 'producto__proveedor__nombre'])
 def listar_productos_pedido(request, pedido_id: int, busqueda: str = None):
@@ -205,28 +260,24 @@ def listar_productos_pedido(request, pedido_id: int, busqueda: str = None):
 
 
 @router.get('/proveedores_resumen/por_pedido/{pedido_id}', response=List[PedidoProveedorResumen], auth=AuthBearer())
+@query_budget(4)
+@cache_response('pedidos', 'productos', variar_por='usuario')
+@sparse_fields(PedidoProveedorResumen)
 @paginate
-@search_filter(['nombre'])
+@search_filter(['producto__proveedor__nombre'])
 def listar_proveedores_resumen_por_pedido(request, pedido_id: int):
 	pedido = get_object_or_404(PedidoModel, id=pedido_id)
 	if not _es_participante_o_admin(request.auth, pedido):
 		return Response({'success': False, 'error': 'No autorizado'}, status=403)
 
-	return ProveedorModel.objects.annotate(
-		cantidad_productos_pedidos=Coalesce(
-			models.Sum(
-				'productos__pedidodetalle__cantidad',
-				filter=Q(productos__pedidodetalle__pedido_id=pedido_id),
-			),
-			0,
-		),
-		proveedor_id=F('id'),
-		proveedor_nombre=F('nombre'),
-	).order_by('-cantidad_productos_pedidos', 'nombre').values(
-		'proveedor_id',
-		'proveedor_nombre',
-		'cantidad_productos_pedidos',
-	)
+	# Se agrupan las líneas del pedido por proveedor: el costo depende del tamaño
+	# del pedido y no del catálogo. Solo aparecen proveedores con productos pedidos.
+	return PedidoDetalleModel.objects.filter(pedido_id=pedido_id).values(
+		proveedor_id=F('producto__proveedor_id'),
+		proveedor_nombre=F('producto__proveedor__nombre'),
+	).annotate(
+		cantidad_productos_pedidos=models.Sum('cantidad'),
+	).order_by('-cantidad_productos_pedidos', 'proveedor_nombre')
 
 
 @router.post('/productos_pedido/crear', response=PedidoDetalle, auth=AuthBearer())
@@ -243,12 +294,69 @@ def crear_producto_pedido(request, data: PedidoDetalleCreate):
 		if existe:
 			return Response({'success': False, 'error': 'Este producto ya fue agregado al pedido'}, status=400)
 
-		producto_pedido = PedidoDetalleModel.objects.create(**data.dict())
+		with transaction.atomic():
+			producto_pedido = PedidoDetalleModel.objects.create(**data.dict())
+			registrar_cambio(pedido.id, cantidad=producto_pedido.cantidad, lineas=1)
 		return producto_pedido
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
 
 
+@router.post('/productos_pedido/guardar_lote', response=PedidoDetalleLoteResultado, auth=AuthBearer())
+def guardar_lote_productos_pedido(request, data: PedidoDetalleLote):
+	"""Crea o actualiza (upsert por producto) muchas líneas del pedido en una transacción."""
+	try:
+		pedido = get_object_or_404(PedidoModel, id=data.pedido_id)
+		if not _puede_gestionar_pedido(request.auth, pedido):
+			return Response({'success': False, 'error': 'No autorizado'}, status=403)
+
+		producto_ids = {item.producto_id for item in data.items}
+		productos_existentes = set(
+			ProductoModel.objects.filter(id__in=producto_ids).values_list('id', flat=True)
+		)
+		ya_en_pedido = set(
+			PedidoDetalleModel.objects.filter(pedido_id=pedido.id, producto_id__in=producto_ids).values_list('producto_id', flat=True)
+		)
+
+		resultados = []
+		detalles = []
+		vistos = set()
+		for item in data.items:
+			resultado = {'producto_id': item.producto_id, 'cantidad': item.cantidad}
+			if item.producto_id in vistos:
+				resultado.update(estado='error', error='Producto repetido en el lote')
+			elif item.producto_id not in productos_existentes:
+				resultado.update(estado='error', error='El producto no existe')
+			elif item.cantidad < 0:
+				resultado.update(estado='error', error='La cantidad no puede ser negativa')
+			else:
+				vistos.add(item.producto_id)
+				resultado['estado'] = 'actualizado' if item.producto_id in ya_en_pedido else 'creado'
+				detalles.append(PedidoDetalleModel(pedido_id=pedido.id, producto_id=item.producto_id, cantidad=item.cantidad))
+			resultados.append(resultado)
+
+		with transaction.atomic():
+			PedidoDetalleModel.objects.bulk_create(
+				detalles,
+				batch_size=500,
+				update_conflicts=True,
+				unique_fields=['pedido', 'producto'],
+				update_fields=['cantidad', 'fecha_actualizacion'],
+			)
+			recalcular_totales([pedido.id])
+
+		estados = [resultado['estado'] for resultado in resultados]
+		return {
+			'pedido_id': pedido.id,
+			'creados': estados.count('creado'),
+			'actualizados': estados.count('actualizado'),
+			'errores': estados.count('error'),
+			'items': resultados,
+		}
+	except Exception as e:
+		return Response({'success': False, 'error': str(e)}, status=400)
+
+
 @router.patch('/productos_pedido/actualizar/{producto_pedido_id}', response=PedidoDetalle, auth=AuthBearer())
 def actualizar_producto_pedido(request, producto_pedido_id: int, data: PedidoDetalleUpdate):
 	try:
@@ -256,9 +364,13 @@ def actualizar_producto_pedido(request, producto_pedido_id: int, data: PedidoDet
 		if not _puede_gestionar_pedido(request.auth, producto_pedido.pedido):
 			return Response({'success': False, 'error': 'No autorizado'}, status=403)
 
+		cantidad_anterior = producto_pedido.cantidad
 		for attr, value in data.dict(exclude_unset=True).items():
 			setattr(producto_pedido, attr, value)
-		producto_pedido.save()
+		with transaction.atomic():
+			producto_pedido.save()
+			if producto_pedido.cantidad != cantidad_anterior:
+				registrar_cambio(producto_pedido.pedido_id, cantidad=producto_pedido.cantidad - cantidad_anterior)
 		return producto_pedido
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
@@ -271,7 +383,9 @@ def eliminar_producto_pedido(request, producto_pedido_id: int):
 		if not _puede_gestionar_pedido(request.auth, producto_pedido.pedido):
 			return Response({'success': False, 'error': 'No autorizado'}, status=403)
 
-		producto_pedido.delete()
+		with transaction.atomic():
+			producto_pedido.delete()
+			registrar_cambio(producto_pedido.pedido_id, cantidad=-producto_pedido.cantidad, lineas=-1)
 		return {'success': True}
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
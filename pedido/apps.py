@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class PedidoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'pedido'
+
+    def ready(self):
+        from pedido import signals  # noqa: F401
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from pedido.models import Pedido
+from pedido.totales import pedidos_con_desvio, recalcular_totales
+
+
+class Command(BaseCommand):
+    help = 'Detecta y corrige pedidos cuyos totales denormalizados no coinciden con sus detalles.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Cantidad de pedidos revisados por lote')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa los desvíos, sin corregirlos')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        if batch_size <= 0:
+            raise CommandError('--batch-size debe ser mayor a 0')
+
+        ultimo_id = Pedido.objects.aggregate(ultimo=Max('id'))['ultimo'] or 0
+        total_desviados = 0
+
+        for desde in range(0, ultimo_id, batch_size):
+            lote = Pedido.objects.filter(id__gt=desde, id__lte=desde + batch_size)
+            desviados = list(pedidos_con_desvio(lote).values_list('id', flat=True))
+            if not desviados:
+                continue
+            total_desviados += len(desviados)
+            if not dry_run:
+                recalcular_totales(desviados)
+            self.stdout.write(f'Pedidos {desde + 1}-{desde + batch_size}: {len(desviados)} con desvío')
+
+        if dry_run:
+            self.stdout.write(self.style.WARNING(f'Pedidos con desvío: {total_desviados} (sin corregir)'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Pedidos corregidos: {total_desviados}'))
@@ -0,0 +1,46 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:48
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def rellenar_totales(apps, schema_editor):
+    Pedido = apps.get_model('pedido', 'Pedido')
+    PedidoDetalle = apps.get_model('pedido', 'PedidoDetalle')
+
+    def agregado(expresion):
+        detalles = PedidoDetalle.objects.filter(pedido_id=OuterRef('pk')).order_by().values('pedido_id')
+        return Coalesce(Subquery(detalles.annotate(valor=expresion).values('valor')), 0)
+
+    Pedido.objects.update(
+        total_cantidad=agregado(Sum('cantidad')),
+        cantidad_lineas=agregado(Count('id')),
+        cantidad_proveedores=agregado(Count('producto__proveedor_id', distinct=True)),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pedido', '0003_alter_pedido_estado'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='pedido',
+            name='cantidad_lineas',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='cantidad_proveedores',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='pedido',
+            name='total_cantidad',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(rellenar_totales, migrations.RunPython.noop),
+    ]
@@ -9,6 +9,10 @@ class Pedido(BaseModel):
     creado_por = models.ForeignKey('usuario.Usuario', on_delete=models.CASCADE, related_name='pedidos_creados')
     usuario_destino = models.ForeignKey('usuario.Usuario', on_delete=models.SET_NULL, null=True, blank=True, related_name='pedidos_recibidos')
     estado = models.CharField(max_length=50, choices=EstadoChoices.choices, default=EstadoChoices.PENDIENTE)
+    # Totales mantenidos por pedido.totales al modificar detalles (no recalcular por request)
+    total_cantidad = models.PositiveIntegerField(default=0)
+    cantidad_lineas = models.PositiveIntegerField(default=0)
+    cantidad_proveedores = models.PositiveIntegerField(default=0)
 
 class PedidoDetalle(BaseModel):
     pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='detalles')
@@ -1,13 +1,13 @@
-from ninja import Schema, ModelSchema
+from ninja import Field, Schema, ModelSchema
 from typing import Optional, Annotated
 from typing import Literal
 from typing import List
 from datetime import datetime
-from django.db.models import Sum
 from pydantic import StringConstraints
 
 from pedido.models import Pedido as PedidoModel
 from pedido.models import PedidoDetalle as PedidoDetalleModel
+from producto.imagenes import url_variante
 
 Str50 = Annotated[str, StringConstraints(max_length=50)]
 
@@ -35,7 +35,8 @@ class Pedido(ModelSchema):
 
 	@staticmethod
 	def resolve_cantidad_productos(obj):
-		return obj.detalles.aggregate(total=Sum('cantidad'))['total'] or 0
+		# Total denormalizado, mantenido por pedido.totales
+		return obj.total_cantidad
 
 
 class PedidoCreate(Schema):
@@ -54,6 +55,7 @@ class PedidoCambiarEstado(Schema):
 class PedidoDetalle(ModelSchema):
 	producto_nombre: Optional[Str50] = None
 	producto_imagen: Optional[Str50] = None
+	producto_imagen_miniatura: Optional[str] = None
 
 	class Meta:
 		model = PedidoDetalleModel
@@ -71,6 +73,12 @@ class PedidoDetalle(ModelSchema):
 			return None
 		return obj.producto.imagen.url
 
+	@staticmethod
+	def resolve_producto_imagen_miniatura(obj):
+		if not obj.producto_id:
+			return None
+		return url_variante(obj.producto.imagen_variantes, 'thumb')
+
 
 class PedidoDetalleCreate(Schema):
 	pedido_id: int
@@ -82,6 +90,31 @@ class PedidoDetalleUpdate(Schema):
 	cantidad: Optional[int] = None
 
 
+class PedidoDetalleLoteItem(Schema):
+	producto_id: int
+	cantidad: int
+
+
+class PedidoDetalleLote(Schema):
+	pedido_id: int
+	items: List[PedidoDetalleLoteItem] = Field(..., max_length=1000)
+
+
+class PedidoDetalleLoteItemResultado(Schema):
+	producto_id: int
+	cantidad: int
+	estado: Literal['creado', 'actualizado', 'error']
+	error: Optional[str] = None
+
+
+class PedidoDetalleLoteResultado(Schema):
+	pedido_id: int
+	creados: int
+	actualizados: int
+	errores: int
+	items: List[PedidoDetalleLoteItemResultado]
+
+
 class PedidoProveedorResumen(Schema):
 	proveedor_id: int
 	proveedor_nombre: Str50
@@ -0,0 +1,8 @@
+from core.utils.response_cache import registrar_tags
+from pedido.models import Pedido, PedidoDetalle
+from usuario.models import Usuario
+
+# Los listados de pedidos muestran nombres de usuario; el rol decide qué puede ver cada uno
+registrar_tags(Pedido, 'pedidos')
+registrar_tags(PedidoDetalle, 'pedidos')
+registrar_tags(Usuario, 'pedidos', campos=['nombre', 'nombre_sucursal', 'rol'])
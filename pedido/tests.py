@@ -0,0 +1,241 @@
+import json
+from io import StringIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.client import BOUNDARY, MULTIPART_CONTENT, encode_multipart
+from django.test.utils import CaptureQueriesContext
+
+from pedido.models import Pedido as PedidoModel, PedidoDetalle as PedidoDetalleModel
+from pedido.totales import pedidos_con_desvio, recalcular_totales
+from producto.models import Producto as ProductoModel
+from proveedor.models import Proveedor as ProveedorModel
+from usuario.auth import _token_cache
+from usuario.models import Usuario as UsuarioModel
+
+# Sin caché de respuestas: cada request ejecuta la vista y sus consultas
+SIN_CACHE_RESPUESTAS = {
+	'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+	'respuestas': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+@override_settings(CACHES=SIN_CACHE_RESPUESTAS)
+class ListarPedidosConsultasTest(TestCase):
+	"""`/pedidos/listar_todos` resuelve los resúmenes en la consulta de la página (sin N+1)."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.admin = UsuarioModel.objects.create(
+			nombre='admin',
+			nombre_sucursal='central',
+			contrasena_hasheada=make_password('clave'),
+			rol=UsuarioModel.RolChoices.ADMIN_GENERAL,
+			token='token-admin',
+		)
+		cls.sucursal = UsuarioModel.objects.create(
+			nombre='sucursal',
+			nombre_sucursal='sucursal',
+			contrasena_hasheada=make_password('clave'),
+		)
+		cls.productos = [
+			ProductoModel.objects.create(proveedor=ProveedorModel.objects.create(nombre=f'Proveedor {i}'), nombre=f'Producto {i}')
+			for i in range(3)
+		]
+
+	def _crear_pedidos(self, cantidad):
+		for _ in range(cantidad):
+			pedido = PedidoModel.objects.create(creado_por=self.sucursal, usuario_destino=self.admin)
+			for i, producto in enumerate(self.productos):
+				PedidoDetalleModel.objects.create(pedido=pedido, producto=producto, cantidad=i + 1)
+
+	def _listar(self):
+		_token_cache.clear()
+		response = self.client.get('/api/pedidos/listar_todos?limit=100', HTTP_AUTHORIZATION='Bearer token-admin')
+		self.assertEqual(response.status_code, 200)
+		return response.json()
+
+	def test_consultas_constantes_por_pagina(self):
+		self._crear_pedidos(5)
+		with CaptureQueriesContext(connection) as consultas:
+			pagina = self._listar()
+		self.assertEqual(len(pagina['items']), 5)
+		self.assertEqual(pagina['items'][0]['creado_por_nombre'], 'sucursal')
+
+		self._crear_pedidos(45)
+		with self.assertNumQueries(len(consultas)):
+			pagina = self._listar()
+		self.assertEqual(len(pagina['items']), 50)
+
+
+@override_settings(CACHES=SIN_CACHE_RESPUESTAS)
+class GuardarLoteProductosPedidoTest(TestCase):
+	"""`/pedidos/productos_pedido/guardar_lote`: upsert por producto con resultados por item."""
+
+	URL = '/api/pedidos/productos_pedido/guardar_lote'
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.sucursal = UsuarioModel.objects.create(
+			nombre='sucursal',
+			nombre_sucursal='sucursal',
+			contrasena_hasheada=make_password('clave'),
+			token='token-sucursal',
+		)
+		proveedores = [ProveedorModel.objects.create(nombre=f'Proveedor {i}') for i in range(2)]
+		cls.productos = [
+			ProductoModel.objects.create(proveedor=proveedores[i % 2], nombre=f'Producto {i}')
+			for i in range(40)
+		]
+		cls.pedido = PedidoModel.objects.create(creado_por=cls.sucursal)
+		for producto in cls.productos[:2]:
+			PedidoDetalleModel.objects.create(pedido=cls.pedido, producto=producto, cantidad=1)
+		recalcular_totales([cls.pedido.id])
+
+	def _guardar(self, items):
+		_token_cache.clear()
+		return self.client.post(
+			self.URL,
+			{'pedido_id': self.pedido.id, 'items': items},
+			content_type='application/json',
+			HTTP_AUTHORIZATION='Bearer token-sucursal',
+		)
+
+	def test_resultados_por_item_y_totales(self):
+		nuevo, existente, otro_nuevo = self.productos[2], self.productos[0], self.productos[3]
+		items = [
+			{'producto_id': nuevo.id, 'cantidad': 4},
+			{'producto_id': existente.id, 'cantidad': 7},
+			{'producto_id': nuevo.id, 'cantidad': 9},
+			{'producto_id': 999999, 'cantidad': 1},
+			{'producto_id': otro_nuevo.id, 'cantidad': -2},
+		]
+		response = self._guardar(items)
+		self.assertEqual(response.status_code, 200)
+		resultado = response.json()
+		self.assertEqual(
+			[(item['producto_id'], item['estado'], item['error']) for item in resultado['items']],
+			[
+				(nuevo.id, 'creado', None),
+				(existente.id, 'actualizado', None),
+				(nuevo.id, 'error', 'Producto repetido en el lote'),
+				(999999, 'error', 'El producto no existe'),
+				(otro_nuevo.id, 'error', 'La cantidad no puede ser negativa'),
+			],
+		)
+		self.assertEqual((resultado['creados'], resultado['actualizados'], resultado['errores']), (1, 1, 3))
+
+		cantidades = dict(self.pedido.detalles.values_list('producto_id', 'cantidad'))
+		self.assertEqual(cantidades, {existente.id: 7, self.productos[1].id: 1, nuevo.id: 4})
+		self.pedido.refresh_from_db()
+		self.assertEqual(
+			(self.pedido.total_cantidad, self.pedido.cantidad_lineas, self.pedido.cantidad_proveedores),
+			(12, 3, 2),
+		)
+		self.assertFalse(pedidos_con_desvio().exists())
+
+	def test_consultas_constantes_por_lote(self):
+		with CaptureQueriesContext(connection) as consultas:
+			response = self._guardar([{'producto_id': producto.id, 'cantidad': 1} for producto in self.productos[:3]])
+		self.assertEqual(response.status_code, 200)
+
+		with self.assertNumQueries(len(consultas)):
+			response = self._guardar([{'producto_id': producto.id, 'cantidad': 2} for producto in self.productos])
+		self.assertEqual(response.json()['actualizados'], 3)
+		self.assertEqual(response.json()['creados'], 37)
+		self.pedido.refresh_from_db()
+		self.assertEqual((self.pedido.total_cantidad, self.pedido.cantidad_lineas), (80, 40))
+
+
+@override_settings(CACHES=SIN_CACHE_RESPUESTAS)
+class TotalesPedidoTest(TestCase):
+	"""Totales denormalizados de Pedido (pedido.totales) ante cambios de líneas y productos."""
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.sucursal = UsuarioModel.objects.create(
+			nombre='sucursal',
+			nombre_sucursal='sucursal',
+			contrasena_hasheada=make_password('clave'),
+			token='token-sucursal',
+		)
+		cls.proveedores = [ProveedorModel.objects.create(nombre=f'Proveedor {i}') for i in range(2)]
+		cls.productos = [
+			ProductoModel.objects.create(proveedor=cls.proveedores[i % 2], nombre=f'Producto {i}')
+			for i in range(3)
+		]
+		cls.pedido = PedidoModel.objects.create(creado_por=cls.sucursal)
+
+	def setUp(self):
+		_token_cache.clear()
+
+	def _totales(self):
+		self.pedido.refresh_from_db()
+		return self.pedido.total_cantidad, self.pedido.cantidad_lineas, self.pedido.cantidad_proveedores
+
+	def _enviar(self, metodo, url, data=None):
+		return self.client.generic(
+			metodo,
+			f'/api/{url}',
+			json.dumps(data) if data is not None else '',
+			content_type='application/json',
+			HTTP_AUTHORIZATION='Bearer token-sucursal',
+		)
+
+	def test_lineas_incrementan_totales_con_expresiones_f(self):
+		response = self._enviar('POST', 'pedidos/productos_pedido/crear', {
+			'pedido_id': self.pedido.id, 'producto_id': self.productos[0].id, 'cantidad': 5,
+		})
+		self.assertEqual(response.status_code, 200)
+		detalle_id = response.json()['id']
+		self.assertEqual(self._totales(), (5, 1, 1))
+
+		# Se suma sobre el valor de la fila, no sobre uno leído antes ni recalculado
+		PedidoModel.objects.filter(id=self.pedido.id).update(total_cantidad=100)
+		response = self._enviar('POST', 'pedidos/productos_pedido/crear', {
+			'pedido_id': self.pedido.id, 'producto_id': self.productos[1].id, 'cantidad': 2,
+		})
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self._totales(), (102, 2, 2))
+
+		response = self._enviar('PATCH', f'pedidos/productos_pedido/actualizar/{detalle_id}', {'cantidad': 8})
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self._totales(), (105, 2, 2))
+
+		response = self._enviar('DELETE', f'pedidos/productos_pedido/eliminar/{detalle_id}')
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self._totales(), (97, 1, 1))
+
+	def test_cambio_de_proveedor_recalcula_pedidos(self):
+		for producto in self.productos[:2]:
+			PedidoDetalleModel.objects.create(pedido=self.pedido, producto=producto, cantidad=1)
+		recalcular_totales([self.pedido.id])
+		self.assertEqual(self._totales(), (2, 2, 2))
+
+		# Endpoint multipart (admite imagen): el esquema va como JSON en el campo `data`
+		response = self.client.generic(
+			'PATCH',
+			f'/api/productos/actualizar/{self.productos[1].id}',
+			encode_multipart(BOUNDARY, {'data': json.dumps({'proveedor_id': self.proveedores[0].id})}),
+			content_type=MULTIPART_CONTENT,
+			HTTP_AUTHORIZATION='Bearer token-sucursal',
+		)
+		self.assertEqual(response.status_code, 200)
+		self.assertEqual(self._totales(), (2, 2, 1))
+		self.assertFalse(pedidos_con_desvio().exists())
+
+	def test_reconciliar_dry_run_detecta_desvios(self):
+		PedidoDetalleModel.objects.create(pedido=self.pedido, producto=self.productos[0], cantidad=3)
+		recalcular_totales([self.pedido.id])
+		PedidoModel.objects.filter(id=self.pedido.id).update(total_cantidad=10)
+
+		salida = StringIO()
+		call_command('reconciliar_totales_pedidos', '--dry-run', stdout=salida)
+		self.assertIn('Pedidos con desvío: 1 (sin corregir)', salida.getvalue())
+		self.assertEqual(self._totales(), (10, 1, 1))
+
+		call_command('reconciliar_totales_pedidos', stdout=StringIO())
+		self.assertEqual(self._totales(), (3, 1, 1))
+		self.assertFalse(pedidos_con_desvio().exists())
@@ -0,0 +1,64 @@
+"""Mantenimiento de los totales denormalizados de Pedido.
+
+`total_cantidad` (suma de cantidades), `cantidad_lineas` (líneas = productos distintos,
+por la restricción `unique_producto_por_pedido`) y `cantidad_proveedores` (proveedores
+distintos). Los cambios de una línea se aplican con expresiones F en un único UPDATE; los
+cambios masivos o los que llegan por cascada se resuelven recalculando desde los detalles.
+"""
+
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from core.utils.response_cache import invalidar_tags
+from pedido.models import Pedido, PedidoDetalle
+
+
+def _agregado_detalles(expresion):
+	detalles = PedidoDetalle.objects.filter(pedido_id=OuterRef('pk')).order_by().values('pedido_id')
+	return Coalesce(Subquery(detalles.annotate(valor=expresion).values('valor')), 0)
+
+
+def _totales_calculados():
+	return {
+		'total_cantidad': _agregado_detalles(Sum('cantidad')),
+		'cantidad_lineas': _agregado_detalles(Count('id')),
+		'cantidad_proveedores': _agregado_detalles(Count('producto__proveedor_id', distinct=True)),
+	}
+
+
+def registrar_cambio(pedido_id: int, cantidad: int = 0, lineas: int = 0) -> None:
+	"""Aplica el cambio de una línea. Si cambian las líneas se recuenta también los proveedores."""
+	campos = {
+		'total_cantidad': F('total_cantidad') + cantidad,
+		'cantidad_lineas': F('cantidad_lineas') + lineas,
+	}
+	if lineas:
+		campos['cantidad_proveedores'] = _totales_calculados()['cantidad_proveedores']
+	Pedido.objects.filter(id=pedido_id).update(**campos)
+
+
+def recalcular_totales(pedido_ids=None) -> int:
+	"""Recalcula los totales desde los detalles (de todos los pedidos o de `pedido_ids`)."""
+	pedidos = Pedido.objects.all()
+	if pedido_ids is not None:
+		pedidos = pedidos.filter(id__in=list(pedido_ids))
+	actualizados = pedidos.update(**_totales_calculados())
+	# update() y bulk_create() no emiten señales
+	transaction.on_commit(lambda: invalidar_tags('pedidos'))
+	return actualizados
+
+
+def pedidos_afectados(**filtro_detalles) -> list:
+	"""Ids de pedidos con detalles que cumplen el filtro (para recalcular tras cambios en cascada)."""
+	return list(PedidoDetalle.objects.filter(**filtro_detalles).values_list('pedido_id', flat=True).distinct())
+
+
+def pedidos_con_desvio(pedidos=None):
+	"""Pedidos cuyos totales guardados no coinciden con los detalles."""
+	pedidos = Pedido.objects.all() if pedidos is None else pedidos
+	calculados = {f'{campo}_calculado': expresion for campo, expresion in _totales_calculados().items()}
+	desvio = Q()
+	for campo in _totales_calculados():
+		desvio |= ~Q(**{campo: F(f'{campo}_calculado')})
+	return pedidos.annotate(**calculados).filter(desvio)
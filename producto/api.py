@@ -1,35 +1,124 @@
 from ninja import Router
-from ninja import File, UploadedFile
+from ninja import File, Query, UploadedFile
 from ninja.pagination import paginate
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.core.files.storage import default_storage
+from ninja.errors import ValidationError
 from ninja.responses import Response
-from typing import List
+from typing import List, Literal, Optional
+from datetime import datetime
 from .schemas import *
 from core.utils.search_filter import search_filter
-from core.utils.compress_image import compress_image
-from core.utils.delete_image_file import delete_image_file
+from core.utils.query_budget import query_budget
+from core.utils.sparse_fields import sparse_fields
+from core.utils.response_cache import cache_response
+from core.utils.conditional_get import conditional_get, validador_modelos
+from core.utils.exportacion import respuesta_exportacion
 from producto.models import Producto as ProductoModel
+from producto.models import CategoriaProducto as CategoriaProductoModel
+from proveedor.models import Proveedor as ProveedorModel
+from producto.indice_busqueda import IndiceProductosSearchBackend, autocompletar_productos
+from producto.cambios import SincronizacionVencida, obtener_cambios
+from producto.imagenes import guardar_imagen_original
+from pedido.totales import pedidos_afectados, recalcular_totales
 from usuario.auth import AuthBearer
 
 router = Router(tags=['Productos'])
 
+# Columnas que leen los resolvers de ProductoList, para ?fields= (core.utils.sparse_fields)
+DEPENDENCIAS_PRODUCTO = {
+	'proveedor_nombre': ['proveedor__nombre'],
+	'categoria_nombre': ['categoria__nombre'],
+	'imagen_miniatura': ['imagen_variantes'],
+	'imagen_miniatura_jpeg': ['imagen_variantes'],
+}
+
 
 @router.get('/listar_por_proveedor/{proveedor_id}', response=List[ProductoList])
+@query_budget(2)
+@cache_response('productos')
+@sparse_fields(ProductoList, DEPENDENCIAS_PRODUCTO)
 @paginate
-@search_filter(['nombre', 'descripcion', 'categoria__nombre'])
+@search_filter(['nombre', 'descripcion', 'categoria__nombre'], backend=IndiceProductosSearchBackend)
 def listar_productos_por_proveedor(request, proveedor_id: int, busqueda: str = None):
 	return ProductoModel.objects.filter(proveedor_id=proveedor_id).select_related('proveedor', 'categoria').order_by('-fecha_actualizacion')
 
 
 @router.get('/listar_todos', response=List[ProductoList])
+@query_budget(5)
+@conditional_get(validador_modelos(ProductoModel, ProveedorModel, CategoriaProductoModel))
+@cache_response('productos')
+@sparse_fields(ProductoList, DEPENDENCIAS_PRODUCTO)
 @paginate
-@search_filter(['nombre', 'descripcion', 'categoria__nombre'])
+@search_filter(['nombre', 'descripcion', 'categoria__nombre'], backend=IndiceProductosSearchBackend)
 def listar_productos_todos(request, busqueda: str = None):
 	return ProductoModel.objects.select_related('proveedor', 'categoria').order_by('-fecha_actualizacion')
 
 
+CAMPOS_EXPORTACION = {
+	'id': 'id',
+	'nombre': 'nombre',
+	'descripcion': 'descripcion',
+	'proveedor_id': 'proveedor_id',
+	'proveedor_nombre': 'proveedor__nombre',
+	'categoria_id': 'categoria_id',
+	'categoria_nombre': 'categoria__nombre',
+	'precio_compra': 'precio_compra',
+	'precio_venta': 'precio_venta',
+	'imagen': 'imagen',
+	'fecha_creacion': 'fecha_creacion',
+	'fecha_actualizacion': 'fecha_actualizacion',
+}
+
+
+def _fila_exportacion(fila: dict) -> dict:
+	fila['imagen'] = default_storage.url(fila['imagen']) if fila['imagen'] else None
+	return fila
+
+
+@search_filter(['nombre', 'descripcion', 'categoria__nombre'], backend=IndiceProductosSearchBackend)
+def _productos_a_exportar(request, proveedor_id: Optional[int] = None):
+	productos = ProductoModel.objects.order_by('id')
+	if proveedor_id is not None:
+		productos = productos.filter(proveedor_id=proveedor_id)
+	return productos
+
+
+@router.get('/exportar')
+# Las consultas corren al iterar el cuerpo; QueryBudgetMiddleware las cuenta ahí
+@query_budget(1)
+def exportar_productos(request, formato: Literal['ndjson', 'csv'] = 'ndjson', proveedor_id: Optional[int] = None, busqueda: str = None):
+	"""Catálogo completo en streaming (NDJSON o CSV), con los mismos filtros que el listado por proveedor."""
+	productos = _productos_a_exportar(request, proveedor_id=proveedor_id, busqueda=busqueda)
+	return respuesta_exportacion(productos, CAMPOS_EXPORTACION, formato, 'productos', transformar=_fila_exportacion)
+
+
+@router.get('/cambios', response=CambiosCatalogo)
+@query_budget(4)
+def cambios_catalogo(request, desde: Optional[datetime] = None, cursor: Optional[str] = None, limite: int = Query(500, ge=1, le=1000)):
+	"""Cambios del catálogo desde `desde` o desde el `cursor` de la sincronización anterior.
+
+	Repetir con el `cursor` devuelto mientras `hay_mas` sea true y guardarlo para la próxima vez.
+	Con 410 (`resincronizar`) la posición es anterior a la retención de bajas: descartar el
+	catálogo local y sincronizar de nuevo sin `desde` ni `cursor`.
+	"""
+	try:
+		return obtener_cambios(desde=desde, cursor=cursor, limite=limite)
+	except SincronizacionVencida as e:
+		return Response({'success': False, 'error': str(e), 'resincronizar': True}, status=410)
+	except ValidationError:
+		return Response({'success': False, 'error': 'Cursor inválido'}, status=400)
+
+
+@router.get('/autocompletar', response=List[ProductoAutocompletar])
+@query_budget(3)
+def autocompletar_productos_por_nombre(request, q: str, limite: int = Query(10, ge=1, le=50)):
+	return autocompletar_productos.buscar(q, limite)
+
+
 @router.get('/obtener/{producto_id}', response=ProductoDetail)
+@query_budget(1)
 def obtener_producto(request, producto_id: int):
 	return get_object_or_404(ProductoModel.objects.select_related('proveedor', 'categoria'), id=producto_id)
 
@@ -50,8 +139,7 @@ def crear_producto(request, data: ProductoCreate, imagen: File[UploadedFile] = N
 		producto = ProductoModel.objects.create(**data.dict())
 
 		if imagen:
-			imagen_comprimida = compress_image(imagen)
-			producto.imagen.save(imagen.name, imagen_comprimida, save=True)
+			guardar_imagen_original(producto, imagen)
 
 		return get_object_or_404(ProductoModel.objects.select_related('proveedor', 'categoria'), id=producto.id)
 	except IntegrityError:
@@ -75,15 +163,19 @@ def actualizar_producto(request, producto_id: int, data: ProductoUpdate, imagen:
 		if existe:
 			return Response({'success': False, 'error': 'Ya existe un producto con ese nombre en este proveedor'}, status=400)
 
+		cambia_proveedor = proveedor_id_final != producto.proveedor_id
 		for attr, value in payload.items():
 			setattr(producto, attr, value)
 
-		if imagen:
-			delete_image_file(producto.imagen)
-			imagen_comprimida = compress_image(imagen)
-			producto.imagen.save(imagen.name, imagen_comprimida, save=True)
-		else:
-			producto.save()
+		with transaction.atomic():
+			if imagen:
+				guardar_imagen_original(producto, imagen)
+			else:
+				producto.save()
+
+			if cambia_proveedor:
+				# Cambia la cantidad de proveedores distintos de los pedidos que lo incluyen
+				recalcular_totales(pedidos_afectados(producto_id=producto.id))
 
 		return get_object_or_404(ProductoModel.objects.select_related('proveedor', 'categoria'), id=producto.id)
 	except IntegrityError:
@@ -96,8 +188,11 @@ def actualizar_producto(request, producto_id: int, data: ProductoUpdate, imagen:
 def eliminar_producto(request, producto_id: int):
 	try:
 		producto = get_object_or_404(ProductoModel, id=producto_id)
-		delete_image_file(producto.imagen)
-		producto.delete()
+		# Los totales de los pedidos se corrigen en la misma transacción que el borrado
+		with transaction.atomic():
+			pedido_ids = pedidos_afectados(producto_id=producto.id)
+			producto.delete()
+			recalcular_totales(pedido_ids)
 		return {'success': True}
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
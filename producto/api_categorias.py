@@ -8,6 +8,9 @@ from typing import List
 from producto.models import CategoriaProducto as CategoriaProductoModel
 from .schemas import CategoriaProductoSchema, CategoriaProductoCreate, CategoriaProductoUpdate
 from core.utils.search_filter import search_filter
+from core.utils.query_budget import query_budget
+from core.utils.response_cache import cache_response
+from core.utils.conditional_get import conditional_get, validador_modelos
 
 
 router = Router(tags=['Categorias Producto'])
@@ -29,6 +32,9 @@ def crear_categoria_producto(request, data: CategoriaProductoCreate):
 
 
 @router.get('/listar_todas', response=List[CategoriaProductoSchema], auth=None)
+@query_budget(3)
+@conditional_get(validador_modelos(CategoriaProductoModel))
+@cache_response('categorias')
 @paginate
 @search_filter(['nombre'])
 def listar_categorias_producto(request):
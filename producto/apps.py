@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProductoConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'producto'
+
+    def ready(self):
+        from producto import signals  # noqa: F401
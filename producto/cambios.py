@@ -0,0 +1,104 @@
+"""Sincronización incremental del catálogo (categorías, proveedores, productos y bajas).
+
+Los cambios se recorren en el orden `(fecha_actualizacion, tipo, id)` mezclando las cuatro
+tablas; el cursor guarda la última posición entregada y sirve tanto para pedir la página
+siguiente como para la próxima sincronización. Las bajas salen de `RegistroEliminado`, que
+se purga pasados `CAMBIOS_RETENCION_DIAS` (comando `purgar_eliminados`): las sincronizaciones
+que quedan antes de ese corte deben rehacerse completas. Las filas de los últimos
+`CAMBIOS_MARGEN_SEGUNDOS` no se entregan todavía, para que el cursor no pase por encima de
+transacciones en curso que confirmen con una `fecha_actualizacion` anterior.
+"""
+
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+from ninja.errors import ValidationError
+
+from core.utils.keyset_pagination import codificar_cursor, decodificar_cursor
+from producto.models import CategoriaProducto, Producto, RegistroEliminado
+from proveedor.models import Proveedor
+
+# (orden del tipo dentro de una misma fecha, clave de la respuesta, consulta base)
+FUENTES = [
+	(0, 'categorias', lambda: CategoriaProducto.objects.all()),
+	(1, 'proveedores', lambda: Proveedor.objects.all()),
+	(2, 'productos', lambda: Producto.objects.select_related('proveedor', 'categoria')),
+	(3, 'eliminados', lambda: RegistroEliminado.objects.all()),
+]
+
+# Tipos de los valores del cursor: (fecha_actualizacion, orden del tipo, id, origen), donde
+# origen es el `desde` o el inicio de la sincronización completa que empezó la cadena
+CAMPOS_CURSOR = [models.DateTimeField(), models.IntegerField(), models.BigAutoField(), models.DateTimeField()]
+
+
+class SincronizacionVencida(Exception):
+	"""La posición pedida es anterior a la retención de bajas: hay que sincronizar todo de nuevo."""
+
+
+def corte_retencion() -> datetime:
+	"""Fecha antes de la cual pueden faltar bajas en `RegistroEliminado`."""
+	return timezone.now() - timedelta(days=getattr(settings, 'CAMBIOS_RETENCION_DIAS', 30))
+
+
+def _posterior_a(queryset, orden: int, posicion):
+	"""Filas de una fuente que van después de `posicion` en el orden global."""
+	fecha, orden_posicion, ultimo_id = posicion[:3]
+	if orden > orden_posicion:
+		return queryset.filter(fecha_actualizacion__gte=fecha)
+	if orden < orden_posicion:
+		return queryset.filter(fecha_actualizacion__gt=fecha)
+	return queryset.filter(Q(fecha_actualizacion__gt=fecha) | Q(fecha_actualizacion=fecha, id__gt=ultimo_id))
+
+
+def _aware(fecha: datetime) -> datetime:
+	return timezone.make_aware(fecha) if timezone.is_naive(fecha) else fecha
+
+
+def leer_cursor(cursor: str):
+	"""Posición `(fecha, orden, id, origen)` del cursor; `ValidationError` si fue alterado."""
+	_, (fecha, orden, ultimo_id, origen) = decodificar_cursor(cursor, CAMPOS_CURSOR)
+	# -1: posición inicial de una sincronización pedida con `desde`
+	if orden not in (-1, *(orden_fuente for orden_fuente, _, _ in FUENTES)):
+		raise ValidationError([{'cursor': 'Cursor inválido'}])
+	return _aware(fecha), orden, ultimo_id, _aware(origen)
+
+
+def obtener_cambios(desde: Optional[datetime] = None, cursor: Optional[str] = None, limite: int = 500) -> dict:
+	"""Página de cambios; lanza `SincronizacionVencida` si pueden faltar bajas desde la posición."""
+	ahora = timezone.now()
+	if cursor:
+		posicion = leer_cursor(cursor)
+	elif desde:
+		desde = _aware(desde)
+		posicion = (desde, -1, 0, desde)
+	else:
+		posicion = None
+
+	# Una sincronización completa solo necesita las bajas posteriores a su inicio (origen)
+	if posicion and max(posicion[0], posicion[3]) < corte_retencion():
+		raise SincronizacionVencida('Los cambios de esa fecha ya no están disponibles: sincronizar el catálogo completo')
+	origen = posicion[3] if posicion else ahora
+	hasta = ahora - timedelta(seconds=getattr(settings, 'CAMBIOS_MARGEN_SEGUNDOS', 5))
+
+	candidatos = []
+	for orden, clave, consulta in FUENTES:
+		queryset = consulta().filter(fecha_actualizacion__lte=hasta)
+		if posicion:
+			queryset = _posterior_a(queryset, orden, posicion)
+		for obj in queryset.order_by('fecha_actualizacion', 'id')[:limite + 1]:
+			candidatos.append((obj.fecha_actualizacion, orden, obj.id, clave, obj))
+	candidatos.sort(key=lambda candidato: candidato[:3])
+
+	resultado = {clave: [] for _, clave, _ in FUENTES}
+	for *_, clave, obj in candidatos[:limite]:
+		resultado[clave].append(obj)
+
+	if candidatos[:limite]:
+		posicion = (*candidatos[:limite][-1][:3], origen)
+	resultado['cursor'] = codificar_cursor('next', list(posicion)) if posicion else None
+	resultado['hay_mas'] = len(candidatos) > limite
+	return resultado
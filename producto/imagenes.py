@@ -0,0 +1,244 @@
+"""Procesamiento de imágenes de productos fuera del request.
+
+Los endpoints guardan la subida tal cual en `Producto.imagen_original`, marcan el producto
+como `pendiente` y, al confirmar la transacción, encolan `procesar_imagen_producto` en un
+pool acotado de `PRODUCTO_IMAGEN_WORKERS` hilos. El worker comprime la imagen y la publica
+junto con sus variantes (miniaturas `thumb` y `medium` y la completa, en WebP con JPEG de
+respaldo, ver `compress_image_variantes`) con un único UPDATE condicionado a que
+`imagen_original` siga siendo la misma subida: si mientras tanto llegó otra o el producto se
+borró, el resultado se descarta. Las subidas que no entran en la cola (o quedaron a medias
+por un reinicio) las retoma el comando `procesar_imagenes_pendientes`, que también genera
+las variantes de las imágenes anteriores a ellas con `--variantes`.
+
+Los archivos procesados se guardan con el SHA-256 de la subida como nombre y se registran
+en `ImagenContenido`: una subida idéntica a otra ya procesada reutiliza sus archivos sin
+volver a comprimir, sumando una referencia a cada uno (`core.models.ArchivoMedia`), y
+`delete_image_file` solo los borra cuando se libera la última.
+"""
+
+import hashlib
+import logging
+import os
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from core.utils.compress_image import compress_image_variantes
+from core.utils.delete_image_file import delete_image_file, liberar_archivos, registrar_archivos, retener_archivos
+from core.utils.response_cache import invalidar_tags
+from core.utils.tareas import PoolTareas
+from producto.models import ImagenContenido, Producto
+
+logger = logging.getLogger('producto.imagenes')
+
+EstadoImagen = Producto.ImagenEstadoChoices
+
+DIRECTORIO_VARIANTES = 'productos/variantes/'
+
+pool_imagenes = PoolTareas(
+	'imagenes',
+	workers=getattr(settings, 'PRODUCTO_IMAGEN_WORKERS', 2),
+	max_pendientes=getattr(settings, 'PRODUCTO_IMAGEN_COLA_MAX', 50),
+)
+
+
+def guardar_imagen_original(producto: Producto, archivo) -> None:
+	"""Asigna al producto la imagen de una subida idéntica ya procesada o, si no hay, guarda
+	`archivo` sin procesar, marca el producto como pendiente y encola el procesamiento.
+	"""
+	anterior = producto.imagen_original.name if producto.imagen_original else None
+	variantes = _reutilizar(_hash_archivo(archivo))
+	if variantes is not None:
+		imagen_anterior, variantes_anteriores = producto.imagen.name, producto.imagen_variantes
+		producto.imagen = variantes['full']['jpeg']
+		producto.imagen_variantes = variantes
+		producto.imagen_original = None
+		producto.imagen_estado = EstadoImagen.LISTA
+		producto.save()
+		_liberar(imagen_anterior, variantes_anteriores)
+	else:
+		producto.imagen_original.save(os.path.basename(archivo.name), archivo, save=False)
+		producto.imagen_estado = EstadoImagen.PENDIENTE
+		producto.save()
+		encolar_procesamiento(producto.id)
+	if anterior:
+		# Una subida anterior todavía sin procesar queda reemplazada por esta
+		default_storage.delete(anterior)
+
+
+def _hash_archivo(archivo) -> str:
+	sha = hashlib.sha256()
+	for chunk in archivo.chunks():
+		sha.update(chunk)
+	archivo.seek(0)
+	return sha.hexdigest()
+
+
+def _reutilizar(hash_contenido: str):
+	"""Variantes ya procesadas de ese contenido, con una referencia más a cada archivo; None si no hay."""
+	contenido = ImagenContenido.objects.filter(hash=hash_contenido).first()
+	if contenido is None or not retener_archivos(_nombres_variantes(contenido.variantes)):
+		return None
+	return contenido.variantes
+
+
+def url_variante(variantes: dict, variante: str, formato: str = 'webp'):
+	"""URL de `variante` en `formato`, o en JPEG si no hay ese formato; None si no hay variantes."""
+	formatos = (variantes or {}).get(variante)
+	if not formatos:
+		return None
+	nombre = formatos.get(formato) or formatos.get('jpeg')
+	return default_storage.url(nombre) if nombre else None
+
+
+def urls_variantes(variantes: dict) -> dict:
+	return {
+		variante: {formato: default_storage.url(nombre) for formato, nombre in formatos.items()}
+		for variante, formatos in (variantes or {}).items()
+	}
+
+
+def _nombres_variantes(variantes: dict) -> set:
+	return {nombre for formatos in (variantes or {}).values() for nombre in formatos.values()}
+
+
+def _liberar(imagen: str, variantes: dict) -> None:
+	"""Libera una referencia a la imagen y a cada variante (la completa en JPEG suele ser la misma)."""
+	liberar_archivos(_nombres_variantes(variantes) | {imagen})
+
+
+def eliminar_archivos_imagen(producto: Producto) -> None:
+	"""Libera la imagen del producto y todas sus variantes y borra la subida pendiente.
+
+	Se llama desde el `post_delete` de `Producto` (producto.signals), incluidos los borrados
+	en cascada.
+	"""
+	_liberar(producto.imagen.name, producto.imagen_variantes)
+	delete_image_file(producto.imagen_original)
+
+
+def _guardar_variantes(variantes: dict, conservar_completa: str = None) -> dict:
+	"""Guarda en el storage los archivos de `compress_image_variantes` y devuelve sus nombres.
+
+	La completa en JPEG va a `upload_to` de `Producto.imagen`, salvo que se pase
+	`conservar_completa` (el nombre de una imagen ya guardada); el resto a `DIRECTORIO_VARIANTES`.
+	"""
+	campo_imagen = Producto._meta.get_field('imagen')
+	nombres = {}
+	try:
+		for variante, formatos in variantes.items():
+			nombres[variante] = {}
+			for formato, archivo in formatos.items():
+				if variante == 'full' and formato == 'jpeg':
+					nombres[variante][formato] = conservar_completa or default_storage.save(
+						campo_imagen.generate_filename(None, archivo.name), archivo
+					)
+				else:
+					nombres[variante][formato] = default_storage.save(DIRECTORIO_VARIANTES + archivo.name, archivo)
+	except Exception:
+		liberar_archivos(_nombres_variantes(nombres) - {conservar_completa})
+		raise
+	return nombres
+
+
+def _registrar_contenido(hash_contenido: str, variantes: dict) -> dict:
+	"""Registra los archivos recién guardados como resultado de `hash_contenido`.
+
+	Si otro worker registró el mismo contenido mientras tanto se usan sus archivos y se
+	borran los propios.
+	"""
+	with transaction.atomic():
+		contenido, creado = ImagenContenido.objects.select_for_update().get_or_create(
+			hash=hash_contenido, defaults={'variantes': variantes}
+		)
+		if not creado and retener_archivos(_nombres_variantes(contenido.variantes)):
+			propios, variantes = variantes, contenido.variantes
+		else:
+			propios = None
+			if not creado:
+				# El registro era de archivos cuya última referencia ya se liberó
+				contenido.variantes = variantes
+				contenido.save(update_fields=['variantes', 'fecha_actualizacion'])
+			registrar_archivos(_nombres_variantes(variantes))
+	if propios:
+		_liberar(None, propios)
+	return variantes
+
+
+def encolar_procesamiento(producto_id: int) -> None:
+	transaction.on_commit(lambda: pool_imagenes.encolar(procesar_imagen_producto, producto_id))
+
+
+def _actualizar_si_vigente(producto_id: int, original: str, **campos) -> bool:
+	"""UPDATE del producto solo si `imagen_original` sigue siendo `original`."""
+	return bool(Producto.objects.filter(id=producto_id, imagen_original=original).update(**campos))
+
+
+def procesar_imagen_producto(producto_id: int) -> bool:
+	"""Comprime la subida pendiente del producto y la publica. Devuelve True si la publicó."""
+	fila = Producto.objects.filter(id=producto_id).values('imagen', 'imagen_original', 'imagen_variantes').first()
+	if not fila or not fila['imagen_original']:
+		return False
+	original = fila['imagen_original']
+	if not _actualizar_si_vigente(producto_id, original, imagen_estado=EstadoImagen.PROCESANDO):
+		return False
+
+	try:
+		with default_storage.open(original, 'rb') as archivo:
+			hash_contenido = _hash_archivo(archivo)
+			# Otra subida idéntica pudo procesarse mientras esta esperaba en la cola
+			variantes = _reutilizar(hash_contenido)
+			if variantes is None:
+				variantes = _guardar_variantes(compress_image_variantes(archivo, nombre=hash_contenido))
+				variantes = _registrar_contenido(hash_contenido, variantes)
+	except Exception:
+		logger.exception('No se pudo procesar la imagen del producto %s', producto_id)
+		_actualizar_si_vigente(producto_id, original, imagen_estado=EstadoImagen.ERROR)
+		return False
+
+	with transaction.atomic():
+		publicada = _actualizar_si_vigente(
+			producto_id,
+			original,
+			imagen=variantes['full']['jpeg'],
+			imagen_variantes=variantes,
+			imagen_original=None,
+			imagen_estado=EstadoImagen.LISTA,
+			fecha_actualizacion=timezone.now(),
+		)
+	if not publicada:
+		_liberar(None, variantes)
+		return False
+
+	_liberar(fila['imagen'], fila['imagen_variantes'])
+	delete_image_file(original)
+	# UPDATE no dispara post_save: invalidar a mano las respuestas cacheadas
+	transaction.on_commit(lambda: invalidar_tags('productos'))
+	return True
+
+
+def generar_variantes_producto(producto_id: int) -> bool:
+	"""Genera las variantes de una imagen ya publicada que no las tiene (imágenes anteriores)."""
+	fila = Producto.objects.filter(id=producto_id).values('imagen', 'imagen_variantes').first()
+	if not fila or not fila['imagen'] or fila['imagen_variantes']:
+		return False
+	imagen = fila['imagen']
+
+	try:
+		with default_storage.open(imagen, 'rb') as archivo:
+			variantes = _guardar_variantes(compress_image_variantes(archivo), conservar_completa=imagen)
+	except Exception:
+		logger.exception('No se pudieron generar las variantes del producto %s', producto_id)
+		return False
+
+	publicadas = Producto.objects.filter(id=producto_id, imagen=imagen).update(
+		imagen_variantes=variantes,
+		fecha_actualizacion=timezone.now(),
+	)
+	if not publicadas:
+		liberar_archivos(_nombres_variantes(variantes) - {imagen})
+		return False
+	transaction.on_commit(lambda: invalidar_tags('productos'))
+	return True
@@ -0,0 +1,149 @@
+"""Índice invertido en memoria del catálogo de productos para búsquedas de baja latencia.
+
+Indexa nombre, descripción, nombre de proveedor y nombre de categoría. Se construye de
+forma perezosa en la primera búsqueda, se actualiza incrementalmente con las señales de
+`producto.signals` y cada `PRODUCTO_INDICE_SINCRONIZAR_CADA` segundos se pone al día con
+los cambios hechos por otros procesos (por `fecha_actualizacion` y conteo de filas).
+Se activa con `PRODUCTO_INDICE_BUSQUEDA`.
+"""
+
+import threading
+import time
+
+from django.conf import settings
+from django.db.models import Count, Max, Q
+
+from core.utils.ngram_index import NGramIndex
+from core.utils.normalizar_texto import tokenizar
+from core.utils.prefix_index import ModelPrefixIndex
+from core.utils.search_backends import obtener_backend_busqueda
+from producto.models import CategoriaProducto, Producto
+from proveedor.models import Proveedor
+
+CAMPOS_INDEXADOS = ['nombre', 'descripcion', 'proveedor__nombre', 'categoria__nombre']
+
+
+def _documentos(queryset):
+	for producto_id, *textos in queryset.values_list('id', *CAMPOS_INDEXADOS).iterator(chunk_size=5000):
+		yield producto_id, ' '.join(texto for texto in textos if texto)
+
+
+class IndiceProductos:
+	def __init__(self):
+		self.indice = NGramIndex(n=3)
+		self._lock = threading.Lock()
+		self._construido = False
+		self._version = None
+		self._proxima_sincronizacion = 0.0
+
+	@staticmethod
+	def activo() -> bool:
+		return getattr(settings, 'PRODUCTO_INDICE_BUSQUEDA', False)
+
+	@staticmethod
+	def _leer_version():
+		productos = Producto.objects.aggregate(total=Count('id'), ultima=Max('fecha_actualizacion'))
+		proveedores = Proveedor.objects.aggregate(ultima=Max('fecha_actualizacion'))
+		categorias = CategoriaProducto.objects.aggregate(total=Count('id'), ultima=Max('fecha_actualizacion'))
+		return {
+			'productos_total': productos['total'],
+			'productos_ultima': productos['ultima'],
+			'proveedores_ultima': proveedores['ultima'],
+			'categorias_total': categorias['total'],
+			'categorias_ultima': categorias['ultima'],
+		}
+
+	def construir(self) -> None:
+		with self._lock:
+			self._construir()
+
+	def _construir(self) -> None:
+		version = self._leer_version()
+		self.indice.cargar(_documentos(Producto.objects.all()))
+		self._version = version
+		self._construido = True
+		self._proxima_sincronizacion = time.monotonic() + getattr(settings, 'PRODUCTO_INDICE_SINCRONIZAR_CADA', 10)
+
+	def sincronizar(self) -> None:
+		"""Aplica los cambios hechos fuera de este proceso desde la última versión leída."""
+		with self._lock:
+			anterior = self._version
+			version = self._leer_version()
+			if version == anterior:
+				return
+			if version['categorias_total'] < anterior['categorias_total']:
+				# Borrar una categoría pone NULL en sus productos sin tocar fecha_actualizacion
+				self._construir()
+				return
+
+			cambios = Q()
+			for clave, lookup in (
+				('productos_ultima', 'fecha_actualizacion__gt'),
+				('proveedores_ultima', 'proveedor__fecha_actualizacion__gt'),
+				('categorias_ultima', 'categoria__fecha_actualizacion__gt'),
+			):
+				if anterior[clave] is not None and version[clave] != anterior[clave]:
+					cambios |= Q(**{lookup: anterior[clave]})
+				elif anterior[clave] is None and version[clave] is not None:
+					cambios |= Q(**{lookup.removesuffix('__gt') + '__isnull': False})
+			if cambios:
+				for producto_id, texto in _documentos(Producto.objects.filter(cambios)):
+					self.indice.agregar(producto_id, texto)
+
+			if version['productos_total'] != len(self.indice):
+				existentes = set(Producto.objects.values_list('id', flat=True).iterator(chunk_size=5000))
+				for producto_id in self.indice.ids() - existentes:
+					self.indice.quitar(producto_id)
+
+			self._version = version
+
+	def buscar(self, consulta: str):
+		if not self._construido:
+			self.construir()
+		elif time.monotonic() >= self._proxima_sincronizacion:
+			self._proxima_sincronizacion = time.monotonic() + getattr(settings, 'PRODUCTO_INDICE_SINCRONIZAR_CADA', 10)
+			self.sincronizar()
+		return self.indice.buscar(consulta)
+
+	def actualizar_productos(self, queryset) -> None:
+		if not self._construido:
+			return
+		for producto_id, texto in _documentos(queryset):
+			self.indice.agregar(producto_id, texto)
+
+	def quitar_producto(self, producto_id: int) -> None:
+		if self._construido:
+			self.indice.quitar(producto_id)
+
+
+indice_productos = IndiceProductos()
+
+# Prefijos de nombres para /productos/autocompletar
+autocompletar_productos = ModelPrefixIndex(Producto, 'nombre', ['proveedor_id'])
+
+
+class IndiceProductosSearchBackend:
+	"""Backend de search_filter que resuelve los ids con `indice_productos` y filtra con `id__in`.
+
+	Todos los tokens de la búsqueda deben aparecer (AND) en alguno de `CAMPOS_INDEXADOS`.
+	Si el índice está desactivado se usa el backend de la base de datos con los campos del
+	decorador; si la búsqueda es demasiado amplia (más de `PRODUCTO_INDICE_MAX_IDS`) o solo
+	tiene tokens cortos, se hace la misma búsqueda por tokens en la base de datos.
+	"""
+
+	def filtrar(self, queryset, fields, q):
+		if not IndiceProductos.activo():
+			return obtener_backend_busqueda(queryset.db).filtrar(queryset, fields, q)
+
+		ids = indice_productos.buscar(q)
+		if ids is not None and len(ids) <= getattr(settings, 'PRODUCTO_INDICE_MAX_IDS', 5000):
+			return queryset.filter(id__in=ids)
+
+		backend_bd = obtener_backend_busqueda(queryset.db)
+		filtro = Q()
+		for token in tokenizar(q):
+			filtro_token = Q()
+			for campo in CAMPOS_INDEXADOS:
+				filtro_token |= backend_bd.filtro_campo(queryset.model, campo, token)
+			filtro &= filtro_token
+		return queryset.filter(filtro)
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import override_settings
+
+from core.utils.search_backends import IContainsSearchBackend, obtener_backend_busqueda
+from producto.indice_busqueda import IndiceProductosSearchBackend, indice_productos
+from producto.models import Producto
+
+# Mismos campos y orden que /productos/listar_todos
+CAMPOS = ['nombre', 'descripcion', 'categoria__nombre']
+TERMINOS = ['prod', 'leche', 'producto 12', 'zzzz']
+
+
+class Command(BaseCommand):
+    help = 'Mide la latencia de búsqueda de productos con icontains, el backend de la BD y el índice en memoria.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('terminos', nargs='*', help=f'Búsquedas a medir (por defecto: {", ".join(TERMINOS)})')
+        parser.add_argument('--limit', type=int, default=100, help='Productos por página')
+        parser.add_argument('--repeticiones', type=int, default=20, help='Búsquedas por término y backend')
+
+    def handle(self, *args, **options):
+        terminos = options['terminos'] or TERMINOS
+        limit = options['limit']
+        repeticiones = options['repeticiones']
+        if limit <= 0 or repeticiones <= 0:
+            raise CommandError('--limit y --repeticiones deben ser mayores a 0')
+        if not Producto.objects.exists():
+            raise CommandError('No hay productos: ejecutar poblar_bd primero')
+
+        base = Producto.objects.select_related('proveedor', 'categoria').order_by('-fecha_actualizacion')
+        backend_bd = obtener_backend_busqueda(base.db)
+        casos = [
+            ('icontains', IContainsSearchBackend()),
+            (type(backend_bd).__name__, backend_bd),
+            ('índice en memoria', IndiceProductosSearchBackend()),
+        ]
+
+        with override_settings(PRODUCTO_INDICE_BUSQUEDA=True):
+            inicio = time.perf_counter()
+            indice_productos.construir()
+            self.stdout.write(f'Índice construido en {time.perf_counter() - inicio:.2f} s')
+            self.stdout.write(f'{repeticiones} búsquedas por caso, páginas de {limit} productos')
+
+            for termino in terminos:
+                self.stdout.write(f'\n"{termino}"')
+                referencia = None
+                for nombre, backend in casos:
+                    queryset = backend.filtrar(base, CAMPOS, termino)
+                    total = queryset.count()
+                    inicio = time.perf_counter()
+                    for _ in range(repeticiones):
+                        list(backend.filtrar(base, CAMPOS, termino)[:limit])
+                    por_busqueda = (time.perf_counter() - inicio) / repeticiones * 1000
+                    referencia = referencia or por_busqueda
+                    self.stdout.write(
+                        f'  {nombre:<32} {por_busqueda:9.2f} ms/página  x{referencia / por_busqueda:6.1f}  {total:>8} resultados'
+                    )
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from producto.imagenes import EstadoImagen, generar_variantes_producto, procesar_imagen_producto
+from producto.models import Producto
+
+
+class Command(BaseCommand):
+    help = 'Procesa las imágenes de productos que quedaron pendientes (cola llena, reinicio o error) y, con --variantes, genera las que faltan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reintentar-errores', action='store_true', help='Incluye las imágenes que fallaron')
+        parser.add_argument('--variantes', action='store_true', help='Genera las variantes de las imágenes que no las tienen')
+
+    def handle(self, *args, **options):
+        estados = [EstadoImagen.PENDIENTE, EstadoImagen.PROCESANDO]
+        if options['reintentar_errores']:
+            estados.append(EstadoImagen.ERROR)
+
+        pendientes = (
+            Producto.objects.filter(imagen_estado__in=estados)
+            .exclude(imagen_original='')
+            .exclude(imagen_original__isnull=True)
+            .values_list('id', flat=True)
+        )
+        procesadas = 0
+        fallidas = 0
+        for producto_id in list(pendientes):
+            if procesar_imagen_producto(producto_id):
+                procesadas += 1
+            else:
+                fallidas += 1
+
+        self.stdout.write(self.style.SUCCESS(f'Imágenes procesadas: {procesadas}'))
+        if fallidas:
+            self.stdout.write(self.style.WARNING(f'Sin procesar: {fallidas}'))
+
+        if options['variantes']:
+            sin_variantes = (
+                Producto.objects.filter(imagen_variantes={}, imagen_estado=EstadoImagen.LISTA)
+                .exclude(imagen='')
+                .exclude(imagen__isnull=True)
+                .values_list('id', flat=True)
+            )
+            generadas = sum(generar_variantes_producto(producto_id) for producto_id in list(sin_variantes))
+            self.stdout.write(self.style.SUCCESS(f'Productos con variantes generadas: {generadas}'))
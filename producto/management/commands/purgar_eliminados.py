@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from producto.cambios import corte_retencion
+from producto.models import RegistroEliminado
+
+
+class Command(BaseCommand):
+    help = 'Borra las bajas de RegistroEliminado anteriores a CAMBIOS_RETENCION_DIAS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=5000, help='Registros borrados por lote')
+        parser.add_argument('--dry-run', action='store_true', help='Solo informa cuántos registros se borrarían')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        if batch_size <= 0:
+            raise CommandError('--batch-size debe ser mayor a 0')
+
+        corte = corte_retencion()
+        vencidos = RegistroEliminado.objects.filter(fecha_actualizacion__lt=corte)
+        dias = getattr(settings, 'CAMBIOS_RETENCION_DIAS', 30)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(f'Bajas de más de {dias} días: {vencidos.count()} (sin borrar)'))
+            return
+
+        total = 0
+        while True:
+            ids = list(vencidos.order_by('id').values_list('id', flat=True)[:batch_size])
+            if not ids:
+                break
+            total += RegistroEliminado.objects.filter(id__in=ids).delete()[0]
+        self.stdout.write(self.style.SUCCESS(f'Bajas de más de {dias} días borradas: {total}'))
@@ -0,0 +1,39 @@
+from django.db import migrations
+
+
+# Índices GIN de pg_trgm para que las búsquedas `ILIKE '%q%'` de search_filter
+# usen índice en PostgreSQL. En otros motores (SQLite) no se crea nada.
+INDICES = [
+    ('producto_nombre_trgm', 'producto', 'nombre'),
+    ('producto_descripcion_trgm', 'producto', 'descripcion'),
+    ('categoria_producto_nombre_trgm', 'categoria_producto', 'nombre'),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nombre, tabla, columna in INDICES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {nombre} ON {tabla} USING gin ({columna} gin_trgm_ops)'
+        )
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _tabla, _columna in INDICES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {nombre}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('producto', '0003_alter_categoriaproducto_nombre_and_more'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
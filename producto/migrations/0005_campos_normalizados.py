@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+from core.utils.normalizar_texto import normalizar_texto
+
+CAMPOS_NORMALIZADOS = {'nombre': 'nombre_normalizado', 'descripcion': 'descripcion_normalizada'}
+TAMANO_LOTE = 2000
+
+
+def rellenar_campos_normalizados(apps, schema_editor):
+    Producto = apps.get_model('producto', 'Producto')
+    lote = []
+    for obj in Producto.objects.only(*CAMPOS_NORMALIZADOS).order_by('id').iterator(chunk_size=TAMANO_LOTE):
+        for campo, destino in CAMPOS_NORMALIZADOS.items():
+            setattr(obj, destino, normalizar_texto(getattr(obj, campo)))
+        lote.append(obj)
+        if len(lote) >= TAMANO_LOTE:
+            Producto.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS.values()))
+            lote = []
+    if lote:
+        Producto.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS.values()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producto', '0004_indices_trigram_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='descripcion_normalizada',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='nombre_normalizado',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(rellenar_campos_normalizados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+from django.db import migrations
+
+
+# Las búsquedas pasan a hacerse sobre las columnas normalizadas: se mueven allí los
+# índices GIN de pg_trgm creados en 0004. En otros motores (SQLite) no se hace nada.
+INDICES_NUEVOS = [
+    ('producto_nombre_norm_trgm', 'producto', 'nombre_normalizado'),
+    ('producto_descripcion_norm_trgm', 'producto', 'descripcion_normalizada'),
+]
+INDICES_ANTERIORES = [
+    ('producto_nombre_trgm', 'producto', 'nombre'),
+    ('producto_descripcion_trgm', 'producto', 'descripcion'),
+]
+
+
+def _crear(schema_editor, indices):
+    for nombre, tabla, columna in indices:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {nombre} ON {tabla} USING gin ({columna} gin_trgm_ops)'
+        )
+
+
+def _borrar(schema_editor, indices):
+    for nombre, _tabla, _columna in indices:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {nombre}')
+
+
+def mover_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    _crear(schema_editor, INDICES_NUEVOS)
+    _borrar(schema_editor, INDICES_ANTERIORES)
+
+
+def restaurar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    _crear(schema_editor, INDICES_ANTERIORES)
+    _borrar(schema_editor, INDICES_NUEVOS)
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('producto', '0005_campos_normalizados'),
+    ]
+
+    operations = [
+        migrations.RunPython(mover_indices, restaurar_indices),
+    ]
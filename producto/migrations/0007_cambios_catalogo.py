@@ -0,0 +1,39 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producto', '0006_indices_trigram_normalizados'),
+        ('proveedor', '0006_indices_trigram_normalizados'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegistroEliminado',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('tipo', models.CharField(choices=[('categoria', 'Categoría'), ('proveedor', 'Proveedor'), ('producto', 'Producto')], max_length=20)),
+                ('objeto_id', models.BigIntegerField()),
+            ],
+            options={
+                'db_table': 'registro_eliminado',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='categoriaproducto',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='categoria_fecha_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='producto',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='producto_fecha_act_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='registroeliminado',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='eliminado_fecha_act_idx'),
+        ),
+    ]
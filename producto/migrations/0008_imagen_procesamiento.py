@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producto', '0007_cambios_catalogo'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_estado',
+            field=models.CharField(choices=[('lista', 'Lista'), ('pendiente', 'Pendiente'), ('procesando', 'Procesando'), ('error', 'Error')], default='lista', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='producto',
+            name='imagen_original',
+            field=models.FileField(blank=True, null=True, upload_to='productos/originales/'),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('producto', '0009_imagen_variantes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImagenContenido',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fecha_creacion', models.DateTimeField(auto_now_add=True)),
+                ('fecha_actualizacion', models.DateTimeField(auto_now=True)),
+                ('hash', models.CharField(max_length=64, unique=True)),
+                ('variantes', models.JSONField(default=dict)),
+            ],
+            options={
+                'db_table': 'imagen_contenido',
+            },
+        ),
+    ]
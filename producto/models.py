@@ -2,13 +2,30 @@ from django.db import models
 from core.models import BaseModel
 # Create your models here.
 class Producto(BaseModel):
+    class ImagenEstadoChoices(models.TextChoices):
+        LISTA = 'lista', 'Lista'
+        PENDIENTE = 'pendiente', 'Pendiente'
+        PROCESANDO = 'procesando', 'Procesando'
+        ERROR = 'error', 'Error'
+
     proveedor = models.ForeignKey('proveedor.Proveedor', on_delete=models.CASCADE, related_name='productos')
     nombre = models.CharField(max_length=50)
     imagen = models.ImageField(upload_to='productos/', blank=True, null=True)
+    # Subida sin procesar que espera su turno en producto.imagenes; `imagen` conserva la
+    # versión anterior hasta que la comprimida la reemplaza
+    imagen_original = models.FileField(upload_to='productos/originales/', blank=True, null=True)
+    # {variante: {formato: nombre en el storage}} de producto.imagenes (thumb, medium, full)
+    imagen_variantes = models.JSONField(default=dict, blank=True)
+    imagen_estado = models.CharField(max_length=20, choices=ImagenEstadoChoices.choices, default=ImagenEstadoChoices.LISTA)
     descripcion = models.TextField(max_length=50, blank=True, null=True)
     precio_compra = models.DecimalField(max_digits=10, decimal_places=2,null=True, blank=True)
     precio_venta = models.DecimalField(max_digits=10, decimal_places=2,null=True, blank=True)
     categoria = models.ForeignKey('CategoriaProducto', on_delete=models.SET_NULL, null=True, blank=True, related_name='productos')
+    nombre_normalizado = models.CharField(max_length=100, blank=True, default='', db_index=True, editable=False)
+    descripcion_normalizada = models.TextField(blank=True, default='', editable=False)
+
+    CAMPOS_NORMALIZADOS = {'nombre': 'nombre_normalizado', 'descripcion': 'descripcion_normalizada'}
+
     class Meta:
         db_table = 'producto'
         constraints = [
@@ -17,9 +34,48 @@ class Producto(BaseModel):
                 name='unique_producto_nombre_por_proveedor'
             )
         ]
+        indexes = [
+            models.Index(fields=['fecha_actualizacion', 'id'], name='producto_fecha_act_idx'),
+        ]
 
 class CategoriaProducto(BaseModel):
     nombre = models.CharField(max_length=50, unique=True)
 
     class Meta:
         db_table = 'categoria_producto'
+        indexes = [
+            models.Index(fields=['fecha_actualizacion', 'id'], name='categoria_fecha_act_idx'),
+        ]
+
+
+class RegistroEliminado(BaseModel):
+    """Tombstone de un objeto del catálogo borrado, para que /productos/cambios informe las bajas."""
+
+    class TipoChoices(models.TextChoices):
+        CATEGORIA = 'categoria', 'Categoría'
+        PROVEEDOR = 'proveedor', 'Proveedor'
+        PRODUCTO = 'producto', 'Producto'
+
+    tipo = models.CharField(max_length=20, choices=TipoChoices.choices)
+    objeto_id = models.BigIntegerField()
+
+    class Meta:
+        db_table = 'registro_eliminado'
+        indexes = [
+            models.Index(fields=['fecha_actualizacion', 'id'], name='eliminado_fecha_act_idx'),
+        ]
+
+
+class ImagenContenido(BaseModel):
+    """Resultado del procesamiento de una imagen subida, por hash SHA-256 de sus bytes.
+
+    Una subida idéntica a otra ya procesada reutiliza sus archivos (contados en
+    `core.models.ArchivoMedia`) sin volver a comprimir.
+    """
+
+    hash = models.CharField(max_length=64, unique=True)
+    # {variante: {formato: nombre en el storage}}, como Producto.imagen_variantes
+    variantes = models.JSONField(default=dict)
+
+    class Meta:
+        db_table = 'imagen_contenido'
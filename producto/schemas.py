@@ -1,9 +1,12 @@
 from ninja import Schema, ModelSchema
-from typing import Optional, Annotated
+from typing import Dict, List, Optional, Annotated
+from datetime import datetime
 from decimal import Decimal
 from pydantic import StringConstraints
 from producto.models import Producto as ProductoModel
 from producto.models import CategoriaProducto as CategoriaProductoModel
+from proveedor.schemas import Proveedor as ProveedorSchema
+from producto.imagenes import url_variante, urls_variantes
 
 Str50 = Annotated[str, StringConstraints(max_length=50)]
 
@@ -11,10 +14,20 @@ Str50 = Annotated[str, StringConstraints(max_length=50)]
 class ProductoList(ModelSchema):
 	proveedor_nombre: Optional[Str50] = None
 	categoria_nombre: Optional[Str50] = None
+	imagen_miniatura: Optional[str] = None
+	imagen_miniatura_jpeg: Optional[str] = None
 
 	class Meta:
 		model = ProductoModel
-		exclude = ['descripcion']
+		exclude = ['descripcion', 'nombre_normalizado', 'descripcion_normalizada', 'imagen_original', 'imagen_variantes']
+
+	@staticmethod
+	def resolve_imagen_miniatura(obj):
+		return url_variante(obj.imagen_variantes, 'thumb')
+
+	@staticmethod
+	def resolve_imagen_miniatura_jpeg(obj):
+		return url_variante(obj.imagen_variantes, 'thumb', 'jpeg')
 
 	@staticmethod
 	def resolve_proveedor_nombre(obj):
@@ -32,10 +45,15 @@ class ProductoList(ModelSchema):
 class ProductoDetail(ModelSchema):
 	proveedor_nombre: Optional[Str50] = None
 	categoria_nombre: Optional[Str50] = None
+	imagen_variantes: Dict[str, Dict[str, str]] = {}
 
 	class Meta:
 		model = ProductoModel
-		fields = '__all__'
+		exclude = ['nombre_normalizado', 'descripcion_normalizada', 'imagen_original', 'imagen_variantes']
+
+	@staticmethod
+	def resolve_imagen_variantes(obj):
+		return urls_variantes(obj.imagen_variantes)
 
 	@staticmethod
 	def resolve_proveedor_nombre(obj):
@@ -50,6 +68,12 @@ class ProductoDetail(ModelSchema):
 		return obj.categoria.nombre
 
 
+class ProductoAutocompletar(Schema):
+	id: int
+	nombre: Str50
+	proveedor_id: int
+
+
 class ProductoCreate(Schema):
 	proveedor_id: int
 	nombre: Str50
@@ -78,3 +102,18 @@ class CategoriaProductoCreate(Schema):
 
 class CategoriaProductoUpdate(Schema):
 	nombre: Optional[Str50] = None
+
+
+class RegistroEliminadoSchema(Schema):
+	tipo: str
+	objeto_id: int
+	fecha_actualizacion: datetime
+
+
+class CambiosCatalogo(Schema):
+	categorias: List[CategoriaProductoSchema]
+	proveedores: List[ProveedorSchema]
+	productos: List[ProductoDetail]
+	eliminados: List[RegistroEliminadoSchema]
+	cursor: Optional[str] = None
+	hay_mas: bool
@@ -0,0 +1,69 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from core.utils.response_cache import registrar_tags
+from producto.imagenes import eliminar_archivos_imagen
+from producto.indice_busqueda import autocompletar_productos, indice_productos
+from producto.models import CategoriaProducto, Producto, RegistroEliminado
+from proveedor.models import Proveedor
+
+registrar_tags(Producto, 'productos')
+registrar_tags(CategoriaProducto, 'categorias', 'productos')
+
+
+@receiver(post_save, sender=Producto)
+def indexar_producto(sender, instance, **kwargs):
+	indice_productos.actualizar_productos(Producto.objects.filter(id=instance.id))
+	autocompletar_productos.actualizar(instance)
+
+
+@receiver(post_delete, sender=Producto)
+def desindexar_producto(sender, instance, **kwargs):
+	indice_productos.quitar_producto(instance.id)
+	autocompletar_productos.quitar(instance.id)
+
+
+@receiver(post_delete, sender=Producto)
+def eliminar_imagenes_producto(sender, instance, **kwargs):
+	# También en los borrados en cascada (p. ej. al eliminar su proveedor)
+	eliminar_archivos_imagen(instance)
+
+
+@receiver(post_save, sender=Proveedor)
+def reindexar_productos_proveedor(sender, instance, created, **kwargs):
+	if not created:
+		indice_productos.actualizar_productos(Producto.objects.filter(proveedor_id=instance.id))
+
+
+@receiver(post_save, sender=CategoriaProducto)
+def reindexar_productos_categoria(sender, instance, created, **kwargs):
+	if not created:
+		indice_productos.actualizar_productos(Producto.objects.filter(categoria_id=instance.id))
+
+
+@receiver(pre_delete, sender=CategoriaProducto)
+def recordar_productos_categoria(sender, instance, **kwargs):
+	# El SET_NULL posterior no emite señales por producto: guardamos los ids antes de borrar
+	instance._productos_ids = list(Producto.objects.filter(categoria_id=instance.id).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=CategoriaProducto)
+def reindexar_productos_categoria_borrada(sender, instance, **kwargs):
+	ids = getattr(instance, '_productos_ids', None)
+	if ids:
+		# Para que /productos/cambios entregue los productos que quedaron sin categoría
+		Producto.objects.filter(id__in=ids).update(fecha_actualizacion=timezone.now())
+		indice_productos.actualizar_productos(Producto.objects.filter(id__in=ids))
+
+
+@receiver(post_delete, sender=CategoriaProducto)
+@receiver(post_delete, sender=Proveedor)
+@receiver(post_delete, sender=Producto)
+def registrar_eliminado(sender, instance, **kwargs):
+	tipos = {
+		CategoriaProducto: RegistroEliminado.TipoChoices.CATEGORIA,
+		Proveedor: RegistroEliminado.TipoChoices.PROVEEDOR,
+		Producto: RegistroEliminado.TipoChoices.PRODUCTO,
+	}
+	RegistroEliminado.objects.create(tipo=tipos[sender], objeto_id=instance.id)
@@ -0,0 +1,179 @@
+import io
+import shutil
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from PIL import Image
+
+from core.models import ArchivoMedia as ArchivoMediaModel
+from core.utils.keyset_pagination import codificar_cursor
+from producto.imagenes import guardar_imagen_original, pool_imagenes
+from producto.models import Producto as ProductoModel, RegistroEliminado as RegistroEliminadoModel
+from proveedor.models import Proveedor as ProveedorModel
+
+
+@override_settings(CAMBIOS_MARGEN_SEGUNDOS=0, CAMBIOS_RETENCION_DIAS=30)
+class CambiosCatalogoTest(TestCase):
+	"""Sincronización incremental de /productos/cambios (producto.cambios)."""
+
+	URL = '/api/productos/cambios'
+
+	@classmethod
+	def setUpTestData(cls):
+		cls.proveedor = ProveedorModel.objects.create(nombre='Proveedor')
+		cls.otro_proveedor = ProveedorModel.objects.create(nombre='Otro proveedor')
+		cls.productos = [ProductoModel.objects.create(proveedor=cls.proveedor, nombre=f'Producto {i}') for i in range(3)]
+		cls.producto_otro = ProductoModel.objects.create(proveedor=cls.otro_proveedor, nombre='Producto otro')
+
+	def _cambios(self, **params):
+		response = self.client.get(self.URL, params)
+		self.assertEqual(response.status_code, 200)
+		return response.json()
+
+	def _sincronizar(self, cursor=None):
+		"""Recorre todas las páginas; devuelve los cambios acumulados y el último cursor."""
+		acumulado = {'categorias': [], 'proveedores': [], 'productos': [], 'eliminados': []}
+		while True:
+			pagina = self._cambios(limite=2, **({'cursor': cursor} if cursor else {}))
+			for clave, items in acumulado.items():
+				items.extend(pagina[clave])
+			cursor = pagina['cursor'] or cursor
+			if not pagina['hay_mas']:
+				return acumulado, cursor
+
+	def test_sincronizacion_completa_y_cambios(self):
+		inicial, cursor = self._sincronizar()
+		self.assertEqual(len(inicial['proveedores']), 2)
+		self.assertEqual(len(inicial['productos']), 4)
+
+		sin_cambios, cursor = self._sincronizar(cursor)
+		self.assertFalse(any(sin_cambios.values()))
+
+		producto = self.productos[0]
+		producto.nombre = 'Editado'
+		producto.save()
+		borrado_id = self.productos[1].id
+		self.productos[1].delete()
+		cambios, cursor = self._sincronizar(cursor)
+		self.assertEqual([(p['id'], p['nombre']) for p in cambios['productos']], [(producto.id, 'Editado')])
+		self.assertEqual(
+			[(e['tipo'], e['objeto_id']) for e in cambios['eliminados']],
+			[('producto', borrado_id)],
+		)
+
+	def test_baja_en_cascada(self):
+		_, cursor = self._sincronizar()
+		esperados = [('proveedor', self.otro_proveedor.id), ('producto', self.producto_otro.id)]
+		self.otro_proveedor.delete()
+		cambios, _ = self._sincronizar(cursor)
+		self.assertCountEqual([(e['tipo'], e['objeto_id']) for e in cambios['eliminados']], esperados)
+
+	def test_cursor_alterado_es_400(self):
+		ahora = timezone.now().isoformat()
+		for cursor in ['no-es-un-cursor', codificar_cursor('next', [ahora, 9, 1, ahora]), codificar_cursor('next', [ahora, 0, 1])]:
+			with self.subTest(cursor=cursor):
+				response = self.client.get(self.URL, {'cursor': cursor})
+				self.assertEqual(response.status_code, 400)
+				self.assertEqual(response.json()['error'], 'Cursor inválido')
+
+	def test_posicion_anterior_a_la_retencion_pide_resincronizar(self):
+		vieja = timezone.now() - timedelta(days=31)
+		for params in ({'desde': vieja.isoformat()}, {'cursor': codificar_cursor('next', [vieja, 2, 1, vieja])}):
+			with self.subTest(params=params):
+				response = self.client.get(self.URL, params)
+				self.assertEqual(response.status_code, 410)
+				self.assertTrue(response.json()['resincronizar'])
+
+		# Una sincronización completa recorre filas viejas sin vencerse: cuenta desde su inicio
+		ProductoModel.objects.update(fecha_actualizacion=vieja)
+		ProveedorModel.objects.update(fecha_actualizacion=vieja)
+		completa, _ = self._sincronizar()
+		self.assertEqual(len(completa['productos']), 4)
+
+	@override_settings(CAMBIOS_MARGEN_SEGUNDOS=60)
+	def test_margen_no_entrega_filas_recientes(self):
+		ProductoModel.objects.filter(id=self.productos[0].id).update(fecha_actualizacion=timezone.now() - timedelta(minutes=5))
+		pagina = self._cambios()
+		self.assertEqual([p['id'] for p in pagina['productos']], [self.productos[0].id])
+		self.assertEqual(pagina['proveedores'], [])
+
+		# El cursor no avanza más allá de lo entregado: las filas recientes llegan después
+		with override_settings(CAMBIOS_MARGEN_SEGUNDOS=0):
+			siguiente = self._cambios(cursor=pagina['cursor'])
+		self.assertEqual(len(siguiente['productos']), 3)
+		self.assertEqual(len(siguiente['proveedores']), 2)
+
+	def test_purgar_eliminados(self):
+		vencido_id, vigente_id = self.productos[0].id, self.productos[1].id
+		self.productos[0].delete()
+		self.productos[1].delete()
+		RegistroEliminadoModel.objects.filter(objeto_id=vencido_id).update(
+			fecha_actualizacion=timezone.now() - timedelta(days=31),
+		)
+
+		salida = StringIO()
+		call_command('purgar_eliminados', '--dry-run', stdout=salida)
+		self.assertIn(': 1 (sin borrar)', salida.getvalue())
+		self.assertEqual(RegistroEliminadoModel.objects.count(), 2)
+
+		call_command('purgar_eliminados', stdout=StringIO())
+		self.assertEqual(list(RegistroEliminadoModel.objects.values_list('objeto_id', flat=True)), [vigente_id])
+
+
+class ImagenesCompartidasTest(TestCase):
+	"""Subidas idénticas comparten archivos contados en ArchivoMedia (producto.imagenes)."""
+
+	def setUp(self):
+		media = tempfile.mkdtemp()
+		self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+		for contexto in (
+			override_settings(MEDIA_ROOT=media),
+			# Sin hilos: el procesamiento corre al ejecutar los callbacks de on_commit
+			mock.patch.object(pool_imagenes, 'workers', 0),
+		):
+			contexto.__enter__()
+			self.addCleanup(contexto.__exit__, None, None, None)
+		proveedor = ProveedorModel.objects.create(nombre='Proveedor')
+		self.productos = [ProductoModel.objects.create(proveedor=proveedor, nombre=f'Producto {i}') for i in range(2)]
+		contenido = io.BytesIO()
+		Image.new('RGB', (320, 240), 'red').save(contenido, 'JPEG')
+		self.bytes_imagen = contenido.getvalue()
+
+	def _subir(self, producto):
+		with self.captureOnCommitCallbacks(execute=True):
+			guardar_imagen_original(producto, SimpleUploadedFile('foto.jpg', self.bytes_imagen, content_type='image/jpeg'))
+		producto.refresh_from_db()
+		return producto
+
+	def _referencias(self, nombres):
+		return dict(ArchivoMediaModel.objects.filter(nombre__in=nombres).values_list('nombre', 'referencias'))
+
+	def test_subidas_identicas_comparten_archivos_hasta_la_ultima_baja(self):
+		primero, segundo = (self._subir(producto) for producto in self.productos)
+		self.assertEqual(primero.imagen_estado, ProductoModel.ImagenEstadoChoices.LISTA)
+		self.assertEqual(segundo.imagen_variantes, primero.imagen_variantes)
+		self.assertEqual(segundo.imagen.name, primero.imagen.name)
+
+		nombres = {nombre for formatos in primero.imagen_variantes.values() for nombre in formatos.values()}
+		self.assertEqual(self._referencias(nombres), dict.fromkeys(nombres, 2))
+
+		with self.captureOnCommitCallbacks(execute=True):
+			primero.delete()
+		self.assertEqual(self._referencias(nombres), dict.fromkeys(nombres, 1))
+		self.assertTrue(all(default_storage.exists(nombre) for nombre in nombres))
+
+		with self.captureOnCommitCallbacks() as callbacks:
+			segundo.delete()
+		self.assertEqual(self._referencias(nombres), {})
+		# Los archivos se borran recién al confirmar la transacción
+		self.assertTrue(all(default_storage.exists(nombre) for nombre in nombres))
+		for callback in callbacks:
+			callback()
+		self.assertFalse(any(default_storage.exists(nombre) for nombre in nombres))
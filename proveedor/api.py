@@ -1,25 +1,42 @@
-from ninja import Router
+from ninja import Query, Router
 from ninja.pagination import paginate
 from django.shortcuts import get_object_or_404
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
 from ninja.responses import Response
 from typing import List
 from .schemas import *
 from core.utils.search_filter import search_filter
+from core.utils.query_budget import query_budget
+from core.utils.sparse_fields import sparse_fields
+from core.utils.response_cache import cache_response
+from core.utils.conditional_get import conditional_get, validador_modelos
 from proveedor.models import Proveedor as ProveedorModel
+from proveedor.indice_busqueda import autocompletar_proveedores
+from pedido.totales import pedidos_afectados, recalcular_totales
 from usuario.auth import AuthBearer
 
 router = Router(tags=['Proveedores'])
 
 
 @router.get('/listar_todos', response=List[Proveedor])
+@query_budget(3)
+@conditional_get(validador_modelos(ProveedorModel))
+@cache_response('proveedores')
+@sparse_fields(Proveedor)
 @paginate
 @search_filter(['nombre', 'telefono'])
 def listar_proveedores(request, busqueda: str = None):
 	return ProveedorModel.objects.order_by('nombre', 'id')
 
 
+@router.get('/autocompletar', response=List[ProveedorAutocompletar])
+@query_budget(3)
+def autocompletar_proveedores_por_nombre(request, q: str, limite: int = Query(10, ge=1, le=50)):
+	return autocompletar_proveedores.buscar(q, limite)
+
+
 @router.get('/obtener/{proveedor_id}', response=Proveedor)
+@query_budget(1)
 def obtener_proveedor(request, proveedor_id: int):
 	return get_object_or_404(ProveedorModel, id=proveedor_id)
 
@@ -65,7 +82,11 @@ def actualizar_proveedor(request, proveedor_id: int, data: ProveedorUpdate):
 def eliminar_proveedor(request, proveedor_id: int):
 	try:
 		proveedor = get_object_or_404(ProveedorModel, id=proveedor_id)
-		proveedor.delete()
+		# Los totales de los pedidos se corrigen en la misma transacción que el borrado
+		with transaction.atomic():
+			pedido_ids = pedidos_afectados(producto__proveedor_id=proveedor.id)
+			proveedor.delete()
+			recalcular_totales(pedido_ids)
 		return {'success': True}
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
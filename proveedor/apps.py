@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class ProveedorConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'proveedor'
+
+    def ready(self):
+        from proveedor import signals  # noqa: F401
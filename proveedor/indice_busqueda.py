@@ -0,0 +1,5 @@
+from core.utils.prefix_index import ModelPrefixIndex
+from proveedor.models import Proveedor
+
+# Prefijos de nombres para /proveedores/autocompletar
+autocompletar_proveedores = ModelPrefixIndex(Proveedor, 'nombre')
@@ -0,0 +1,37 @@
+from django.db import migrations
+
+
+# Índices GIN de pg_trgm para que las búsquedas `ILIKE '%q%'` de search_filter
+# usen índice en PostgreSQL. En otros motores (SQLite) no se crea nada.
+INDICES = [
+    ('proveedor_nombre_trgm', 'proveedor', 'nombre'),
+]
+
+
+def crear_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for nombre, tabla, columna in INDICES:
+        schema_editor.execute(
+            f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {nombre} ON {tabla} USING gin ({columna} gin_trgm_ops)'
+        )
+
+
+def borrar_indices(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for nombre, _tabla, _columna in INDICES:
+        schema_editor.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {nombre}')
+
+
+class Migration(migrations.Migration):
+    atomic = False
+
+    dependencies = [
+        ('proveedor', '0003_proveedor_cuenta_bancaria'),
+    ]
+
+    operations = [
+        migrations.RunPython(crear_indices, borrar_indices),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+from core.utils.normalizar_texto import normalizar_texto
+
+CAMPOS_NORMALIZADOS = {'nombre': 'nombre_normalizado'}
+TAMANO_LOTE = 2000
+
+
+def rellenar_campos_normalizados(apps, schema_editor):
+    Proveedor = apps.get_model('proveedor', 'Proveedor')
+    lote = []
+    for obj in Proveedor.objects.only(*CAMPOS_NORMALIZADOS).order_by('id').iterator(chunk_size=TAMANO_LOTE):
+        for campo, destino in CAMPOS_NORMALIZADOS.items():
+            setattr(obj, destino, normalizar_texto(getattr(obj, campo)))
+        lote.append(obj)
+        if len(lote) >= TAMANO_LOTE:
+            Proveedor.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS.values()))
+            lote = []
+    if lote:
+        Proveedor.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS.values()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0004_indices_trigram_busqueda'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proveedor',
+            name='nombre_normalizado',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(rellenar_campos_normalizados, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('proveedor', '0006_indices_trigram_normalizados'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='proveedor',
+            index=models.Index(fields=['fecha_actualizacion', 'id'], name='proveedor_fecha_act_idx'),
+        ),
+    ]
@@ -6,6 +6,12 @@ class Proveedor(BaseModel):
     telefono = models.CharField(max_length=50,null=True, blank=True)
     cuenta_bancaria = models.CharField(max_length=50,null=True, blank=True)
     creado_por = models.ForeignKey('usuario.Usuario', on_delete=models.SET_NULL, null=True, blank=True)
+    nombre_normalizado = models.CharField(max_length=100, blank=True, default='', db_index=True, editable=False)
+
+    CAMPOS_NORMALIZADOS = {'nombre': 'nombre_normalizado'}
 
     class Meta:
         db_table = 'proveedor'
+        indexes = [
+            models.Index(fields=['fecha_actualizacion', 'id'], name='proveedor_fecha_act_idx'),
+        ]
@@ -9,7 +9,12 @@ Str50 = Annotated[str, StringConstraints(max_length=50)]
 class Proveedor(ModelSchema):
 	class Meta:
 		model = ProveedorModel
-		fields = '__all__'
+		exclude = ['nombre_normalizado']
+
+
+class ProveedorAutocompletar(Schema):
+	id: int
+	nombre: Str50
 
 
 class ProveedorCreate(Schema):
@@ -0,0 +1,18 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from core.utils.response_cache import registrar_tags
+from proveedor.indice_busqueda import autocompletar_proveedores
+from proveedor.models import Proveedor
+
+registrar_tags(Proveedor, 'proveedores', 'productos')
+
+
+@receiver(post_save, sender=Proveedor)
+def indexar_proveedor(sender, instance, **kwargs):
+	autocompletar_proveedores.actualizar(instance)
+
+
+@receiver(post_delete, sender=Proveedor)
+def desindexar_proveedor(sender, instance, **kwargs):
+	autocompletar_proveedores.quitar(instance.id)
@@ -6,7 +6,9 @@ from ninja.responses import Response
 from typing import List
 from .schemas import *
 from core.utils.search_filter import search_filter
-from usuario.auth import AuthBearer, GenerateToken, requiere_admin
+from core.utils.query_budget import query_budget
+from core.utils.sparse_fields import sparse_fields
+from usuario.auth import AuthBearer, GenerateToken, invalidar_cache_token, invalidar_cache_usuario, requiere_admin
 from usuario.models import Usuario as UsuarioModel
 
 router = Router(tags=['Usuarios'])
@@ -19,6 +21,7 @@ def login(request, data: LoginRequest):
 		if not usuario or not check_password(data.contrasena, usuario.contrasena_hasheada):
 			return Response({'success': False, 'error': 'Credenciales inválidas'}, status=401)
 
+		invalidar_cache_token(usuario.token)
 		usuario.token = GenerateToken.generate()
 		usuario.save(update_fields=['token', 'fecha_actualizacion'])
 		return {'token': usuario.token, 'usuario': usuario}
@@ -33,6 +36,7 @@ def logout(request):
 		if not usuario:
 			return Response({'success': False, 'error': 'No autenticado'}, status=401)
 
+		invalidar_cache_token(usuario.token)
 		usuario.token = None
 		usuario.save(update_fields=['token', 'fecha_actualizacion'])
 		return {'success': True}
@@ -41,6 +45,7 @@ def logout(request):
 
 
 @router.get('/mi_perfil', response=Usuario, auth=AuthBearer())
+@query_budget(1)
 def mi_perfil(request):
 	usuario = request.auth
 	if not usuario:
@@ -49,14 +54,18 @@ def mi_perfil(request):
 
 
 @router.get('/listar_todos', response=List[Usuario], auth=AuthBearer())
+@query_budget(3)
+@requiere_admin
+@sparse_fields(Usuario)
 @paginate
 @search_filter(['nombre', 'nombre_sucursal', 'rol'])
-@requiere_admin
 def listar_usuarios(request, busqueda: str = None):
 	return UsuarioModel.objects.order_by('-fecha_actualizacion')
 
 
 @router.get('/listar_sucursales', response=List[Usuario], auth=None)
+@query_budget(2)
+@sparse_fields(Usuario)
 @paginate
 @search_filter(['nombre', 'nombre_sucursal'])
 def listar_sucursales(request, busqueda: str = None):
@@ -64,6 +73,8 @@ def listar_sucursales(request, busqueda: str = None):
 
 
 @router.get('/listar_sucursales_para_pedido', response=List[Usuario], auth=AuthBearer())
+@query_budget(3)
+@sparse_fields(Usuario)
 @paginate
 @search_filter(['nombre', 'nombre_sucursal'])
 def listar_sucursales_para_pedido(request, busqueda: str = None):
@@ -76,6 +87,7 @@ def listar_sucursales_para_pedido(request, busqueda: str = None):
 
 
 @router.get('/obtener/{usuario_id}', response=Usuario, auth=None)
+@query_budget(1)
 def obtener_usuario(request, usuario_id: int):
 	usuario = get_object_or_404(UsuarioModel, id=usuario_id)
 	return usuario
@@ -107,6 +119,7 @@ def actualizar_usuario(request, usuario_id: int, data: UsuarioUpdate):
 			setattr(usuario, attr, value)
 
 		usuario.save()
+		invalidar_cache_usuario(usuario.id)
 		return usuario
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
@@ -127,6 +140,7 @@ def cambiar_mi_contrasena(request, data: CambiarMiContrasena):
 
 		usuario.contrasena_hasheada = make_password(data.contrasena_nueva)
 		usuario.save(update_fields=['contrasena_hasheada', 'fecha_actualizacion'])
+		invalidar_cache_usuario(usuario.id)
 		return {'success': True}
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
@@ -138,6 +152,7 @@ def eliminar_usuario(request, usuario_id: int):
 	try:
 		usuario = get_object_or_404(UsuarioModel, id=usuario_id)
 		usuario.delete()
+		invalidar_cache_usuario(usuario_id)
 		return {'success': True}
 	except Exception as e:
 		return Response({'success': False, 'error': str(e)}, status=400)
@@ -1,8 +1,18 @@
+import copy
 from functools import wraps
+from django.conf import settings
 from ninja.responses import Response
 from ninja.security import HttpBearer
+from core.utils.lru_ttl_cache import LRUTTLCache
 from usuario.models import Usuario
 
+# Cache token -> usuario del proceso. Evita consultar la tabla usuario en cada
+# request autenticada; login/logout y cambios de usuario lo invalidan.
+_token_cache = LRUTTLCache(
+    maxsize=getattr(settings, 'AUTH_TOKEN_CACHE_MAXSIZE', 1024),
+    ttl=getattr(settings, 'AUTH_TOKEN_CACHE_TTL', 60),
+)
+
 def _append_doc_note(func, note: str) -> str:
     base = (getattr(func, "__doc__", "") or "").strip()
     if not base:
@@ -14,13 +24,24 @@ def _append_doc_note(func, note: str) -> str:
 def es_admin(usuario):
     return usuario.rol == Usuario.RolChoices.ADMIN_GENERAL
 
+def invalidar_cache_token(token):
+    if token:
+        _token_cache.delete(token)
+
+def invalidar_cache_usuario(usuario_id):
+    _token_cache.delete_where(lambda _token, usuario: usuario.id == usuario_id)
+
 class AuthBearer(HttpBearer):
     def authenticate(self, request, token):
-        try:
-            usuario = Usuario.objects.get(token=token)
-            return usuario
-        except Usuario.DoesNotExist:
-            return None
+        usuario = _token_cache.get(token)
+        if usuario is None:
+            try:
+                usuario = Usuario.objects.get(token=token)
+            except Usuario.DoesNotExist:
+                return None
+            _token_cache.set(token, usuario)
+        # Copia para que las vistas puedan modificar el usuario sin alterar el cacheado
+        return copy.copy(usuario)
 
 
 class GenerateToken:
@@ -0,0 +1,64 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client, override_settings
+
+from core.utils.lru_ttl_cache import LRUTTLCache
+from pedido.models import Pedido
+from usuario import auth
+from usuario.auth import GenerateToken
+from usuario.models import Usuario
+
+URL = '/api/pedidos/mis_pedidos_hechos'
+
+# Sin caché de respuestas, para que cada request ejecute la autenticación y la vista
+SIN_CACHE_RESPUESTAS = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+    'respuestas': {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'},
+}
+
+
+class Command(BaseCommand):
+    help = f'Mide requests/segundo en {URL} con y sin la caché de tokens de AuthBearer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=500, help='Requests por caso')
+        parser.add_argument('--pedidos', type=int, default=20, help='Pedidos creados por el usuario de prueba')
+
+    def handle(self, *args, **options):
+        cantidad = options['requests']
+        if cantidad <= 0 or options['pedidos'] < 0:
+            raise CommandError('--requests debe ser mayor a 0 y --pedidos no negativo')
+
+        casos = [
+            ('sin caché de tokens', LRUTTLCache(maxsize=0)),
+            ('con caché de tokens', LRUTTLCache()),
+        ]
+        self.stdout.write(f'{cantidad} GET {URL} con {options["pedidos"]} pedidos')
+        # El usuario y los pedidos de prueba se descartan al terminar
+        with transaction.atomic(), override_settings(CACHES=SIN_CACHE_RESPUESTAS, ALLOWED_HOSTS=['*']):
+            token = GenerateToken.generate()
+            usuario = Usuario.objects.create(
+                nombre='medir_auth_cache',
+                nombre_sucursal='medir_auth_cache',
+                contrasena_hasheada='!',
+                token=token,
+            )
+            Pedido.objects.bulk_create([Pedido(creado_por=usuario) for _ in range(options['pedidos'])])
+            client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+            base = None
+            for nombre, cache in casos:
+                with mock.patch.object(auth, '_token_cache', cache):
+                    response = client.get(URL)
+                    if response.status_code != 200:
+                        raise CommandError(f'{URL} respondió {response.status_code}')
+                    inicio = time.perf_counter()
+                    for _ in range(cantidad):
+                        client.get(URL)
+                    por_segundo = cantidad / (time.perf_counter() - inicio)
+                base = base or por_segundo
+                self.stdout.write(f'{nombre:<22} {por_segundo:8.1f} req/s  x{por_segundo / base:5.2f}')
+            transaction.set_rollback(True)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuario', '0002_alter_usuario_nombre_alter_usuario_nombre_sucursal_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usuario',
+            name='token',
+            field=models.CharField(blank=True, db_index=True, max_length=50, null=True),
+        ),
+    ]
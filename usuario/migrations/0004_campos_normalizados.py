@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 08:45
+
+from django.db import migrations, models
+
+from core.utils.normalizar_texto import normalizar_texto
+
+CAMPOS_NORMALIZADOS = {'nombre': 'nombre_normalizado', 'nombre_sucursal': 'nombre_sucursal_normalizado'}
+TAMANO_LOTE = 2000
+
+
+def rellenar_campos_normalizados(apps, schema_editor):
+    Usuario = apps.get_model('usuario', 'Usuario')
+    lote = []
+    for obj in Usuario.objects.only(*CAMPOS_NORMALIZADOS).order_by('id').iterator(chunk_size=TAMANO_LOTE):
+        for campo, destino in CAMPOS_NORMALIZADOS.items():
+            setattr(obj, destino, normalizar_texto(getattr(obj, campo)))
+        lote.append(obj)
+        if len(lote) >= TAMANO_LOTE:
+            Usuario.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS.values()))
+            lote = []
+    if lote:
+        Usuario.objects.bulk_update(lote, list(CAMPOS_NORMALIZADOS.values()))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('usuario', '0003_usuario_token_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='usuario',
+            name='nombre_normalizado',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='usuario',
+            name='nombre_sucursal_normalizado',
+            field=models.CharField(blank=True, db_index=True, default='', editable=False, max_length=100),
+        ),
+        migrations.RunPython(rellenar_campos_normalizados, migrations.RunPython.noop),
+    ]
@@ -5,11 +5,15 @@ class Usuario(BaseModel):
     nombre = models.CharField(max_length=50,unique=True)
     contrasena_hasheada = models.CharField(max_length=100)
     nombre_sucursal = models.CharField(max_length=50,unique=True)
-    token = models.CharField(max_length=50, blank=True, null=True)
+    token = models.CharField(max_length=50, blank=True, null=True, db_index=True)
     class RolChoices(models.TextChoices):
         ADMIN_GENERAL = 'admin_general', 'Admin General'
         ADMIN_SUCURSAL = 'admin_sucursal', 'Admin Sucursal'
     rol = models.CharField(max_length=50, choices=RolChoices.choices, default=RolChoices.ADMIN_SUCURSAL)
+    nombre_normalizado = models.CharField(max_length=100, blank=True, default='', db_index=True, editable=False)
+    nombre_sucursal_normalizado = models.CharField(max_length=100, blank=True, default='', db_index=True, editable=False)
+
+    CAMPOS_NORMALIZADOS = {'nombre': 'nombre_normalizado', 'nombre_sucursal': 'nombre_sucursal_normalizado'}
 
     class Meta:
         db_table = 'usuario'
@@ -8,7 +8,7 @@ Str50 = Annotated[str, StringConstraints(max_length=50)]
 class Usuario(ModelSchema):
     class Meta:
         model = UsuarioModel
-        exclude = ['contrasena_hasheada', 'token']
+        exclude = ['contrasena_hasheada', 'token', 'nombre_normalizado', 'nombre_sucursal_normalizado']
 
 # solo para admin_general
 class UsuarioCreate(Schema):